@@ -15,11 +15,7 @@ import os                                             # for file/system operatio
 from database import Database                         # database interaction class
 from models import User                               # User model structure
 import styles                                         # custom stylesheet for UI
-
-import hashlib
-
-def hash_password(password: str) -> str:
-    return hashlib.sha256(password.encode()).hexdigest()
+import passwords                                      # shared hashing (emergency_response_app/passwords.py)
 
 # Base directory for loading icons
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -250,9 +246,14 @@ class AuthWindow(QWidget):
             return
 
         user = self.db.get_user_by_username(username)
-        if not user or user.password != hash_password(password):
+        ok, needs_rehash = (passwords.verify_password(password, user.password) if user
+                            else (passwords.dummy_verify(password), False))
+        if not ok:
             QMessageBox.warning(self, "Error", "Invalid username or password.")
             return
+        if needs_rehash:
+            # Legacy SHA-256 or an outdated work factor: upgrade while we have the password
+            self.db.update_password(user.id, passwords.hash_password(password))
 
 
         # success
@@ -422,7 +423,7 @@ class CreateAccountWindow(QWidget):
             id=str(uuid.uuid4()),
             name=name,
             email=email,
-            password=hash_password(password),
+            password=passwords.hash_password(password),
             role=role,
             username=username,
             phone=phone,
@@ -1,10 +1,23 @@
 #database.py
-import hashlib
+import os
+import sys
 import sqlite3
 import json
 from datetime import datetime
 from models import User, Incident
 
+# Shared users/incidents schema, also used by emergency_response_app and app_17
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "emergency_response_app"))
+from storage import Storage
+import passwords
+
+# This client's Incident has `severity`; the shared table calls it priority
+INCIDENT_COLUMNS = ("id, type, location, description, priority, status, reporter_id, reporter_name, "
+                    "responder_id, responder_name, incident_category, specific_questions, "
+                    "emergency_feedback, assigned_responders, created_at, updated_at")
+USER_COLUMNS = ("id, name, username, email, password, role, phone, gender, date_of_birth, "
+                "responder_category, status, active_incidents, created_at")
+
 class Database:
     def __init__(self, db_name="emergency_response.db"):
         self.db_name = db_name
@@ -14,70 +27,30 @@ class Database:
         return sqlite3.connect(self.db_name)
     
     def init_database(self):
+        # users / incidents are created (or migrated from this client's old
+        # `severity` layout) by the shared storage package
+        self.storage = Storage(self.db_name)
+
         conn = self.get_connection()
         cursor = conn.cursor()
-        
-        # Enhanced Users table with new fields
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                username TEXT UNIQUE NOT NULL,
-                email TEXT UNIQUE NOT NULL,
-                password TEXT NOT NULL,
-                role TEXT NOT NULL,
-                phone TEXT,
-                gender TEXT,
-                date_of_birth TEXT,
-                responder_category TEXT,
-                status TEXT DEFAULT 'available',
-                active_incidents INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Enhanced Incidents table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS incidents (
-                id TEXT PRIMARY KEY,
-                type TEXT NOT NULL,
-                location TEXT NOT NULL,
-                description TEXT NOT NULL,
-                severity TEXT NOT NULL,
-                status TEXT DEFAULT 'pending',
-                reporter_id TEXT NOT NULL,
-                reporter_name TEXT NOT NULL,
-                responder_id TEXT,
-                responder_name TEXT,
-                incident_category TEXT,
-                specific_questions TEXT,
-                emergency_feedback TEXT,
-                assigned_responders TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (reporter_id) REFERENCES users (id),
-                FOREIGN KEY (responder_id) REFERENCES users (id)
-            )
-        ''')
-        
+
         # Create default admin user
         cursor.execute('''
             INSERT OR IGNORE INTO users (id, name, username, email, password, role, status)
             VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', ('admin001', 'System Admin', 'Admin', 'admin@ers.com', hashlib.sha256("Admin@123".encode()).hexdigest(), 'admin', 'available'))
+        ''', ('admin001', 'System Admin', 'Admin', 'admin@ers.com', self._seed_password(cursor, 'admin001', "Admin@123"), 'admin', 'available'))
 
         
         # Create sample responders
         cursor.execute('''
             INSERT OR IGNORE INTO users (id, name, username, email, password, role, status, responder_category)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', ('resp001', 'John Responder', 'john_responder', 'responder@ers.com', hashlib.sha256("Resp@123".encode()).hexdigest(), 'responder', 'available', 'Fire'))
+        ''', ('resp001', 'John Responder', 'john_responder', 'responder@ers.com', self._seed_password(cursor, 'resp001', "Resp@123"), 'responder', 'available', 'Fire'))
         
         cursor.execute('''
             INSERT OR IGNORE INTO users (id, name, username, email, password, role, status, responder_category)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', ('resp002', 'Sarah Medic', 'sarah_medic', 'medic@ers.com', hashlib.sha256("Medic@123".encode()).hexdigest(), 'responder', 'available', 'Medical'))
+        ''', ('resp002', 'Sarah Medic', 'sarah_medic', 'medic@ers.com', self._seed_password(cursor, 'resp002', "Medic@123"), 'responder', 'available', 'Medical'))
         
         # Create sample reporters
         cursor.execute('''
@@ -85,17 +58,25 @@ class Database:
             (id, name, username, email, password, role, status, phone, gender)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
-            'rept001', 'Alex Reporter', 'alex_reporter', 'alex@ers.com', hashlib.sha256("Report@123".encode()).hexdigest(), 'reporter', 'active', '01710000001', 'Male'))
+            'rept001', 'Alex Reporter', 'alex_reporter', 'alex@ers.com', self._seed_password(cursor, 'rept001', "Report@123"), 'reporter', 'active', '01710000001', 'Male'))
 
         cursor.execute('''
             INSERT OR IGNORE INTO users 
             (id, name, username, email, password, role, status, phone, gender)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
-            'rept002', 'Maya Citizen', 'maya_citizen', 'maya@ers.com', hashlib.sha256("Citizen@123".encode()).hexdigest(), 'reporter', 'active', '01710000002', 'Female'))
+            'rept002', 'Maya Citizen', 'maya_citizen', 'maya@ers.com', self._seed_password(cursor, 'rept002', "Citizen@123"), 'reporter', 'active', '01710000002', 'Female'))
 
         conn.commit()
         conn.close()
+
+    @staticmethod
+    def _seed_password(cursor, user_id, password):
+        """Hash a seed account's password only when the account is missing."""
+        cursor.execute("SELECT 1 FROM users WHERE id = ?", (user_id,))
+        if cursor.fetchone():
+            return ""       # INSERT OR IGNORE skips the row anyway
+        return passwords.hash_password(password)
     
     def create_user(self, user):
         conn = self.get_connection()
@@ -112,7 +93,7 @@ class Database:
     def get_user_by_username(self, username):
         conn = self.get_connection()
         cursor = conn.cursor()
-        cursor.execute('SELECT * FROM users WHERE username = ?', (username,))
+        cursor.execute(f'SELECT {USER_COLUMNS} FROM users WHERE username = ?', (username,))
         row = cursor.fetchone()
         conn.close()
         
@@ -123,7 +104,7 @@ class Database:
     def get_user_by_email(self, email):
         conn = self.get_connection()
         cursor = conn.cursor()
-        cursor.execute('SELECT * FROM users WHERE email = ?', (email,))
+        cursor.execute(f'SELECT {USER_COLUMNS} FROM users WHERE email = ?', (email,))
         row = cursor.fetchone()
         conn.close()
         
@@ -134,7 +115,7 @@ class Database:
     def get_user_by_id(self, user_id):
         conn = self.get_connection()
         cursor = conn.cursor()
-        cursor.execute('SELECT * FROM users WHERE id = ?', (user_id,))
+        cursor.execute(f'SELECT {USER_COLUMNS} FROM users WHERE id = ?', (user_id,))
         row = cursor.fetchone()
         conn.close()
         
@@ -145,7 +126,7 @@ class Database:
     def get_user_by_email_and_phone(self, email, phone):
         conn = self.get_connection()
         cursor = conn.cursor()
-        cursor.execute('SELECT * FROM users WHERE email = ? AND phone = ?', (email, phone))
+        cursor.execute(f'SELECT {USER_COLUMNS} FROM users WHERE email = ? AND phone = ?', (email, phone))
         row = cursor.fetchone()
         conn.close()
         
@@ -156,7 +137,7 @@ class Database:
     def get_all_users(self):
         conn = self.get_connection()
         cursor = conn.cursor()
-        cursor.execute('SELECT * FROM users ORDER BY created_at DESC')
+        cursor.execute(f'SELECT {USER_COLUMNS} FROM users ORDER BY created_at DESC')
         rows = cursor.fetchall()
         conn.close()
         return [self._row_to_user(row) for row in rows]
@@ -164,7 +145,7 @@ class Database:
     def get_responders(self):
         conn = self.get_connection()
         cursor = conn.cursor()
-        cursor.execute('SELECT * FROM users WHERE role = "responder"')
+        cursor.execute(f'SELECT {USER_COLUMNS} FROM users WHERE role = "responder"')
         rows = cursor.fetchall()
         conn.close()
         return [self._row_to_user(row) for row in rows]
@@ -174,7 +155,7 @@ class Database:
         cursor = conn.cursor()
         cursor.execute('''
             INSERT INTO incidents 
-            (id, type, location, description, severity, status, reporter_id, reporter_name, 
+            (id, type, location, description, priority, status, reporter_id, reporter_name, 
             incident_category, specific_questions, emergency_feedback, assigned_responders,
             created_at, updated_at)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
@@ -189,7 +170,7 @@ class Database:
     def get_incident_by_id(self, incident_id):
         conn = self.get_connection()
         cursor = conn.cursor()
-        cursor.execute('SELECT * FROM incidents WHERE id = ?', (incident_id,))
+        cursor.execute(f'SELECT {INCIDENT_COLUMNS} FROM incidents WHERE id = ?', (incident_id,))
         row = cursor.fetchone()
         conn.close()
         
@@ -200,7 +181,7 @@ class Database:
     def get_all_incidents(self):
         conn = self.get_connection()
         cursor = conn.cursor()
-        cursor.execute('SELECT * FROM incidents ORDER BY created_at DESC')
+        cursor.execute(f'SELECT {INCIDENT_COLUMNS} FROM incidents ORDER BY created_at DESC')
         rows = cursor.fetchall()
         conn.close()
         return [self._row_to_incident(row) for row in rows]
@@ -208,7 +189,7 @@ class Database:
     def get_incidents_by_reporter(self, reporter_id):
         conn = self.get_connection()
         cursor = conn.cursor()
-        cursor.execute('SELECT * FROM incidents WHERE reporter_id = ? ORDER BY created_at DESC', (reporter_id,))
+        cursor.execute(f'SELECT {INCIDENT_COLUMNS} FROM incidents WHERE reporter_id = ? ORDER BY created_at DESC', (reporter_id,))
         rows = cursor.fetchall()
         conn.close()
         return [self._row_to_incident(row) for row in rows]
@@ -216,7 +197,7 @@ class Database:
     def get_incidents_by_responder(self, responder_id):
         conn = self.get_connection()
         cursor = conn.cursor()
-        cursor.execute('SELECT * FROM incidents WHERE responder_id = ? ORDER BY created_at DESC', (responder_id,))
+        cursor.execute(f'SELECT {INCIDENT_COLUMNS} FROM incidents WHERE responder_id = ? ORDER BY created_at DESC', (responder_id,))
         rows = cursor.fetchall()
         conn.close()
         return [self._row_to_incident(row) for row in rows]
@@ -226,7 +207,7 @@ class Database:
         cursor = conn.cursor()
         cursor.execute('''
             UPDATE incidents SET 
-            type=?, location=?, description=?, severity=?, status=?, 
+            type=?, location=?, description=?, priority=?, status=?, 
             reporter_id=?, reporter_name=?, responder_id=?, responder_name=?, 
             incident_category=?, specific_questions=?, emergency_feedback=?,
             assigned_responders=?, updated_at=?
@@ -253,6 +234,14 @@ class Database:
         conn.commit()
         conn.close()
     
+    def update_password(self, user_id, encoded):
+        """Store a new password hash (e.g. after upgrading a legacy one)."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("UPDATE users SET password = ? WHERE id = ?", (encoded, user_id))
+        conn.commit()
+        conn.close()
+    
     def get_incident_count_by_status(self, status):
         conn = self.get_connection()
         cursor = conn.cursor()
@@ -262,12 +251,7 @@ class Database:
         return count
     
     def get_next_incident_id(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(*) FROM incidents')
-        count = cursor.fetchone()[0]
-        conn.close()
-        return f"INC-{count + 1:03d}"
+        return self.storage.incidents.next_id()
     
     def get_next_user_id(self, role):
         conn = self.get_connection()
@@ -1,13 +1,21 @@
 # 1-IMPORTS
 import os 
-from datetime import datetime
+import sys
+from datetime import datetime, timedelta
 import time
 import re
-from threading import Lock
+from threading import Lock, RLock
+from contextlib import contextmanager
 import json
 import sqlite3
 from typing import Dict, List, Any, Optional, Tuple
 
+# Shared storage (one schema with the GUI), password hashing and date-range reporting engine
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "emergency_response_app"))
+from storage import Storage, OPEN_STATUSES, CLOSED_STATUS
+import passwords
+from reporting import ReportEngine, INCIDENT_SCHEMA, GRANULARITIES, day_range
+
 # 2-Configuration
 CONFIG = {
     "MAX_INCIDENTS_PER_REPORT": 10,
@@ -21,7 +29,9 @@ CONFIG = {
         "police_cars": 8,
         "tow_trucks": 2
     },
-    "DATABASE_NAME": "emergency_response.db"
+    "DATABASE_NAME": "emergency_response.db",
+    "UTILISATION_BUCKET_MINUTES": 60,
+    "RESPONDER_STATS_TTL": 30
 }
 
 
@@ -31,6 +41,12 @@ class DatabaseManager:
     def __init__(self, db_name=CONFIG["DATABASE_NAME"]):
         self.db_name = db_name
         self.connection = None
+        # One shared connection: the lock serialises statements and transactions
+        self._lock = RLock()
+        self._tx_depth = 0
+        self.report_engine = ReportEngine(**INCIDENT_SCHEMA)
+        self._after_commit = []     # (depth, callback) run once the outer transaction commits
+        self.storage = None         # users / incidents repositories, set up by init_database
         self.connect()
         self.init_database()
     
@@ -50,32 +66,10 @@ class DatabaseManager:
         try:
             cursor = self.connection.cursor()
             
-            # Users table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT UNIQUE NOT NULL,
-                    password TEXT NOT NULL,
-                    role TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Incidents table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS incidents (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    incident_number INTEGER NOT NULL,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    priority TEXT NOT NULL,
-                    emergency_type TEXT NOT NULL,
-                    specific_incident TEXT NOT NULL,
-                    location TEXT NOT NULL,
-                    status TEXT DEFAULT 'active',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
+            # users / incidents: the shared schema (storage.schema), migrated from
+            # this script's old layout on first run
+            self.storage = Storage(self.db_name, connect=self.connection_scope)
+
             # Incident details table
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS incident_details (
@@ -88,6 +82,17 @@ class DatabaseManager:
                 )
             ''')
             
+            # Incident feedback table (written by log_incident_to_db)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS incident_feedback (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    incident_id INTEGER NOT NULL,
+                    feedback TEXT NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (incident_id) REFERENCES incidents (id) ON DELETE CASCADE
+                )
+            ''')
+
             # Resources table
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS resources (
@@ -111,6 +116,38 @@ class DatabaseManager:
                 )
             ''')
             
+            # Resource utilisation: one availability snapshot per type per time bucket
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS resource_usage (
+                    resource_type TEXT NOT NULL,
+                    bucket_start INTEGER NOT NULL,
+                    min_available INTEGER NOT NULL,
+                    max_available INTEGER NOT NULL,
+                    last_available INTEGER NOT NULL,
+                    reserved INTEGER NOT NULL DEFAULT 0,
+                    released INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (resource_type, bucket_start)
+                )
+            ''')
+
+            # Seconds each resource type has spent at each occupancy level
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS resource_occupancy (
+                    resource_type TEXT NOT NULL,
+                    occupied INTEGER NOT NULL,
+                    seconds REAL NOT NULL DEFAULT 0,
+                    PRIMARY KEY (resource_type, occupied)
+                )
+            ''')
+
+            # When each type's occupancy last changed (start of the running interval)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS resource_state (
+                    resource_type TEXT PRIMARY KEY,
+                    changed_at REAL NOT NULL
+                )
+            ''')
+
             # Responder actions table
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS responder_actions (
@@ -124,9 +161,20 @@ class DatabaseManager:
                     location TEXT NOT NULL,
                     additional_info TEXT,
                     timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    specific_incident TEXT,
                     FOREIGN KEY (incident_id) REFERENCES incidents (id) ON DELETE CASCADE
                 )
             ''')
+            # Older databases lack specific_incident, which log_responder_action writes
+            columns = [row[1] for row in cursor.execute("PRAGMA table_info(responder_actions)")]
+            if 'specific_incident' not in columns:
+                cursor.execute("ALTER TABLE responder_actions ADD COLUMN specific_incident TEXT")
+
+            # Responder action indexes: per-incident log, recent-first listing, and a
+            # covering index so the statistics query never touches the table rows
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_responder_actions_incident ON responder_actions (incident_id, timestamp)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_responder_actions_timestamp ON responder_actions (timestamp)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_responder_actions_stats ON responder_actions (category, status, incident_id)")
             
             # Activity log table
             cursor.execute('''
@@ -146,42 +194,160 @@ class DatabaseManager:
                         'INSERT INTO resources (resource_type, available_count, total_count) VALUES (?, ?, ?)',
                         (resource_type, count, count)
                     )
+            cursor.execute(
+                'INSERT OR IGNORE INTO resource_state (resource_type, changed_at) SELECT resource_type, ? FROM resources',
+                (time.time(),)
+            )
             
+            self.connection.commit()
+
             # Initialize default users if none exist
-            cursor.execute('SELECT COUNT(*) FROM users')
-            if cursor.fetchone()[0] == 0:
+            if self.storage.users.count() == 0:
                 default_users = [
                     ('admin', 'admin123', 'administrator'),
                     ('responder1', 'resp123', 'responder'),
                     ('reporter1', 'report123', 'reporter')
                 ]
-                cursor.executemany(
-                    'INSERT INTO users (username, password, role) VALUES (?, ?, ?)',
-                    default_users
-                )
-            
-            self.connection.commit()
+                for username, password, role in default_users:
+                    self.storage.users.create(username, passwords.hash_password(password), role, prefix='cli')
             
         except sqlite3.Error as e:
             print(f"Error initializing database: {e}")
             raise
     
+    # Group several statements into one atomic commit
+    @contextmanager
+    def transaction(self):
+        """Run the block as a single transaction: one commit on success, rollback on error.
+        Statements inside do not commit on their own and raise instead of returning None.
+        A nested block becomes a savepoint, so it can fail without undoing the outer one."""
+        with self._lock:
+            depth = self._tx_depth
+            if depth == 0:
+                self.connection.execute("BEGIN IMMEDIATE")
+            else:
+                self.connection.execute(f"SAVEPOINT tx_{depth}")
+            self._tx_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._tx_depth = depth
+                self._after_commit = [(d, fn) for d, fn in self._after_commit if d <= depth]
+                if depth == 0:
+                    self.connection.rollback()
+                else:
+                    self.connection.execute(f"ROLLBACK TO tx_{depth}")
+                    self.connection.execute(f"RELEASE tx_{depth}")
+                raise
+            else:
+                self._tx_depth = depth
+                if depth == 0:
+                    self.connection.commit()
+                    callbacks, self._after_commit = self._after_commit, []
+                    for _, callback in callbacks:
+                        callback()
+                else:
+                    self.connection.execute(f"RELEASE tx_{depth}")
+
+    # Connection scope for the storage repositories
+    @contextmanager
+    def connection_scope(self):
+        """Yield the shared connection under the lock. Inside transaction() the
+        statements join it; otherwise they are committed when the block ends"""
+        with self._lock:
+            if self._tx_depth:
+                yield self.connection
+                return
+            try:
+                yield self.connection
+            except BaseException:
+                self.connection.rollback()
+                raise
+            self.connection.commit()
+
+    # Defer work until the data it depends on is committed
+    def after_commit(self, callback):
+        """Call callback() after the current transaction commits (now, if none is open);
+        it is dropped if the transaction or savepoint it belongs to rolls back"""
+        with self._lock:
+            if self._tx_depth:
+                self._after_commit.append((self._tx_depth, callback))
+                return
+        callback()
+
     # Execute a SQL query
     def execute_query(self, query, params=()):
         """Execute a SQL query and return results"""
-        try:
-            cursor = self.connection.cursor()
+        with self._lock:
+            try:
+                cursor = self.connection.cursor()
+                cursor.execute(query, params)
+
+                if query.strip().upper().startswith('SELECT'):
+                    return cursor.fetchall()
+                else:
+                    if not self._tx_depth:
+                        self.connection.commit()
+                    return cursor.lastrowid
+
+            except sqlite3.Error as e:
+                if self._tx_depth:
+                    raise       # let transaction() roll the whole block back
+                print(f"Database error: {e}")
+                return None
+
+    # Execute a write and report how many rows it touched
+    def execute_update(self, query, params=()):
+        """Execute an UPDATE/DELETE and return the affected row count (for conditional updates)"""
+        with self._lock:
+            try:
+                cursor = self.connection.cursor()
+                cursor.execute(query, params)
+                if not self._tx_depth:
+                    self.connection.commit()
+                return cursor.rowcount
+
+            except sqlite3.Error as e:
+                if self._tx_depth:
+                    raise
+                print(f"Database error: {e}")
+                return None
+
+    # Stream a SELECT without loading every row
+    def iter_query(self, query, params=(), batch_size=500):
+        """Yield rows of a SELECT in batches of batch_size (for large reports)"""
+        cursor = self.connection.cursor()
+        with self._lock:
             cursor.execute(query, params)
-            
-            if query.strip().upper().startswith('SELECT'):
-                return cursor.fetchall()
-            else:
-                self.connection.commit()
-                return cursor.lastrowid
-                
-        except sqlite3.Error as e:
-            print(f"Database error: {e}")
-            return None
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+
+    # Run a date-range incident report
+    def incident_report(self, start=None, end=None, granularity="day"):
+        """Rows of period/category/status counts for start <= timestamp < end (one grouped query)"""
+        with self._lock:
+            return self.report_engine.run(self.connection, start, end, granularity)
+
+    # Execute one statement for many parameter rows
+    def execute_many(self, query, params_seq):
+        """Execute a statement once per parameter tuple and return the row count"""
+        with self._lock:
+            try:
+                cursor = self.connection.cursor()
+                cursor.executemany(query, params_seq)
+                if not self._tx_depth:
+                    self.connection.commit()
+                return cursor.rowcount
+
+            except sqlite3.Error as e:
+                if self._tx_depth:
+                    raise
+                print(f"Database error: {e}")
+                return None
     
     def close(self):
         """Close database connection"""
@@ -1228,79 +1394,289 @@ class UserSession:
             print(f"Goodbye, {self.logged_in_user}!")
             self.logged_in_user = None
 
+#28a-Resource Utilisation History
+class ResourceUtilisation:
+    """Time-bucketed availability snapshots, an occupancy histogram and an
+    exhaustion forecast per resource type. Everything is updated incrementally
+    from reserve/release events (inside their transaction), so reading it never
+    scans deployed_resources."""
+
+    # Initialize utilisation tracker
+    def __init__(self, db_manager, bucket_minutes=CONFIG["UTILISATION_BUCKET_MINUTES"]):
+        self.db_manager = db_manager
+        self.bucket_seconds = bucket_minutes * 60
+
+    def bucket_of(self, ts):
+        return int(ts // self.bucket_seconds * self.bucket_seconds)
+
+    # Record availability changes; call inside the reservation's transaction
+    def record(self, changes, now=None):
+        """changes: {resource_type: (available_after, reserved, released)}"""
+        now = time.time() if now is None else now
+        bucket = self.bucket_of(now)
+        types = list(changes)
+        rows = self.db_manager.execute_query(
+            f"""SELECT r.resource_type, r.total_count, s.changed_at FROM resources r
+                LEFT JOIN resource_state s ON s.resource_type = r.resource_type
+                WHERE r.resource_type IN ({','.join('?' * len(types))})""",
+            tuple(types)
+        )
+        for row in rows:
+            rtype = row['resource_type']
+            after, reserved, released = changes[rtype]
+            before = after + reserved - released
+            # Close the interval spent at the previous occupancy level
+            if row['changed_at'] is not None and now > row['changed_at']:
+                self.db_manager.execute_query(
+                    """INSERT INTO resource_occupancy (resource_type, occupied, seconds) VALUES (?, ?, ?)
+                       ON CONFLICT (resource_type, occupied) DO UPDATE SET seconds = seconds + excluded.seconds""",
+                    (rtype, row['total_count'] - before, now - row['changed_at'])
+                )
+            self.db_manager.execute_query(
+                "INSERT OR REPLACE INTO resource_state (resource_type, changed_at) VALUES (?, ?)",
+                (rtype, now)
+            )
+            self.db_manager.execute_query(
+                """INSERT INTO resource_usage
+                       (resource_type, bucket_start, min_available, max_available, last_available, reserved, released)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (resource_type, bucket_start) DO UPDATE SET
+                       min_available = MIN(min_available, excluded.min_available),
+                       max_available = MAX(max_available, excluded.max_available),
+                       last_available = excluded.last_available,
+                       reserved = reserved + excluded.reserved,
+                       released = released + excluded.released""",
+                (rtype, bucket, min(before, after), max(before, after), after, reserved, released)
+            )
+
+    # Availability snapshots for the last `hours`, gaps filled with the last known value
+    def snapshots(self, resource_type, hours=24, now=None):
+        now = time.time() if now is None else now
+        since = self.bucket_of(now - hours * 3600)
+        rows = self.db_manager.execute_query(
+            """SELECT bucket_start, min_available, max_available, last_available FROM resource_usage
+               WHERE resource_type = ? AND bucket_start >= ? ORDER BY bucket_start""",
+            (resource_type, since)
+        ) or []
+        previous = self.db_manager.execute_query(
+            """SELECT last_available FROM resource_usage
+               WHERE resource_type = ? AND bucket_start < ? ORDER BY bucket_start DESC LIMIT 1""",
+            (resource_type, since)
+        )
+        by_bucket = {row['bucket_start']: row for row in rows}
+        last = previous[0]['last_available'] if previous else None
+        series = []
+        for bucket in range(since, self.bucket_of(now) + 1, self.bucket_seconds):
+            row = by_bucket.get(bucket)
+            if row is not None:
+                series.append((bucket, row['min_available'], row['max_available'], row['last_available']))
+                last = row['last_available']
+            elif last is not None:
+                series.append((bucket, last, last, last))
+        return series
+
+    # Time-weighted occupancy percentiles (units in use)
+    def occupancy_percentiles(self, resource_type, percentiles=(50, 90, 99), now=None):
+        now = time.time() if now is None else now
+        rows = self.db_manager.execute_query(
+            "SELECT occupied, seconds FROM resource_occupancy WHERE resource_type = ? ORDER BY occupied",
+            (resource_type,)
+        ) or []
+        levels = {row['occupied']: row['seconds'] for row in rows}
+        # Include the interval that is still running
+        state = self.db_manager.execute_query(
+            """SELECT r.total_count - r.available_count AS occupied, s.changed_at FROM resources r
+               JOIN resource_state s ON s.resource_type = r.resource_type WHERE r.resource_type = ?""",
+            (resource_type,)
+        )
+        if state and now > state[0]['changed_at']:
+            occupied = state[0]['occupied']
+            levels[occupied] = levels.get(occupied, 0) + now - state[0]['changed_at']
+
+        total = sum(levels.values())
+        if not total:
+            return {p: None for p in percentiles}
+        cumulative, running = [], 0
+        for occupied, seconds in sorted(levels.items()):
+            running += seconds
+            cumulative.append((running, occupied))
+        return {p: next((occ for upto, occ in cumulative if upto >= total * p / 100), cumulative[-1][1])
+                for p in percentiles}
+
+    # When will this type run out at the recent net deployment rate?
+    def forecast_exhaustion(self, resource_type, window_hours=6, now=None):
+        now = time.time() if now is None else now
+        rows = self.db_manager.execute_query(
+            """SELECT COALESCE(SUM(reserved - released), 0) AS net FROM resource_usage
+               WHERE resource_type = ? AND bucket_start >= ?""",
+            (resource_type, self.bucket_of(now - window_hours * 3600))
+        )
+        available = self.db_manager.execute_query(
+            "SELECT available_count FROM resources WHERE resource_type = ?", (resource_type,)
+        )
+        if not rows or not available:
+            return None
+        rate = rows[0]['net'] / window_hours
+        if rate <= 0:
+            return None                     # not trending towards exhaustion
+        hours_left = available[0]['available_count'] / rate
+        return {"rate_per_hour": rate, "hours_left": hours_left,
+                "eta": datetime.fromtimestamp(now + hours_left * 3600)}
+
+    # One row per resource type for reports
+    def summary(self, hours=24, now=None):
+        now = time.time() if now is None else now
+        rows = self.db_manager.execute_query(
+            """SELECT r.resource_type, r.total_count, r.available_count,
+                       (SELECT MIN(u.min_available) FROM resource_usage u
+                        WHERE u.resource_type = r.resource_type AND u.bucket_start >= ?) AS low
+                FROM resources r ORDER BY r.resource_type""",
+            (self.bucket_of(now - hours * 3600),)
+        ) or []
+        report = []
+        for row in rows:
+            low = row['low'] if row['low'] is not None else row['available_count']
+            report.append({
+                "resource_type": row['resource_type'],
+                "total": row['total_count'],
+                "available": row['available_count'],
+                "peak_occupied": row['total_count'] - min(low, row['available_count']),
+                "percentiles": self.occupancy_percentiles(row['resource_type'], now=now),
+                "forecast": self.forecast_exhaustion(row['resource_type'], now=now),
+            })
+        return report
+
+
 #28-Resource Management System
+class ReservationError(Exception):
+    """A reservation could not be satisfied in full"""
+
+
 class ResourceManager:
     # Initialize resource manager
     def __init__(self, db_manager):
         self.db_manager = db_manager
+        # Write-through copies of the tables; the database stays authoritative
+        self._available = {}    # resource_type -> available_count
+        self._ledger = {}       # incident_id -> {resource_type: quantity held}
+        self.usage = ResourceUtilisation(db_manager)
+        self.refresh()
+
+    # Reload the availability cache and reservation ledger from the database
+    def refresh(self):
+        rows = self.db_manager.execute_query("SELECT resource_type, available_count FROM resources")
+        self._available = {row['resource_type']: row['available_count'] for row in rows or []}
+        rows = self.db_manager.execute_query(
+            """SELECT incident_id, resource_type, SUM(quantity) AS quantity FROM deployed_resources
+               WHERE returned_at IS NULL GROUP BY incident_id, resource_type"""
+        )
+        self._ledger = {}
+        for row in rows or []:
+            self._ledger.setdefault(row['incident_id'], {})[row['resource_type']] = row['quantity']
+
+    # Reserve several resource types for an incident, all or nothing
+    def reserve(self, incident_id, resources):
+        """Atomically take e.g. {"fire_trucks": 1, "ambulances": 1} for an incident.
+        Each count is decremented with a conditional UPDATE (available_count >= quantity),
+        so concurrent dispatchers can never over-commit; if any type is short, nothing is taken."""
+        request = {rtype: qty for rtype, qty in resources.items() if qty > 0}
+        if not request:
+            return True
+        try:
+            with self.db_manager.transaction():
+                # Fixed order keeps concurrent multi-resource reservations from deadlocking
+                for rtype in sorted(request):
+                    taken = self.db_manager.execute_update(
+                        """UPDATE resources SET available_count = available_count - ?
+                           WHERE resource_type = ? AND available_count >= ?""",
+                        (request[rtype], rtype, request[rtype])
+                    )
+                    if not taken:
+                        raise ReservationError(rtype)
+                self.db_manager.execute_many(
+                    "INSERT INTO deployed_resources (incident_id, resource_type, quantity) VALUES (?, ?, ?)",
+                    [(incident_id, rtype, qty) for rtype, qty in request.items()]
+                )
+                counts = self._read_counts(request)
+                self.usage.record({rtype: (counts[rtype], qty, 0) for rtype, qty in request.items()})
+                self.db_manager.after_commit(lambda: self._apply(incident_id, request, counts))
+        except ReservationError as e:
+            # Another dispatcher may have changed the count; resync that row
+            self._available.update(self._read_counts([str(e)]))
+            return False
+        return True
+
+    # Release an incident's reserved resources (all of them by default)
+    def release(self, incident_id, resources=None):
+        with self.db_manager.transaction():
+            # Read what is held under the write lock, so two releases cannot both succeed
+            rows = self.db_manager.execute_query(
+                """SELECT resource_type, SUM(quantity) AS quantity FROM deployed_resources
+                   WHERE incident_id = ? AND returned_at IS NULL GROUP BY resource_type""",
+                (incident_id,)
+            )
+            held = {row['resource_type']: row['quantity'] for row in rows}
+            request = dict(held) if resources is None else {r: q for r, q in resources.items() if q > 0}
+            if not request or any(held.get(rtype, 0) < qty for rtype, qty in request.items()):
+                return False
+
+            for rtype, qty in request.items():
+                self.db_manager.execute_update(
+                    "UPDATE resources SET available_count = MIN(total_count, available_count + ?) WHERE resource_type = ?",
+                    (qty, rtype)
+                )
+                self.db_manager.execute_update(
+                    """UPDATE deployed_resources SET returned_at = CURRENT_TIMESTAMP
+                       WHERE incident_id = ? AND resource_type = ? AND returned_at IS NULL""",
+                    (incident_id, rtype)
+                )
+                # Partial return: the rest stays deployed as a fresh row
+                if held[rtype] > qty:
+                    self.db_manager.execute_query(
+                        "INSERT INTO deployed_resources (incident_id, resource_type, quantity) VALUES (?, ?, ?)",
+                        (incident_id, rtype, held[rtype] - qty)
+                    )
+            counts = self._read_counts(request)
+            self.usage.record({rtype: (counts[rtype], 0, qty) for rtype, qty in request.items()})
+            released = {rtype: -qty for rtype, qty in request.items()}
+            self.db_manager.after_commit(lambda: self._apply(incident_id, released, counts))
+        return True
 
     # Deploy resources to an incident
     def deploy_resource(self, resource_type, incident_id, quantity=1):
-    # Check if enough resources are available
-        result = self.db_manager.execute_query(
-            "SELECT available_count FROM resources WHERE resource_type = ?",
-            (resource_type,)
-        )
-    
-        if result and result[0]['available_count'] >= quantity:
-        # Update available count
-            self.db_manager.execute_query(
-                "UPDATE resources SET available_count = available_count - ? WHERE resource_type = ?",
-                (quantity, resource_type)
-            )
-        
-            # Log deployment
-            self.db_manager.execute_query(
-                "INSERT INTO deployed_resources (incident_id, resource_type, quantity) VALUES (?, ?, ?)",
-                (incident_id, resource_type, quantity)
-            )
-        
-            return True
-        return False
+        return self.reserve(incident_id, {resource_type: quantity})
 
     # Return resources from an incident
     def return_resource(self, incident_id, resource_type, quantity=1):
-        # Check if resources are deployed to this incident
-        result = self.db_manager.execute_query(
-            "SELECT quantity FROM deployed_resources WHERE incident_id = ? AND resource_type = ? AND returned_at IS NULL",
-            (incident_id, resource_type)
-        )
-    
-        if result and result[0]['quantity'] >= quantity:
-            # Update available count
-            self.db_manager.execute_query(
-                "UPDATE resources SET available_count = available_count + ? WHERE resource_type = ?",
-                (quantity, resource_type)
-            )
-        
-            # Mark as returned
-            self.db_manager.execute_query(
-                "UPDATE deployed_resources SET returned_at = CURRENT_TIMESTAMP WHERE incident_id = ? AND resource_type = ? AND returned_at IS NULL",
-                (incident_id, resource_type)
-            )
-        
-            return True
-        return False
+        return self.release(incident_id, {resource_type: quantity})
 
     # Get current resource status
     def get_available_resources(self):
-        result = self.db_manager.execute_query("SELECT resource_type, available_count FROM resources")
-        return {row['resource_type']: row['available_count'] for row in result} if result else {}
+        return dict(self._available)
 
     # Get deployed resources
     def get_deployed_resources(self):
-        result = self.db_manager.execute_query(
-            "SELECT incident_id, resource_type, quantity FROM deployed_resources WHERE returned_at IS NULL"
+        return {incident_id: dict(held) for incident_id, held in self._ledger.items()}
+
+    # Current counts for some resource types, read inside the caller's transaction
+    def _read_counts(self, resource_types):
+        resource_types = list(resource_types)
+        rows = self.db_manager.execute_query(
+            f"SELECT resource_type, available_count FROM resources WHERE resource_type IN ({','.join('?' * len(resource_types))})",
+            tuple(resource_types)
         )
-    
-        deployed = {}
-        if result:
-            for row in result:
-                if row['incident_id'] not in deployed:
-                    deployed[row['incident_id']] = {}
-                deployed[row['incident_id']][row['resource_type']] = row['quantity']
-    
-        return deployed
+        return {row['resource_type']: row['available_count'] for row in rows or []}
+
+    # Update the cache and ledger once a reservation change is committed
+    def _apply(self, incident_id, change, counts):
+        self._available.update(counts)
+        held = self._ledger.setdefault(incident_id, {})
+        for rtype, qty in change.items():
+            held[rtype] = held.get(rtype, 0) + qty
+            if held[rtype] <= 0:
+                del held[rtype]
+        if not held:
+            del self._ledger[incident_id]
     
 #29-User Management System
 class UserManager:
@@ -1310,36 +1686,42 @@ class UserManager:
     
     #Authenticate user credentials
     def authenticate(self, username, password):
-        result = self.db_manager.execute_query(
-            "SELECT * FROM users WHERE username = ? AND password = ?",
-            (username, password)
-        )
+        user = self.db_manager.storage.users.get_by_username(username)
+        if not user:
+            # Same cost as a real check, so timing does not reveal unknown usernames
+            return passwords.dummy_verify(password) or None
 
-        if result and result[0]['password'] == password:
-            return dict(result[0])
-        return None
+        ok, needs_rehash = passwords.verify_password(password, user['password'])
+        if not ok:
+            return None
+        if needs_rehash:
+            self.db_manager.storage.users.set_password(user['id'], passwords.hash_password(password))
+        return user
     
     # Create a new user
     def create_user(self, username, password, role):
         try:
-            self.db_manager.execute_query(
-                "INSERT INTO users (username, password, role) VALUES (?, ?, ?)",
-                (username, password, role)
-            )
+            self.db_manager.storage.users.create(username, passwords.hash_password(password), role, prefix='cli')
             return True
         except sqlite3.IntegrityError:
             return False
 
     # Get all users
     def get_all_users(self):
-        result = self.db_manager.execute_query("SELECT username, role FROM users ORDER BY username")
-        return [dict(row) for row in result] if result else []
+        return [{'username': user['username'], 'role': user['role']}
+                for user in self.db_manager.storage.users.list()]
 
 #30-Responder Management System
 class ResponderManager:
+    # Columns shown in reports and stats (additional_info is left undecoded)
+    SUMMARY_COLUMNS = ("incident_id", "timestamp", "category", "responder_source", "destination", "status")
+
     # Initialize responder manager
-    def __init__(self, db_manager):
+    def __init__(self, db_manager, stats_ttl=CONFIG["RESPONDER_STATS_TTL"]):
         self.db_manager = db_manager
+        self.stats_ttl = stats_ttl
+        self._stats = None
+        self._stats_expires = 0.0
 
     # Log responder action for an incident
     def log_responder_action(self, incident_id, category, action_data):
@@ -1354,6 +1736,7 @@ class ResponderManager:
             (incident_id, category, specific_incident, action_data.get('responder_source'), action_data.get('destination'), 
             action_data.get('purpose'), action_data.get('status'), action_data.get('location'), additional_info)
         )
+        self._stats = None      # next get_responder_stats reflects this action
         
         return True
 
@@ -1376,49 +1759,51 @@ class ResponderManager:
 
     # Get overall responder statistics
     def get_responder_stats(self):
-        """Get statistics about responder actions"""
+        """Get statistics about responder actions (cached for CONFIG["RESPONDER_STATS_TTL"] seconds).
+        Callers must treat the returned dict as read-only."""
+        if self._stats is not None and time.monotonic() < self._stats_expires:
+            return self._stats
+
         stats = {
             "total_incidents": 0,
+            "total_actions": 0,
             "by_category": {},
             "by_status": {},
             "recent_actions": []
         }
-        
-        # Get total incidents with responder actions
-        result = self.db_manager.execute_query(
-            "SELECT COUNT(DISTINCT incident_id) as total FROM responder_actions"
-        )
-        if result:
-            stats["total_incidents"] = result[0]['total']
-        
-        # Get stats by category
-        result = self.db_manager.execute_query(
-            "SELECT category, COUNT(*) as count FROM responder_actions GROUP BY category"
-        )
-        if result:
-            for row in result:
-                stats["by_category"][row['category']] = row['count']
-        
-        # Get stats by status
+
+        # One pass over the covering index gives every count
         result = self.db_manager.execute_query(
-            "SELECT status, COUNT(*) as count FROM responder_actions GROUP BY status"
+            """SELECT category, status, COUNT(*) AS count,
+                      (SELECT COUNT(DISTINCT incident_id) FROM responder_actions) AS total_incidents
+               FROM responder_actions GROUP BY category, status"""
         )
-        if result:
-            for row in result:
-                stats["by_status"][row['status']] = row['count']
-        
-        # Get recent actions
+        for row in result or []:
+            stats["total_incidents"] = row['total_incidents']
+            stats["total_actions"] += row['count']
+            stats["by_category"][row['category']] = stats["by_category"].get(row['category'], 0) + row['count']
+            stats["by_status"][row['status']] = stats["by_status"].get(row['status'], 0) + row['count']
+
+        # Recent actions: only the columns reports show, no JSON decoding
         result = self.db_manager.execute_query(
-            "SELECT * FROM responder_actions ORDER BY timestamp DESC LIMIT 10"
+            f"SELECT {', '.join(self.SUMMARY_COLUMNS)} FROM responder_actions ORDER BY timestamp DESC LIMIT 10"
         )
-        if result:
-            for row in result:
-                action = dict(row)
-                action['additional_info'] = json.loads(action['additional_info']) if action['additional_info'] else {}
-                stats["recent_actions"].append(action)
-        
+        stats["recent_actions"] = [dict(row) for row in result or []]
+
+        self._stats = stats
+        self._stats_expires = time.monotonic() + self.stats_ttl
         return stats
 
+    # Stream actions oldest first, for reports of any size
+    def iter_actions(self, since=None):
+        query = f"SELECT {', '.join(self.SUMMARY_COLUMNS)} FROM responder_actions"
+        params = ()
+        if since:
+            query += " WHERE timestamp >= ?"
+            params = (since,)
+        for row in self.db_manager.iter_query(query + " ORDER BY timestamp", params):
+            yield dict(row)
+
 #31-GLOBAL INSTANCES AND UTILITIES
 db_manager = DatabaseManager()
 user_session = UserSession(db_manager)
@@ -1467,10 +1852,33 @@ def get_feedback(incident_type, specific_incident):
     }
     return feedback_mapping.get(incident_type, {}).get(specific_incident, "Help is on the way. Please remain calm.")
 
-#37-Get next incident number
-def get_next_incident_number():
-    result = db_manager.execute_query("SELECT MAX(incident_number) as max_num FROM incidents")
-    return (result[0]['max_num'] + 1) if result and result[0]['max_num'] else 1
+#37-Incident Records (shared storage)
+def create_incident_record(priority, incident_type, specific_incident, location):
+    """Insert an incident through the shared storage; returns its incident number,
+    the key incident_details, deployed_resources and responder_actions use"""
+    incident = db_manager.storage.incidents.create(
+        type=incident_type,
+        location=location,
+        description=incident_display_names.get(specific_incident, specific_incident),
+        priority=priority,
+        incident_category=incident_type,
+        specific_incident=specific_incident,
+        source='cli'
+    )
+    return incident['incident_number']
+
+def as_cli_incident(incident):
+    """Shared incident record -> the fields the console screens show"""
+    return {
+        'id': incident['incident_number'],
+        'incident_number': incident['incident_number'],
+        'emergency_type': incident['type'],
+        'specific_incident': incident['specific_incident'] or incident['description'],
+        'location': incident['location'],
+        'priority': incident['priority'],
+        'status': incident['status'],
+        'timestamp': (incident['created_at'] or '').replace('T', ' ')[:19]
+    }
 
 #38-Question Asking System
 def ask_questions(questions):
@@ -1515,16 +1923,20 @@ def auto_deploy_resources(incident_type, incident_id):
     }
 
     resources_to_deploy = deployment_rules.get(incident_type, {})
-    for resource, quantity in resources_to_deploy.items():
-        if resource_manager.deploy_resource(resource, incident_id, quantity):
+    if not resources_to_deploy:
+        return
+    # The whole set (e.g. fire truck + ambulance) is reserved together or not at all
+    if resource_manager.reserve(incident_id, resources_to_deploy):
+        for resource, quantity in resources_to_deploy.items():
             print(f"Auto-deployed {quantity} {resource} to incident #{incident_id}")
+    else:
+        available = resource_manager.get_available_resources()
+        short = [r for r, q in resources_to_deploy.items() if available.get(r, 0) < q]
+        print(f"Could not auto-deploy to incident #{incident_id}: not enough {', '.join(short) or 'resources'}")
 
 #41-Log Single Incident to Database
 def log_incident_to_db(responses, incident_type, specific_incident, feedback=None):
     try:
-        # Generate a new incident number
-        incident_number = get_next_incident_number()
-
         # Assign priority based on incident type & responses
         priority = assign_incident_priority(
             incident_type,
@@ -1532,48 +1944,38 @@ def log_incident_to_db(responses, incident_type, specific_incident, feedback=Non
             responses['general_info']
         )
 
-        # Insert into incidents table
-        incident_id = db_manager.execute_query(
-            """INSERT INTO incidents 
-                (incident_number, priority, emergency_type, specific_incident, location) 
-                VALUES (?, ?, ?, ?, ?)""",
-            (
-                incident_number,
+        # The whole report (incident, details, feedback, deployments) commits once
+        with db_manager.transaction():
+            # Insert into incidents table (numbered inside the write lock, so it stays unique)
+            incident_id = create_incident_record(
                 priority,
                 incident_type,
                 specific_incident,
                 responses['general_info'].get('location', 'Unknown')
             )
-        )
-
-        # Insert general information
-        for key, value in responses['general_info'].items():
-            db_manager.execute_query(
-                """INSERT INTO incident_details 
-                    (incident_id, question_key, response, question_type) 
-                    VALUES (?, ?, ?, ?)""",
-                (incident_id, key, value, 'general')
-            )
 
-        # Insert incident-specific information
-        for key, value in responses['incident_info'].items():
-            db_manager.execute_query(
+            # Insert general and incident-specific information
+            details = [(incident_id, key, value, 'general')
+                       for key, value in responses['general_info'].items()]
+            details += [(incident_id, key, value, 'specific')
+                        for key, value in responses['incident_info'].items()]
+            db_manager.execute_many(
                 """INSERT INTO incident_details 
                     (incident_id, question_key, response, question_type) 
                     VALUES (?, ?, ?, ?)""",
-                (incident_id, key, value, 'specific')
+                details
             )
 
-        # Store feedback if provided
-        if feedback:
-            db_manager.execute_query(
-                """INSERT INTO incident_feedback 
-                    (incident_id, feedback) VALUES (?, ?)""",
-                (incident_id, feedback)
-            )
+            # Store feedback if provided
+            if feedback:
+                db_manager.execute_query(
+                    """INSERT INTO incident_feedback 
+                        (incident_id, feedback) VALUES (?, ?)""",
+                    (incident_id, feedback)
+                )
 
-        # Auto-deploy resources
-        auto_deploy_resources(incident_type, incident_id)
+            # Auto-deploy resources
+            auto_deploy_resources(incident_type, incident_id)
 
         return incident_id
 
@@ -1839,11 +2241,8 @@ def show_categorized_responder_menu():
 
 #45-Incident Retrieval
 def get_active_incidents():
-    result = db_manager.execute_query(
-    "SELECT id, incident_number, emergency_type, specific_incident, location, timestamp FROM incidents WHERE status = 'active' ORDER BY timestamp DESC LIMIT ?",
-    (CONFIG["MAX_INCIDENTS_PER_REPORT"],)
-    )
-    return [dict(row) for row in result] if result else []
+    incidents = db_manager.storage.incidents.list_open(limit=CONFIG["MAX_INCIDENTS_PER_REPORT"])
+    return [as_cli_incident(incident) for incident in incidents]
 
 #46-Incident List Display
 def display_incident_list(incidents):
@@ -1859,14 +2258,12 @@ def display_incident_list(incidents):
 #47-Incident Detail View and Recommendations
 def display_incident_details(incident_id, responder_role, responder_category):
     # Get incident details
-    incident_result = db_manager.execute_query(
-    "SELECT * FROM incidents WHERE id = ?", (incident_id,)
-    )
-    if not incident_result:
+    incident = db_manager.storage.incidents.get(int(incident_id))
+    if not incident:
         print("Incident not found.")
         return None, None
 
-    incident = dict(incident_result[0])
+    incident = as_cli_incident(incident)
 
     # Get incident details (questions and responses)
     details_result = db_manager.execute_query(
@@ -1967,15 +2364,11 @@ def handle_responder_input(incidents, responder_role, responder_category):
                             print("Cannot access responder management without incident type and location.")
                     elif action == '5':
                         user_session.log_activity(f"Resolved incident #{incident['id']}")
-                        # Return deployed resources
-                        deployed_resources = resource_manager.get_deployed_resources().get(incident['id'], {})
-                        for resource, count in deployed_resources.items():
-                            resource_manager.return_resource(incident['id'], resource, count)
-                        # Mark incident as resolved
-                        db_manager.execute_query(
-                            "UPDATE incidents SET status = 'resolved' WHERE id = ?",
-                            (incident['id'],)
-                        )
+                        with db_manager.transaction():
+                            # Return deployed resources
+                            resource_manager.release(incident['id'])
+                            # Mark incident as resolved
+                            db_manager.storage.incidents.set_status(incident['id'], CLOSED_STATUS)
                         print("Incident marked as resolved.")
                         return True
                     elif action == '6': break
@@ -2004,16 +2397,13 @@ def show_single_category_menu(responder_role, responder_category):
     # Optionally list active incidents of this category
     list_choice = validate_input("Show active incidents of this category? (y/n): ", validate_yes_no)
     if list_choice.lower() in ('y','yes','y'):
-        result = db_manager.execute_query(
-            "SELECT id, incident_number, specific_incident, location, timestamp FROM incidents WHERE emergency_type = ? AND status = 'active' ORDER BY timestamp DESC",
-            (cat,)
-        )
+        result = db_manager.storage.incidents.list_open(category=cat)
         if not result:
             print("No active incidents for this category.")
             return
         print("\nActive incidents:")
         for row in result:
-            row = dict(row)
+            row = as_cli_incident(row)
             print(f"  ID #{row['id']} - #{row['incident_number']} - {row['specific_incident']} - {row['location']} @ {row['timestamp']}")
 
         # Allow responder to choose an incident to view/manage if the category matches their role
@@ -2025,40 +2415,60 @@ def show_single_category_menu(responder_role, responder_category):
         if responder_role != 'administrator' and responder_category != cat:
             print("Access denied. You can only manage incidents in your assigned category.")
             return
-        incident_rows = db_manager.execute_query("SELECT * FROM incidents WHERE id = ?", (incident_id,))
-        if not incident_rows:
+        if not db_manager.storage.incidents.get(incident_id):
             print("Incident not found.")
             return
         display_incident_details(incident_id, responder_role, responder_category)
 
 #49-Responder Report Generation
-def generate_responder_report():
-    """Generate comprehensive responder management report"""
+def _write_action(out, action):
+    out.write(f"\nTime: {action.get('timestamp', 'N/A')}\n")
+    out.write(f"Incident: #{action.get('incident_id', 'N/A')}\n")
+    out.write(f"Category: {action.get('category', 'N/A')}\n")
+    out.write(f"Responder: {action.get('responder_source', 'N/A')}\n")
+    out.write(f"Destination: {action.get('destination', 'N/A')}\n")
+    out.write(f"Status: {action.get('status', 'N/A')}\n")
+    out.write("-" * 40 + "\n")
+
+def generate_responder_report(path=None, full_history=False, since=None):
+    """Generate comprehensive responder management report.
+    Lines are written as they are produced (to `path`, or stdout), and with
+    full_history every action is streamed from the database in batches,
+    so reports over years of actions never sit in memory."""
     stats = responder_manager.get_responder_stats()
-    report_content = f"""=== RESPONDER MANAGEMENT REPORT ===
-    Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-    Total Incidents Managed: {stats['total_incidents']}
-
-    === Statistics by Category ===
-    """
-    for category, count in stats['by_category'].items():
-        report_content += f"{category}: {count}\n"   
-    report_content += "\n=== Statistics by Status ===\n"
-    for status, count in stats['by_status'].items():
-        report_content += f"{status}: {count}\n"
-
-    report_content += "\n=== Recent Responder Actions ===\n"
-
-    for action in stats['recent_actions']:
-        report_content += f"\nTime: {action.get('timestamp', 'N/A')}\n"
-        report_content += f"Category: {action.get('category', 'N/A')}\n"
-        report_content += f"Responder: {action.get('responder_source', 'N/A')}\n"
-        report_content += f"Destination: {action.get('destination', 'N/A')}\n"
-        report_content += f"Status: {action.get('status', 'N/A')}\n"
-        report_content += "-" * 40 + "\n"
+    out = open(path, "w", encoding="utf-8") if path else sys.stdout
+    try:
+        out.write("=== RESPONDER MANAGEMENT REPORT ===\n")
+        out.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        out.write(f"Total Incidents Managed: {stats['total_incidents']}\n")
+        out.write(f"Total Actions: {stats['total_actions']}\n")
+
+        out.write("\n=== Statistics by Category ===\n")
+        for category, count in stats['by_category'].items():
+            out.write(f"{category}: {count}\n")
+        out.write("\n=== Statistics by Status ===\n")
+        for status, count in stats['by_status'].items():
+            out.write(f"{status}: {count}\n")
+
+        if full_history:
+            out.write(f"\n=== All Responder Actions{f' since {since}' if since else ''} ===\n")
+            actions = responder_manager.iter_actions(since)
+        else:
+            out.write("\n=== Recent Responder Actions ===\n")
+            actions = stats['recent_actions']
+        written = 0
+        for action in actions:
+            _write_action(out, action)
+            written += 1
+    finally:
+        if path:
+            out.close()
+        else:
+            out.flush()
 
-    print(report_content)
-    return report_content    
+    if path:
+        print(f"Report with {written} action(s) written to {path}")
+    return written
 
 #50-View Responder Management Details
 def view_responder_management(incident_id):
@@ -2087,75 +2497,91 @@ def view_responder_management(incident_id):
 
 #51-Daily Reporting
 def generate_daily_report():
-    today = datetime.now().strftime("%Y-%m-%d")
-
-    # Get today's incidents
-    incidents_result = db_manager.execute_query(
-        "SELECT emergency_type, COUNT(*) as count FROM incidents WHERE DATE(timestamp) = ? GROUP BY emergency_type",
-        (today,)
-    )
+    start, end = day_range(datetime.now())
+    return generate_report(start, end)
+
+def generate_report(start, end, granularity="day", export_path=None):
+    """Incident report for start <= time < end, bucketed by granularity; optionally exported to CSV/JSON"""
+    rows = db_manager.incident_report(start, end, granularity)
+    by_status = ReportEngine.totals(rows, "status")
+    by_category = ReportEngine.totals(rows, "category")
+    by_period = ReportEngine.totals(rows, "period")
+
+    last_day = (end - timedelta(days=1)).strftime("%Y-%m-%d")
+    first_day = start.strftime("%Y-%m-%d")
+    span = first_day if first_day == last_day else f"{first_day} to {last_day}"
+    title = "Daily Incident Report" if first_day == last_day else "Incident Report"
+    report_content = f"{title} - {span}\n{'='*50}\n\n"
+
+    report_content += f"Total Incidents: {sum(by_period.values())}\n"
+    report_content += f"Active Incidents: {sum(by_status.get(s, 0) for s in OPEN_STATUSES)}\n"
+    report_content += f"Resolved Incidents: {by_status.get(CLOSED_STATUS, 0)}\n\n"
+
+    if by_category:
+        report_content += "Incidents by Category:\n"
+        for category, count in sorted(by_category.items()):
+            report_content += f"  {category}: {count}\n"
 
-    # Get resolved incidents
-    resolved_result = db_manager.execute_query(
-        "SELECT COUNT(*) as count FROM incidents WHERE status = 'resolved' AND DATE(timestamp) = ?",
-        (today,)
-    )
+    if len(by_period) > 1:
+        report_content += f"\nIncidents per {granularity}:\n"
+        for period, count in by_period.items():
+            report_content += f"  {period}: {count}\n"
 
-    # Get active incidents
-    active_result = db_manager.execute_query(
-        "SELECT COUNT(*) as count FROM incidents WHERE status = 'active' AND DATE(timestamp) = ?",
-        (today,)
-    )
+    print(report_content)
 
-    report_content = f"Daily Incident Report - {today}\n{'='*50}\n\n"
+    if export_path:
+        try:
+            db_manager.report_engine.export(rows, export_path, start=start, end=end, granularity=granularity)
+            print(f"Report exported to {export_path}")
+        except OSError as e:
+            print(f"Could not export report: {e}")
+    return report_content
 
-    if resolved_result and active_result:
-        total_incidents = resolved_result[0]['count'] + active_result[0]['count']
-        report_content += f"Total Incidents: {total_incidents}\n"
-        report_content += f"Active Incidents: {active_result[0]['count']}\n"
-        report_content += f"Resolved Incidents: {resolved_result[0]['count']}\n\n"
+def report_menu():
+    """Ask for a date range, granularity and optional export file, then run the report"""
+    today = datetime.now().strftime("%Y-%m-%d")
+    try:
+        start = datetime.strptime(input(f"Start date (YYYY-MM-DD, blank = {today}): ").strip() or today, "%Y-%m-%d")
+        end_text = input("End date, inclusive (YYYY-MM-DD, blank = start date): ").strip()
+        end = datetime.strptime(end_text, "%Y-%m-%d") if end_text else start
+    except ValueError:
+        print("Invalid date. Use YYYY-MM-DD.")
+        return
+    if end < start:
+        print("End date is before start date.")
+        return
 
-    if incidents_result:
-        report_content += "Incidents by Category:\n"
-        for row in incidents_result:
-            report_content += f"  {row['emergency_type']}: {row['count']}\n"
+    granularity = input(f"Group by ({'/'.join(GRANULARITIES)}, blank = day): ").strip().lower() or "day"
+    if granularity not in GRANULARITIES:
+        print("Invalid grouping.")
+        return
 
-    print(report_content)
-    return report_content
+    export_path = input("Export to file (.csv or .json, leave blank to skip): ").strip()
+    generate_report(start, end + timedelta(days=1), granularity, export_path or None)
 
 #52-System Statistics
 def show_system_statistics():
     print("\n=== System Statistics ===")
 
     # Get incident counts
-    active_result = db_manager.execute_query("SELECT COUNT(*) as count FROM incidents WHERE status = 'active'")
-    resolved_result = db_manager.execute_query("SELECT COUNT(*) as count FROM incidents WHERE status = 'resolved'")
+    active_incidents, resolved_incidents = db_manager.storage.incidents.open_and_closed()
+    print(f"Active Incidents: {active_incidents}")
+    print(f"Resolved Incidents: {resolved_incidents}")
+    print(f"Total Incidents: {active_incidents + resolved_incidents}")
 
-    if active_result and resolved_result:
-        active_incidents = active_result[0]['count']
-        resolved_incidents = resolved_result[0]['count']
-        print(f"Active Incidents: {active_incidents}")
-        print(f"Resolved Incidents: {resolved_incidents}")
-        print(f"Total Incidents: {active_incidents + resolved_incidents}")
-
-    # Get resource status
+    # Get resource status (deployed = total - available, no walk over deployments)
     print("\nResource Status:")
-    available = resource_manager.get_available_resources()
-    deployed = resource_manager.get_deployed_resources()
-
-    for resource, count in available.items():
-        deployed_count = sum(incident_resources.get(resource, 0) for incident_resources in deployed.values())
-        print(f"  {resource}: {count} available, {deployed_count} deployed")
+    for row in resource_manager.usage.summary():
+        print(f"  {row['resource_type']}: {row['available']} available, "
+              f"{row['total'] - row['available']} deployed")
 
     # Get incidents by category
-    category_result = db_manager.execute_query(
-        "SELECT emergency_type, COUNT(*) as count FROM incidents GROUP BY emergency_type"
-    )
+    category_result = db_manager.storage.incidents.count_by_category()
 
     if category_result:
         print("\nIncidents by Category:")
-        for row in category_result:
-            print(f"  {row['emergency_type']}: {row['count']}")
+        for category, count in sorted(category_result.items()):
+            print(f"  {category}: {count}")
 
 #53-User Management
 def manage_users_menu():
@@ -2200,6 +2626,26 @@ def show_resource_status():
             for resource, count in resources.items(): print(f"    {resource}: {count}")
     else: print("  No resources currently deployed")
 
+#54a-Resource Utilisation Display
+def show_resource_utilisation(hours=24):
+    print(f"\n=== Resource Utilisation (last {hours}h) ===")
+    for row in resource_manager.usage.summary(hours):
+        pct = row['percentiles']
+        forecast = row['forecast']
+        print(f"\n{row['resource_type']}: {row['available']}/{row['total']} available, "
+              f"peak in use {row['peak_occupied']}")
+        if pct[50] is not None:
+            print(f"  In use  p50: {pct[50]}  p90: {pct[90]}  p99: {pct[99]}")
+        if forecast:
+            print(f"  Exhaustion forecast: {forecast['eta']:%Y-%m-%d %H:%M} "
+                  f"(net {forecast['rate_per_hour']:.1f}/h, {forecast['hours_left']:.1f}h left)")
+        else:
+            print("  Exhaustion forecast: not trending towards exhaustion")
+        series = resource_manager.usage.snapshots(row['resource_type'], hours)
+        if series:
+            print("  Available per bucket (min-max): " + "  ".join(
+                f"{datetime.fromtimestamp(b):%H:%M} {lo}-{hi}" for b, lo, hi, _ in series[-8:]))
+
 #55-Multi-Incident Reporting System
 def handle_multi_incident_report():
     """Handle reporting of multiple incidents across categories in one go"""
@@ -2326,74 +2772,71 @@ def handle_multi_incident_report():
 def log_multi_incident_report(incident_reports):
     """Log multiple incidents with consolidated emergency instructions"""
     try:
-        incident_number = get_next_incident_number()
+        # One transaction per report: a crash part-way leaves nothing behind
+        with db_manager.transaction():
+            return _log_multi_incident_report(incident_reports)
 
-        # If only one incident, use its type and specific_incident
-        if len(incident_reports) == 1:
-            main_type = incident_reports[0]['incident_type']
-            main_specific = incident_reports[0]['specific_incident']
-        else:
-            main_type = "multi"
-            main_specific = "multiple_incidents"
-
-        # Create a consolidated incident record
-        # Insert a single consolidated incident record. If only one incident was reported
-        # we'll keep its type; for multiple incidents we'll use the "multi" marker.
-        consolidated_type = main_type if len(incident_reports) == 1 else "multi"
-        consolidated_specific = main_specific if len(incident_reports) == 1 else "multiple_incidents"
-
-        incident_id = db_manager.execute_query(
-            """INSERT INTO incidents 
-            (incident_number, priority, emergency_type, specific_incident, location) 
-            VALUES (?, ?, ?, ?, ?)""",
-            (incident_number, "High", consolidated_type, consolidated_specific, incident_reports[0]['general_info']['location'])
-        )
-        
-        # Add general information
-        for key, value in incident_reports[0]['general_info'].items():
-            db_manager.execute_query(
-                "INSERT INTO incident_details (incident_id, question_key, response, question_type) VALUES (?, ?, ?, ?)",
-                (incident_id, key, value, 'general')
-            )
-        
-        # Add incident-specific information for each incident
-        for report in incident_reports:
-            # Store the incident type and specific incident
-            db_manager.execute_query(
-                "INSERT INTO incident_details (incident_id, question_key, response, question_type) VALUES (?, ?, ?, ?)",
-                (incident_id, f"{report['incident_type']}_type", report['specific_incident'], 'multi')
-            )
-            
-            # Store the incident details
-            for key, value in report['incident_info'].items():
-                db_manager.execute_query(
-                    "INSERT INTO incident_details (incident_id, question_key, response, question_type) VALUES (?, ?, ?, ?)",
-                    (incident_id, f"{report['incident_type']}_{key}", value, 'multi')
-                )
-        
-        # Auto-deploy resources for the highest priority incident
-        highest_priority = "Medium"
-        for report in incident_reports:
-            priority = assign_incident_priority(report['incident_type'], report['specific_incident'], report['general_info'])
-            if priority == "Critical":
-                highest_priority = "Critical"
-                break
-            elif priority == "High" and highest_priority != "Critical":
-                highest_priority = "High"
-        
-        # Deploy resources based on the highest priority incident type
-        for report in incident_reports:
-            priority = assign_incident_priority(report['incident_type'], report['specific_incident'], report['general_info'])
-            if priority == highest_priority:
-                auto_deploy_resources(report['incident_type'], incident_id)
-                break
-        
-        return incident_id
-        
     except Exception as e:
         print(f"Error logging incident report: {e}")
         return None
 
+def _log_multi_incident_report(incident_reports):
+    """Write one consolidated report; runs inside log_multi_incident_report's transaction"""
+    # If only one incident, use its type and specific_incident
+    if len(incident_reports) == 1:
+        main_type = incident_reports[0]['incident_type']
+        main_specific = incident_reports[0]['specific_incident']
+    else:
+        main_type = "multi"
+        main_specific = "multiple_incidents"
+
+    # Create a consolidated incident record
+    # Insert a single consolidated incident record. If only one incident was reported
+    # we'll keep its type; for multiple incidents we'll use the "multi" marker.
+    consolidated_type = main_type if len(incident_reports) == 1 else "multi"
+    consolidated_specific = main_specific if len(incident_reports) == 1 else "multiple_incidents"
+
+    incident_id = create_incident_record(
+        "High", consolidated_type, consolidated_specific, incident_reports[0]['general_info']['location']
+    )
+    
+    # Add general information
+    details = [(incident_id, key, value, 'general')
+               for key, value in incident_reports[0]['general_info'].items()]
+    
+    # Add incident-specific information for each incident
+    for report in incident_reports:
+        # Store the incident type and specific incident
+        details.append((incident_id, f"{report['incident_type']}_type", report['specific_incident'], 'multi'))
+        
+        # Store the incident details
+        for key, value in report['incident_info'].items():
+            details.append((incident_id, f"{report['incident_type']}_{key}", value, 'multi'))
+
+    db_manager.execute_many(
+        "INSERT INTO incident_details (incident_id, question_key, response, question_type) VALUES (?, ?, ?, ?)",
+        details
+    )
+    
+    # Auto-deploy resources for the highest priority incident
+    highest_priority = "Medium"
+    for report in incident_reports:
+        priority = assign_incident_priority(report['incident_type'], report['specific_incident'], report['general_info'])
+        if priority == "Critical":
+            highest_priority = "Critical"
+            break
+        elif priority == "High" and highest_priority != "Critical":
+            highest_priority = "High"
+    
+    # Deploy resources based on the highest priority incident type
+    for report in incident_reports:
+        priority = assign_incident_priority(report['incident_type'], report['specific_incident'], report['general_info'])
+        if priority == highest_priority:
+            auto_deploy_resources(report['incident_type'], incident_id)
+            break
+    
+    return incident_id
+
 #57-Reporter Mode
 def handle_reporter_mode():
     """Main function for reporter operations - Now only multi-incident reporting"""
@@ -2480,26 +2923,31 @@ def show_advanced_menu():
     while True:
         print("\n=== Advanced Menu ===")
         print("1. View System Statistics")
-        print("2. Generate Daily Report")
+        print("2. Generate Incident Report")
         print("3. View Session History")
         print("4. Manage Users")
         print("5. View Resource Status")
         print("6. Responder Management Report")
         print("7. View Responder Actions")
-        print("8. Return to Main Menu")
-        choice = input("Enter your choice (1-8): ")
+        print("8. View Resource Utilisation")
+        print("9. Return to Main Menu")
+        choice = input("Enter your choice (1-9): ")
         if choice == '1': show_system_statistics()
-        elif choice == '2': generate_daily_report()
+        elif choice == '2': report_menu()
         elif choice == '3': user_session.show_session_summary()
         elif choice == '4': manage_users_menu()
         elif choice == '5': show_resource_status()
-        elif choice == '6': generate_responder_report()
+        elif choice == '6':
+            path = input("Save report to file (leave blank to display): ").strip()
+            full = input("Include every action, not just recent ones? (y/n): ").strip().lower() in ('y', 'yes')
+            generate_responder_report(path or None, full_history=full)
         elif choice == '7':
             incident_id = input("Enter incident ID to view actions: ")
             if incident_id.isdigit():
                 view_responder_management(int(incident_id))
-        elif choice == '8': break
-        else: print("Invalid choice. Please enter a number between 1-8.")
+        elif choice == '8': show_resource_utilisation()
+        elif choice == '9': break
+        else: print("Invalid choice. Please enter a number between 1-9.")
 
 #60-Main Function
 def main():
@@ -0,0 +1,97 @@
+"""
+Reports-per-second for the app_17 CLI incident logging.
+
+Compares the old write pattern (every INSERT/UPDATE committed on its own,
+as execute_query did before transactions existed) with the current
+log_multi_incident_report, which commits each report once.
+
+    python benchmarks/report_logging.py [--reports 200] [--incidents 3]
+"""
+import argparse
+import importlib
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_app(workdir):
+    """Import app_17 with its module-level database created inside workdir."""
+    sys.path.insert(0, ROOT)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        return importlib.import_module("app_17")
+    finally:
+        os.chdir(cwd)
+
+
+def sample_reports(incidents):
+    kinds = [("medical", "cardiac_arrest"), ("fire", "building_fire"),
+             ("traffic", "car_accident"), ("police", "robbery")]
+    general = {"location": "12 Station Road", "phone": "01710000001",
+               "is_anyone_injured": "yes", "caller_name": "Benchmark"}
+    return [{
+        "incident_type": kind,
+        "specific_incident": specific,
+        "general_info": dict(general),
+        "incident_info": {f"question_{q}": f"answer {q}" for q in range(8)},
+        "feedback": None,
+    } for kind, specific in (kinds[i % len(kinds)] for i in range(incidents))]
+
+
+def log_per_statement(app, reports):
+    """The pre-transaction write pattern: one commit per statement."""
+    db = app.db_manager
+    incident_id = app.create_incident_record("High", "multi", "multiple_incidents",
+                                             reports[0]["general_info"]["location"])
+    insert = ("INSERT INTO incident_details (incident_id, question_key, response, question_type) "
+              "VALUES (?, ?, ?, ?)")
+    for key, value in reports[0]["general_info"].items():
+        db.execute_query(insert, (incident_id, key, value, "general"))
+    for report in reports:
+        db.execute_query(insert, (incident_id, f"{report['incident_type']}_type",
+                                  report["specific_incident"], "multi"))
+        for key, value in report["incident_info"].items():
+            db.execute_query(insert, (incident_id, f"{report['incident_type']}_{key}", value, "multi"))
+    for resource in ("fire_trucks", "ambulances"):
+        db.execute_query("UPDATE resources SET available_count = available_count - 0 WHERE resource_type = ?",
+                         (resource,))
+        db.execute_query("INSERT INTO deployed_resources (incident_id, resource_type, quantity) VALUES (?, ?, ?)",
+                         (incident_id, resource, 0))
+    return incident_id
+
+
+def run(label, fn, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        if fn() is None:
+            raise RuntimeError(f"{label}: a report failed to log")
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22} {count / elapsed:9.1f} reports/s  ({elapsed * 1000 / count:.2f} ms each)")
+    return count / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reports", type=int, default=200)
+    parser.add_argument("--incidents", type=int, default=3, help="incidents per report")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        app = load_app(workdir)
+        reports = sample_reports(args.incidents)
+        # keep the auto-deploy messages out of the timing output
+        app.print = lambda *a, **k: None
+
+        before = run("commit per statement", lambda: log_per_statement(app, reports), args.reports)
+        after = run("one commit per report", lambda: app.log_multi_incident_report(reports), args.reports)
+        app.db_manager.close()
+
+    print(f"speed-up: {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Load generator: fills a GUI database with users and incidents.
+
+Incident types come from incident_data.incident_categories and their
+priorities from get_incident_priority. Locations are gazetteer places
+with a little jitter, and created_at is spread over the past days, so
+clustering, geo lookups and reports see realistic data. Everything goes
+through the Database API, so event logs and user stats are kept too.
+
+    python benchmarks/seed.py --db /tmp/load.db [--reporters 50] [--responders 20] [--incidents 2000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = os.path.join(ROOT, "emergency_response_app")
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+import geo                                                     # noqa: E402
+from database import Database                                  # noqa: E402
+from incident_data import incident_categories, get_incident_priority  # noqa: E402
+from models import User, Incident                              # noqa: E402
+
+# Share of seeded incidents left in each status
+STATUS_MIX = (("pending", 0.35), ("assigned", 0.15), ("ongoing", 0.2), ("solved", 0.3))
+JITTER_DEG = 0.02           # ~2 km around the gazetteer point
+
+
+def make_user(db, role, index, category=""):
+    user = User(
+        id=db.get_next_user_id(role),
+        name=f"Bench {role.title()} {index}",
+        username=f"bench_{role}_{index}",
+        email=f"bench_{role}_{index}@example.com",
+        password="not-a-real-hash",
+        role=role,
+        phone=f"0170{index:07d}",
+        responder_category=category,
+    )
+    db.create_user(user)
+    return user
+
+
+def seed(db, reporters=50, responders=20, incidents=2000, days=30, rng=None):
+    """
+    Create the users and incidents; returns {"admin", "reporters",
+    "responders", "incidents", "timings"} (timings in seconds).
+    """
+    rng = rng or random.Random(0)
+    categories = sorted(incident_categories)
+    places = sorted(geo.Gazetteer().places.items())
+    statuses, weights = zip(*STATUS_MIX)
+    now = datetime.now()
+
+    start = time.perf_counter()
+    admin = make_user(db, "admin", 0)
+    reporter_users = [make_user(db, "reporter", i) for i in range(reporters)]
+    responder_users = [make_user(db, "responder", i, categories[i % len(categories)])
+                       for i in range(responders)]
+    users_s = time.perf_counter() - start
+
+    by_category = {}
+    for responder in responder_users:
+        by_category.setdefault(responder.responder_category, []).append(responder)
+
+    created, create_s, update_s = [], 0.0, 0.0
+    for n in range(incidents):
+        category = rng.choice(categories)
+        incident_type = rng.choice(incident_categories[category])
+        place, (lat, lon) = rng.choice(places)
+        reporter = rng.choice(reporter_users)
+        created_at = now - timedelta(minutes=rng.uniform(0, days * 24 * 60))
+        incident = Incident(
+            id=db.get_next_incident_id(),
+            type=incident_type,
+            location=f"{n % 200 + 1} Road, {place.title()}",
+            description=f"Benchmark report {n}",
+            priority=get_incident_priority(incident_type),
+            reporter_id=reporter.id,
+            reporter_name=reporter.name,
+            incident_category=category,
+            created_at=created_at,
+            updated_at=created_at,
+            latitude=lat + rng.uniform(-JITTER_DEG, JITTER_DEG),
+            longitude=lon + rng.uniform(-JITTER_DEG, JITTER_DEG),
+        )
+        t0 = time.perf_counter()
+        db.create_incident(incident)
+        create_s += time.perf_counter() - t0
+
+        status = rng.choices(statuses, weights)[0]
+        candidates = by_category.get(category)
+        if status != "pending" and candidates and not incident.cluster_id:
+            responder = rng.choice(candidates)
+            incident.status = status
+            incident.responder_id = responder.id
+            incident.responder_name = responder.name
+            incident.updated_at = created_at + timedelta(minutes=rng.uniform(1, 240))
+            t0 = time.perf_counter()
+            db.update_incident(incident, actor=responder)
+            update_s += time.perf_counter() - t0
+        created.append(incident)
+
+    return {
+        "admin": admin,
+        "reporters": reporter_users,
+        "responders": responder_users,
+        "incidents": created,
+        "timings": {"users": users_s, "create_incident": create_s, "update_incident": update_s},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", required=True, help="database file (created if missing)")
+    parser.add_argument("--reporters", type=int, default=50)
+    parser.add_argument("--responders", type=int, default=20)
+    parser.add_argument("--incidents", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=30, help="spread created_at over this many days")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    args = parser.parse_args()
+
+    data = seed(Database(args.db), args.reporters, args.responders, args.incidents,
+                args.days, random.Random(args.seed))
+    timings = data["timings"]
+    print(f"{len(data['reporters'])} reporters, {len(data['responders'])} responders, "
+          f"{len(data['incidents'])} incidents in {args.db}")
+    print(f"create_incident {len(data['incidents']) / timings['create_incident']:.1f}/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+"""
+End-to-end throughput of the GUI data layer, written to JSON.
+
+Seeds a fresh database (benchmarks/seed.py), then measures:
+  api     Database calls the pages make (create, get_all, by reporter /
+          responder, by id, update, status counts)
+  pages   load_data / refresh of each dashboard page, headless
+          (QT_QPA_PLATFORM=offscreen; skipped when PyQt5 is missing)
+  claims  N responders of one category claiming pending incidents
+          concurrently, the way ResponderAvailablePage accepts them
+
+    python benchmarks/throughput.py [--incidents 2000] [--responders-claiming 8]
+                                    [--output results.json] [--compare previous.json]
+
+--compare prints the mean-time ratio of every measurement against an
+earlier results file, so runs from two commits can be set side by side.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from seed import ROOT, seed, make_user
+from database import Database
+from models import Incident
+from incident_data import incident_categories, get_incident_priority
+
+
+def summarize(samples, rows=None):
+    """Timing stats (ms) for a list of durations in seconds."""
+    ordered = sorted(samples)
+    total = sum(ordered)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000
+
+    stats = {
+        "calls": len(ordered),
+        "total_s": round(total, 4),
+        "mean_ms": round(total / len(ordered) * 1000, 3),
+        "p50_ms": round(pct(50), 3),
+        "p95_ms": round(pct(95), 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+        "ops_per_s": round(len(ordered) / total, 1) if total else None,
+    }
+    if rows is not None:
+        stats["rows_per_call"] = round(rows / len(ordered), 1)
+    return stats
+
+
+def timed(fn, args_list):
+    """Call fn(*args) for each args tuple; returns (durations, rows returned)."""
+    samples, rows = [], 0
+    for args in args_list:
+        t0 = time.perf_counter()
+        result = fn(*args)
+        samples.append(time.perf_counter() - t0)
+        if isinstance(result, list):
+            rows += len(result)
+    return samples, rows
+
+
+# -----------------------
+# API
+# -----------------------
+def bench_api(db, data, repeat, rng):
+    reporters, responders = data["reporters"], data["responders"]
+    incidents = data["incidents"]
+    statuses = ("pending", "assigned", "ongoing", "solved")
+    results = {}
+
+    def run(name, fn, args_list):
+        samples, rows = timed(fn, args_list)
+        results[name] = summarize(samples, rows if rows else None)
+
+    run("get_all_incidents", db.get_all_incidents, [()] * repeat)
+    run("get_incidents_by_reporter", db.get_incidents_by_reporter,
+        [(rng.choice(reporters).id,) for _ in range(repeat)])
+    run("get_incidents_by_responder", db.get_incidents_by_responder,
+        [(rng.choice(responders).id,) for _ in range(repeat)])
+    run("get_incident_by_id", db.get_incident_by_id,
+        [(rng.choice(incidents).id,) for _ in range(repeat)])
+    run("get_incident_count_by_status", db.get_incident_count_by_status,
+        [(statuses[i % len(statuses)],) for i in range(repeat)])
+
+    def touch(incident):
+        incident.description += "."
+        incident.updated_at = datetime.now()
+        db.update_incident(incident)
+    run("update_incident", touch, [(rng.choice(incidents),) for _ in range(repeat)])
+
+    def create(n):
+        category = rng.choice(sorted(incident_categories))
+        incident_type = rng.choice(incident_categories[category])
+        reporter = rng.choice(reporters)
+        db.create_incident(Incident(
+            id=db.get_next_incident_id(), type=incident_type, location="Dhaka",
+            description=f"Benchmark create {n}", priority=get_incident_priority(incident_type),
+            reporter_id=reporter.id, reporter_name=reporter.name, incident_category=category,
+        ))
+    run("create_incident", create, [(n,) for n in range(repeat)])
+    return results
+
+
+# -----------------------
+# PAGES
+# -----------------------
+def bench_pages(db, data, repeat):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    try:
+        from PyQt5.QtWidgets import QApplication
+    except ImportError as e:
+        return {"skipped": f"PyQt5 unavailable: {e}"}
+
+    from admin.admin_analytics import AdminAnalytics
+    from admin.admin_dashboard import AdminDashboard
+    from reporter.reporter_dashboard import ReporterDashboard
+    from reporter.reporter_history_page import ReporterHistoryPage
+    from responder.responder_assignments_page import ResponderAssignmentsPage
+    from responder.responder_available_page import ResponderAvailablePage
+    from responder.responder_dashboard import ResponderDashboard
+
+    app = QApplication.instance() or QApplication([])
+    reporter, responder, admin = data["reporters"][0], data["responders"][0], data["admin"]
+    pages = [
+        ("ReporterDashboard.load_data", lambda: ReporterDashboard(reporter, db), "load_data"),
+        ("ReporterHistoryPage.load_data", lambda: ReporterHistoryPage(reporter, db), "load_data"),
+        ("ResponderDashboard.load_data", lambda: ResponderDashboard(responder, db), "load_data"),
+        ("ResponderAssignmentsPage.load_data", lambda: ResponderAssignmentsPage(responder, db), "load_data"),
+        ("ResponderAvailablePage.load_data", lambda: ResponderAvailablePage(responder, db), "load_data"),
+        ("AdminDashboard.load_data", lambda: AdminDashboard(admin, db), "load_data"),
+        ("AdminAnalytics.refresh", lambda: AdminAnalytics(db), "refresh"),
+    ]
+    results = {}
+    for name, build, method in pages:
+        t0 = time.perf_counter()
+        page = build()
+        construct_s = time.perf_counter() - t0
+        for timer_name in ("timer", "_timer", "feed"):     # measure our calls only
+            timer = getattr(page, timer_name, None)
+            if timer is not None:
+                timer.stop()
+        samples, _ = timed(getattr(page, method), [()] * repeat)
+        results[name] = summarize(samples)
+        results[name]["construct_ms"] = round(construct_s * 1000, 3)
+        page.deleteLater()
+        app.processEvents()
+    return results
+
+
+# -----------------------
+# CLAIMS
+# -----------------------
+def simulate_claims(db_name, data, responders, claims_each, rng):
+    """
+    `responders` new responders, all in the category with the most pending
+    incidents, each claiming up to `claims_each` incidents at once. Each
+    claim re-reads the list and accepts one of the newest, like a user
+    clicking Accept. Incidents accepted by more than one responder are
+    reported as double claims.
+    """
+    pending = Counter(i.incident_category for i in Database(db_name).get_all_incidents()
+                      if i.status == "pending" and not i.cluster_id)
+    if not pending:
+        return {"skipped": "no pending incidents"}
+    category = pending.most_common(1)[0][0]
+
+    setup_db = Database(db_name)
+    users = [make_user(setup_db, "responder", 1000 + n, category) for n in range(responders)]
+    barrier = threading.Barrier(responders)
+    lock = threading.Lock()
+    claims, samples, errors = [], [], Counter()
+
+    def responder_loop(user, seed_value):
+        local_rng = random.Random(seed_value)
+        db = Database(db_name)
+        barrier.wait()
+        for _ in range(claims_each):
+            t0 = time.perf_counter()
+            try:
+                available = [i for i in db.get_all_incidents()
+                             if i.status == "pending" and not i.cluster_id
+                             and i.incident_category == category]
+                if not available:
+                    break
+                incident = local_rng.choice(available[:5])
+                incident.responder_id, incident.responder_name = user.id, user.name
+                incident.status = "ongoing"
+                incident.updated_at = datetime.now()
+                user.active_incidents += 1
+                user.status = "busy"
+                db.update_incident(incident, actor=user)
+                db.update_user(user)
+            except sqlite3.OperationalError as e:
+                with lock:
+                    errors[str(e)] += 1
+                continue
+            elapsed = time.perf_counter() - t0
+            with lock:
+                claims.append(incident.id)
+                samples.append(elapsed)
+
+    threads = [threading.Thread(target=responder_loop, args=(user, rng.random()))
+               for user in users]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    result = {
+        "category": category,
+        "responders": responders,
+        "pending_at_start": pending[category],
+        "claims": len(claims),
+        "double_claims": sum(1 for n in Counter(claims).values() if n > 1),
+        "errors": dict(errors),
+        "wall_s": round(wall, 4),
+        "claims_per_s": round(len(claims) / wall, 1) if wall else None,
+    }
+    if samples:
+        result["latency"] = summarize(samples)
+    return result
+
+
+# -----------------------
+# REPORT
+# -----------------------
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, previous_path):
+    with open(previous_path, encoding="utf-8") as f:
+        previous = json.load(f)
+    print(f"\nvs {previous_path} ({previous['meta'].get('commit')}): mean time ratio, <1 is faster")
+    for section in ("api", "pages"):
+        for name, stats in current.get(section, {}).items():
+            before = previous.get(section, {}).get(name)
+            if isinstance(stats, dict) and isinstance(before, dict) and before.get("mean_ms"):
+                print(f"  {section:<6}{name:<38} {stats['mean_ms'] / before['mean_ms']:6.2f}x")
+    now, before = current.get("claims", {}), previous.get("claims", {})
+    if now.get("claims_per_s") and before.get("claims_per_s"):
+        print(f"  claims/s {before['claims_per_s']} -> {now['claims_per_s']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reporters", type=int, default=50)
+    parser.add_argument("--responders", type=int, default=20)
+    parser.add_argument("--incidents", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=50, help="calls per measurement")
+    parser.add_argument("--responders-claiming", type=int, default=8)
+    parser.add_argument("--claims", type=int, default=10, help="claims per responder")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-pages", action="store_true")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", metavar="FILE", help="earlier results to compare against")
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        db_name = os.path.join(workdir, "bench.db")
+        db = Database(db_name)
+        data = seed(db, args.reporters, args.responders, args.incidents, rng=rng)
+        results = {
+            "meta": {
+                "commit": git_commit(),
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "sqlite": sqlite3.sqlite_version,
+                "platform": platform.platform(),
+                "args": vars(args),
+            },
+            "seed": {name: round(seconds, 4) for name, seconds in data["timings"].items()},
+        }
+        results["api"] = bench_api(db, data, args.repeat, rng)
+        results["pages"] = ({"skipped": "--skip-pages"} if args.skip_pages
+                            else bench_pages(db, data, max(1, args.repeat // 5)))
+        results["claims"] = simulate_claims(db_name, data, args.responders_claiming, args.claims, rng)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    for section in ("api", "pages"):
+        for name, stats in results[section].items():
+            if isinstance(stats, dict):
+                print(f"{section:<6}{name:<38} {stats['mean_ms']:9.3f} ms  p95 {stats['p95_ms']:9.3f} ms")
+            else:
+                print(f"{section:<6}{name}: {stats}")
+    claims = results["claims"]
+    if "claims" in claims:
+        print(f"claims {claims['claims']} by {claims['responders']} responders, "
+              f"{claims['claims_per_s']}/s, {claims['double_claims']} double, "
+              f"{sum(claims['errors'].values())} errors")
+    print(f"results written to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
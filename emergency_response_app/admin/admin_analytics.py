@@ -307,28 +307,6 @@ def _agg_by_priority(incidents):
     return dict(counts)
 
 
-def _agg_time_series(incidents, period="daily"):
-    """Return list of (datetime, count) sorted ascending."""
-    buckets = defaultdict(int)
-    now     = datetime.now()
-
-    for inc in incidents:
-        dt = inc.created_at if inc.created_at else now
-        if period == "daily":
-            key = dt.replace(hour=0, minute=0, second=0, microsecond=0)
-        elif period == "weekly":
-            key = (dt - timedelta(days=dt.weekday())).replace(
-                hour=0, minute=0, second=0, microsecond=0
-            )
-        elif period == "monthly":
-            key = dt.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        else:  # yearly
-            key = dt.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
-        buckets[key] += 1
-
-    return sorted(buckets.items())
-
-
 # ─────────────────────────────────────────────────────────────────────────────
 # Main Analytics Page
 # ─────────────────────────────────────────────────────────────────────────────
@@ -399,7 +377,7 @@ class AdminAnalytics(QWidget):
         self._stack = QStackedWidget()
 
         tabs = _TabBar(
-            ["Incident analysis", "Responder analysis", "Reporter analysis"],
+            ["Incident analysis", "Responder analysis", "Reporter analysis", "Resource analysis"],
             self._stack.setCurrentIndex
         )
         self._body_lay.addWidget(tabs)
@@ -409,10 +387,12 @@ class AdminAnalytics(QWidget):
         self._inc_page  = self._build_incident_page()
         self._resp_page = self._build_responder_page()
         self._rep_page  = self._build_reporter_page()
+        self._res_page  = self._build_resource_page()
 
         self._stack.addWidget(self._inc_page)
         self._stack.addWidget(self._resp_page)
         self._stack.addWidget(self._rep_page)
+        self._stack.addWidget(self._res_page)
 
         scroll.setWidget(body)
         root.addWidget(scroll)
@@ -490,7 +470,7 @@ class AdminAnalytics(QWidget):
         trend_hdr.addStretch()
         self._trend_period = _TabBar(
             ["Daily", "Weekly", "Monthly", "Yearly"],
-            lambda i: self._redraw_trend(["daily","weekly","monthly","yearly"][i])
+            lambda i: self._redraw_trend(["day", "week", "month", "year"][i])
         )
         trend_hdr.addWidget(self._trend_period)
         trend_lay.addLayout(trend_hdr)
@@ -528,7 +508,7 @@ class AdminAnalytics(QWidget):
 
     def _redraw_trend(self, period):
         chart_view = _build_line_chart(
-            _agg_time_series(self._incidents, period),
+            self.db.get_incident_trend(granularity=period),
             label="Incidents", color="#3498db"
         )
         chart_view.setMinimumHeight(260)
@@ -620,6 +600,62 @@ class AdminAnalytics(QWidget):
         lay.addStretch()
         return pg
 
+    # ── resource section ──────────────────────────────────────────────────────
+
+    def _build_resource_page(self):
+        pg  = QWidget()
+        lay = QVBoxLayout(pg)
+        lay.setContentsMargins(0, 0, 0, 0)
+        lay.setSpacing(12)
+
+        card = _Card()
+        c_lay = QVBoxLayout(card)
+        c_lay.setContentsMargins(16, 14, 16, 14)
+        c_lay.setSpacing(10)
+
+        c_lay.addWidget(_SectionTitle("Fleet utilisation — last 24 hours"))
+        cols = [
+            "Resource", "Available", "Peak in use", "In use p50",
+            "In use p90", "In use p99", "Net deployments / h", "Exhaustion forecast"
+        ]
+        self._res_table = _styled_table(cols)
+        self._res_table.setMinimumHeight(240)
+        c_lay.addWidget(self._res_table)
+
+        self._res_empty = QLabel("No resource data yet — resources are dispatched from the CLI.")
+        self._res_empty.setStyleSheet(f"color: {theme.STYLES['text_muted']}; border: none;")
+        c_lay.addWidget(self._res_empty)
+
+        lay.addWidget(card)
+        lay.addStretch()
+        return pg
+
+    def _rebuild_resource_table(self):
+        rows = self.db.get_resource_utilisation()
+        self._res_empty.setVisible(not rows)
+        t = self._res_table
+        t.setRowCount(len(rows))
+        for r, d in enumerate(rows):
+            pct = lambda v: "—" if v is None else f"{v} ({v * 100 // max(d['total'], 1)}%)"
+            eta = d["exhaustion_eta"]
+            items = [
+                d["resource_type"].replace("_", " ").title(),
+                f"{d['available']} / {d['total']}",
+                str(d["peak_occupied"]),
+                pct(d["p50"]), pct(d["p90"]), pct(d["p99"]),
+                f"{d['rate_per_hour']:+.1f}",
+                eta.strftime("%d %b %H:%M") if eta else "Not trending to zero",
+            ]
+            for c, txt in enumerate(items):
+                item = QTableWidgetItem(txt)
+                if c == 1 and d["available"] == 0:
+                    item.setForeground(QColor("#dc2626"))
+                if c == 7 and eta and eta < datetime.now() + timedelta(hours=2):
+                    item.setForeground(QColor("#dc2626"))
+                    item.setFont(QFont("Arial", 11, QFont.Bold))
+                t.setItem(r, c, item)
+            t.setRowHeight(r, 36)
+
     # ── data refresh ──────────────────────────────────────────────────────────
 
     def refresh(self):
@@ -628,6 +664,7 @@ class AdminAnalytics(QWidget):
         self._redraw_incidents()
         self._rebuild_responder_table()
         self._rebuild_reporter_table()
+        self._rebuild_resource_table()
 
     # ── incident redraws ──────────────────────────────────────────────────────
 
@@ -677,7 +714,7 @@ class AdminAnalytics(QWidget):
 
         # trend (default daily)
         trend_view = _build_line_chart(
-            _agg_time_series(incs, "daily"), color="#3498db"
+            self.db.get_incident_trend(granularity="day"), color="#3498db"
         )
         trend_view.setMinimumHeight(260)
         trend_lay = self._trend_placeholder.parent().layout()
@@ -418,7 +418,7 @@ class AssignResponderDialog(QDialog):
         if responder.active_incidents > 0:
             responder.status = "busy"
 
-        self.db.update_incident(self.incident)
+        self.db.update_incident(self.incident, actor=getattr(self.parent(), "user", None))
         self.db.update_user(responder)
 
         self.accept()
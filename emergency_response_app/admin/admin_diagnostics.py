@@ -0,0 +1,146 @@
+# admin/admin_diagnostics.py
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QTableWidget, QTableWidgetItem, QHeaderView, QTabWidget, QMessageBox
+)
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QFont
+import styles
+
+
+class AdminDiagnostics(QWidget):
+    """
+    Admin-only view of the Database profiler (profiler.QueryProfiler).
+
+    - Methods: calls, total / mean / p95 wall time and rows, per Database method
+    - Callers: for each widget method, the share of its time spent in each
+      Database call (e.g. AdminAnalytics.refresh -> _row_to_incident 90%)
+    - Slow queries: statements over the threshold, with EXPLAIN QUERY PLAN
+
+    Works against a local Database or the dispatch service alike: all it
+    reads is get_profile_report(). Profiling is off until enabled here
+    (or with ERS_PROFILE set when the app or service starts); the service
+    does not let clients switch it, only ERS_PROFILE.
+    """
+
+    def __init__(self, db):
+        super().__init__()
+        self.db = db
+        self.init_ui()
+        self.load_data()
+
+    # -----------------------
+    # UI SETUP
+    # -----------------------
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(16, 16, 16, 16)
+        layout.setSpacing(16)
+
+        header = QHBoxLayout()
+        title = QLabel("Diagnostics")
+        title.setFont(QFont("Arial", 18, QFont.Bold))
+        title.setStyleSheet("color: #1F2937;")
+        header.addWidget(title)
+        header.addStretch()
+
+        self.toggle_btn = QPushButton()
+        self.toggle_btn.clicked.connect(self.toggle_profiling)
+        refresh_btn = QPushButton("Refresh")
+        refresh_btn.clicked.connect(self.load_data)
+        reset_btn = QPushButton("Reset")
+        reset_btn.clicked.connect(self.reset)
+        for btn in (self.toggle_btn, refresh_btn, reset_btn):
+            btn.setStyleSheet(styles.STYLES["button_style"])
+            btn.setCursor(Qt.PointingHandCursor)
+            header.addWidget(btn)
+        layout.addLayout(header)
+
+        self.status_label = QLabel()
+        self.status_label.setStyleSheet("color: #6B7280;")
+        layout.addWidget(self.status_label)
+
+        self.methods_table = self._table(
+            ["Method", "Calls", "Total ms", "Mean ms", "p95 ≤ ms", "Rows"])
+        self.callers_table = self._table(
+            ["Caller", "Method", "Calls", "Total ms", "Share of caller"])
+        self.slow_table = self._table(
+            ["At", "Caller", "Method", "ms", "SQL", "Query plan"])
+        self.slow_table.setWordWrap(True)
+
+        tabs = QTabWidget()
+        tabs.addTab(self.methods_table, "Methods")
+        tabs.addTab(self.callers_table, "Callers")
+        tabs.addTab(self.slow_table, "Slow queries")
+        layout.addWidget(tabs)
+
+    @staticmethod
+    def _table(headers):
+        table = QTableWidget()
+        table.setColumnCount(len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        table.verticalHeader().setVisible(False)
+        return table
+
+    @staticmethod
+    def _fill(table, rows):
+        table.setRowCount(len(rows))
+        for r, values in enumerate(rows):
+            for c, value in enumerate(values):
+                item = QTableWidgetItem("" if value is None else str(value))
+                if isinstance(value, (int, float)):
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                table.setItem(r, c, item)
+        table.resizeRowsToContents()
+
+    # -----------------------
+    # DATA
+    # -----------------------
+    def load_data(self):
+        report = self.db.get_profile_report()
+        enabled = report.get("enabled", False)
+        self.toggle_btn.setText("Disable profiling" if enabled else "Enable profiling")
+        if not enabled:
+            self.status_label.setText("Profiling is off. Enable it, use the app, then refresh.")
+            for table in (self.methods_table, self.callers_table, self.slow_table):
+                table.setRowCount(0)
+            return
+
+        self.status_label.setText(
+            f"Collecting since {report['since']} · slow-query threshold "
+            f"{report['slow_ms']:g} ms · {len(report['slow_queries'])} slow queries logged"
+        )
+        self._fill(self.methods_table, [
+            (m["method"], m["calls"], round(m["total_s"] * 1000, 1),
+             round(m["mean_ms"], 3), m["p95_ms"] if m["p95_ms"] is not None else "> 1000", m["rows"])
+            for m in report["methods"]
+        ])
+        self._fill(self.callers_table, [
+            (group["caller"], m["method"], m["calls"], round(m["total_s"] * 1000, 1),
+             f"{m['share']:.0%}" if m["share"] is not None else "")
+            for group in report["callers"] for m in group["methods"]
+        ])
+        self._fill(self.slow_table, [
+            (q["at"], q["caller"], q["method"], q["ms"], q["sql"], "\n".join(q["plan"]))
+            for q in report["slow_queries"]
+        ])
+
+    def toggle_profiling(self):
+        try:
+            if self.db.get_profile_report().get("enabled"):
+                self.db.disable_profiling()
+            else:
+                self.db.enable_profiling()
+        except AttributeError:
+            QMessageBox.information(
+                self, "Diagnostics",
+                "The dispatch service does not accept this from clients. "
+                "Start it with ERS_PROFILE set to profile it."
+            )
+        self.load_data()
+
+    def reset(self):
+        self.db.reset_profile()
+        self.load_data()
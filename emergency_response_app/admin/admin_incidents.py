@@ -7,6 +7,7 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 from datetime import datetime
+from collections import Counter
 
 from incident_data import get_incident_display_name
 
@@ -31,6 +32,10 @@ class AdminIncidents(QWidget):
         self.incidents = incidents
         self.users = users          # list[User]
         self.db = db                # Database instance
+        # primary incident id -> number of duplicate reports linked to it
+        self.linked_counts = Counter(
+            i.cluster_id for i in incidents if getattr(i, 'cluster_id', None)
+        )
         self.init_ui()
 
     # ------------------------------------------------------------------ UI
@@ -275,6 +280,19 @@ class AdminIncidents(QWidget):
 
         meta_layout.addWidget(category)
         meta_layout.addWidget(priority)
+
+        # ----- Duplicate-report cluster info -----
+        cluster_id = getattr(incident, 'cluster_id', None)
+        linked = self.linked_counts.get(incident.id, 0)
+        if cluster_id:
+            cluster = QLabel(f'🔗 Duplicate of {cluster_id}')
+            cluster.setStyleSheet('color: #7C3AED; font-weight: bold;')
+            meta_layout.addWidget(cluster)
+        elif linked:
+            cluster = QLabel(f'🔗 {linked} linked report{"s" if linked != 1 else ""}')
+            cluster.setStyleSheet('color: #7C3AED; font-weight: bold;')
+            meta_layout.addWidget(cluster)
+
         meta_layout.addStretch()
         card_layout.addLayout(meta_layout)
 
@@ -331,8 +349,30 @@ class AdminIncidents(QWidget):
         if incident.status != 'solved':
             actions_layout = QHBoxLayout()
 
+            # Duplicates ride along with their primary; allow splitting them off
+            if cluster_id:
+                unlink_btn = QPushButton('Unlink Duplicate')
+                unlink_btn.setStyleSheet(
+                    '''
+                    QPushButton {
+                        background-color: #7C3AED;
+                        color: white;
+                        border: none;
+                        padding: 8px 16px;
+                        border-radius: 6px;
+                    }
+                    QPushButton:hover {
+                        background-color: #6D28D9;
+                    }
+                '''
+                )
+                unlink_btn.clicked.connect(
+                    lambda _, inc=incident: self.unlink_duplicate(inc)
+                )
+                actions_layout.addWidget(unlink_btn)
+
             # For pending incidents, allow assigning a responder
-            if incident.status == 'pending':
+            elif incident.status == 'pending':
                 assign_btn = QPushButton('Assign Responder')
                 assign_btn.setStyleSheet(
                     '''
@@ -406,16 +446,23 @@ class AdminIncidents(QWidget):
     # ---------------------------------------------------------------- logic
     def _find_available_responder(self, incident):
         """
-        Simple logic to pick an available responder.
-        You can later improve this (e.g., match category/location).
+        Pick an available responder: the nearest one when the incident and
+        responders have coordinates, otherwise the first available.
         """
+        nearest = self.db.nearest_available_responders(incident, k=1)
+        if nearest:
+            nearest_id = nearest[0][0].id
+            for u in self.users:
+                if u.id == nearest_id:
+                    return u
+            return nearest[0][0]
+
         candidates = [
             u for u in self.users
             if u.role == 'responder' and u.status == 'available'
         ]
         if not candidates:
             return None
-        # For now, just return the first candidate.
         return candidates[0]
 
     def assign_responder(self, incident):
@@ -437,7 +484,7 @@ class AdminIncidents(QWidget):
         if responder.active_incidents > 0:
             responder.status = 'busy'
 
-        # Persist changes
+        # Persist changes; update_incident carries them over to linked duplicates
         self.db.update_incident(incident)
         self.db.update_user(responder)
 
@@ -473,6 +520,14 @@ class AdminIncidents(QWidget):
         self.db.update_incident(incident)
         QMessageBox.information(self, 'Success', 'Incident marked as solved.')
 
+    def unlink_duplicate(self, incident):
+        """Treat a linked report as its own incident again."""
+        self.db.unlink_incident(incident.id)
+        incident.cluster_id = None
+        QMessageBox.information(
+            self, 'Unlinked', f'{incident.id} is now tracked as a separate incident.'
+        )
+
     def view_incident_details(self, incident):
         """
         Simple details dialog. You can replace this with a richer dialog later.
@@ -483,7 +538,14 @@ class AdminIncidents(QWidget):
             f"Priority: {incident.priority or 'N/A'}\n"
             f"Location: {incident.location or 'N/A'}\n"
             f"Reporter: {incident.reporter_name or 'N/A'}\n"
-            f"Responder: {incident.responder_name or 'Not assigned'}\n\n"
+            f"Responder: {incident.responder_name or 'Not assigned'}\n"
+            f"Linked reports: {self._linked_summary(incident)}\n\n"
             f"Description:\n{incident.description or ''}"
         )
         QMessageBox.information(self, "Incident Details", details)
+
+    def _linked_summary(self, incident):
+        if getattr(incident, 'cluster_id', None):
+            return f"duplicate of {incident.cluster_id}"
+        linked = [i.id for i in self.incidents if getattr(i, 'cluster_id', None) == incident.id]
+        return ", ".join(linked) if linked else "none"
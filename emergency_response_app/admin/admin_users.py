@@ -5,21 +5,159 @@ from PyQt5.QtWidgets import (
     QPushButton, QFrame, QScrollArea, QLineEdit,
     QMessageBox, QGridLayout, QComboBox
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QFont
 import styles
+from admin.user_search import UserSearchIndex
+
+
+class UserCard(QFrame):
+    """
+    A single user card. Cards are pooled by AdminUsers and re-bound to a
+    different user with bind() instead of being destroyed and recreated.
+    """
+
+    def __init__(self, owner):
+        super().__init__()
+        self.owner = owner
+        self.user = None
+
+        self.setStyleSheet(
+            """
+            QFrame {
+                background-color: white;
+                border-radius: 12px;
+                border: 1px solid #E5E7EB;
+            }
+            """
+        )
+        card_layout = QVBoxLayout(self)
+        card_layout.setContentsMargins(16, 16, 16, 16)
+        card_layout.setSpacing(8)
+
+        # Top row: name + role
+        top_layout = QHBoxLayout()
+        self.name_label = QLabel()
+        self.name_label.setFont(QFont("Arial", 12, QFont.Bold))
+        self.name_label.setStyleSheet("color: #111827;")
+        top_layout.addWidget(self.name_label)
+
+        self.role_label = QLabel()
+        self.role_label.setStyleSheet(
+            """
+            QLabel {
+                background-color: #E5E7EB;
+                color: #374151;
+                padding: 4px 8px;
+                border-radius: 999px;
+                font-size: 11px;
+            }
+            """
+        )
+        top_layout.addStretch()
+        top_layout.addWidget(self.role_label)
+        card_layout.addLayout(top_layout)
+
+        # Email / username row
+        self.email_label = QLabel()
+        self.email_label.setStyleSheet("color: #4B5563; font-size: 11px;")
+        card_layout.addWidget(self.email_label)
+
+        self.username_label = QLabel()
+        self.username_label.setStyleSheet("color: #4B5563; font-size: 11px;")
+        card_layout.addWidget(self.username_label)
+
+        # Phone row (hidden when the user has no phone)
+        self.phone_label = QLabel()
+        self.phone_label.setStyleSheet("color: #4B5563; font-size: 11px;")
+        card_layout.addWidget(self.phone_label)
+
+        # Status row
+        status_layout = QHBoxLayout()
+        self.status_label = QLabel()
+        status_layout.addWidget(QLabel("Status:"))
+        status_layout.addWidget(self.status_label)
+        status_layout.addStretch()
+        card_layout.addLayout(status_layout)
+
+        # Actions row
+        actions_layout = QHBoxLayout()
+
+        toggle_btn = QPushButton("Toggle Availability")
+        toggle_btn.setStyleSheet(styles.STYLES["button_style"])
+        toggle_btn.clicked.connect(lambda _: self.owner.toggle_user_status(self.user))
+        actions_layout.addWidget(toggle_btn)
+
+        dossier_btn = QPushButton("View Dossier →")
+        dossier_btn.setStyleSheet(
+            """
+            QPushButton {
+                background-color: #2c3e50;
+                color: white;
+                border: none;
+                padding: 6px 14px;
+                border-radius: 6px;
+                font-size: 12px;
+                font-weight: bold;
+            }
+            QPushButton:hover { background-color: #34495e; }
+            """
+        )
+        dossier_btn.clicked.connect(lambda _: self.owner.open_dossier(self.user))
+        actions_layout.addWidget(dossier_btn)
+
+        actions_layout.addStretch()
+        card_layout.addLayout(actions_layout)
+
+    def bind(self, user):
+        """Point this card at `user` and refresh every label."""
+        self.user = user
+        self.name_label.setText(user.name or "(No name)")
+        self.role_label.setText(user.role.title())
+        self.email_label.setText(f"Email: {user.email}")
+        self.username_label.setText(f"Username: {user.username}")
+
+        phone = getattr(user, "phone", "")
+        self.phone_label.setText(f"Phone: {phone}")
+        self.phone_label.setVisible(bool(phone))
+
+        status_text = user.status or "unknown"
+        if status_text.lower() == "available":
+            bg = styles.STYLES["success_color"]
+        elif status_text.lower() == "busy":
+            bg = styles.STYLES["warning_color"]
+        else:
+            bg = "#9CA3AF"
+
+        self.status_label.setText(status_text.title())
+        self.status_label.setStyleSheet(
+            f"""
+            QLabel {{
+                background-color: {bg};
+                color: white;
+                padding: 4px 10px;
+                border-radius: 999px;
+                font-size: 11px;
+            }}
+            """
+        )
 
 
 class AdminUsers(QWidget):
     """
     Admin Users management screen.
 
-    - Loads all users from the Database
-    - Shows them as cards in a scrollable grid
-    - Allows filtering by role and simple text search
+    - Loads all users from the Database into a UserSearchIndex
+    - Search is debounced and served from the index, not a full rescan
+    - Results are paged; only one page of cards exists at a time and
+      those cards are reused between pages and searches
     - Allows toggling user availability (status available/busy)
     """
 
+    SEARCH_DEBOUNCE_MS = 250
+    PAGE_SIZE = 20
+    COLUMNS = 2
+
     def __init__(self, db):
         super().__init__()
         self.db = db
@@ -27,15 +165,24 @@ class AdminUsers(QWidget):
         # Data
         self.all_users = []   # full list from DB
         self.filtered_users = []  # list after filters/search
+        self.search_index = UserSearchIndex()
+        self.page = 0
 
         # UI references
         self.search_input = None
         self.role_filter = None
         self.users_container_layout = None
+        self.card_pool = []   # reusable UserCard widgets
+        self.empty_label = None
+
+        # Debounce timer: restarts on every keystroke, fires once typing pauses
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.apply_filters)
 
         self.init_ui()
         self.load_users()
-
     # -----------------------
     # UI SETUP
     # -----------------------
@@ -68,7 +215,7 @@ class AdminUsers(QWidget):
         self.search_input.setStyleSheet(
             "padding: 8px; border: 1px solid #D1D5DB; border-radius: 6px; min-width: 220px;"
         )
-        self.search_input.textChanged.connect(self.apply_filters)
+        self.search_input.textChanged.connect(lambda _: self.search_timer.start())
         filters_layout.addWidget(self.search_input)
 
         self.role_filter = QComboBox()
@@ -96,195 +243,99 @@ class AdminUsers(QWidget):
         self.users_container_layout = QGridLayout()
         self.users_container_layout.setSpacing(16)
         container_layout.addLayout(self.users_container_layout)
+
+        self.empty_label = QLabel("No users found.")
+        self.empty_label.setAlignment(Qt.AlignCenter)
+        self.empty_label.setStyleSheet("color: #6B7280; margin-top: 16px;")
+        self.empty_label.hide()
+        container_layout.addWidget(self.empty_label)
         container_layout.addStretch()
 
+        self.scroll_area = scroll_area
         scroll_area.setWidget(container)
         main_layout.addWidget(scroll_area)
 
+        # Pager row
+        pager_layout = QHBoxLayout()
+        self.prev_btn = QPushButton("← Previous")
+        self.prev_btn.setStyleSheet(styles.STYLES["button_style"])
+        self.prev_btn.clicked.connect(lambda: self.go_to_page(self.page - 1))
+        pager_layout.addWidget(self.prev_btn)
+
+        pager_layout.addStretch()
+        self.page_label = QLabel()
+        self.page_label.setStyleSheet("color: #6B7280;")
+        pager_layout.addWidget(self.page_label)
+        pager_layout.addStretch()
+
+        self.next_btn = QPushButton("Next →")
+        self.next_btn.setStyleSheet(styles.STYLES["button_style"])
+        self.next_btn.clicked.connect(lambda: self.go_to_page(self.page + 1))
+        pager_layout.addWidget(self.next_btn)
+        main_layout.addLayout(pager_layout)
+
         self.setLayout(main_layout)
 
     # -----------------------
     # DATA LOADING & FILTERS
     # -----------------------
     def load_users(self):
-        """Load all users from DB and apply filters."""
+        """Load all users from DB, rebuild the search index and apply filters."""
         self.all_users = self.db.get_all_users()
+        self.search_index.rebuild(self.all_users)
         self.apply_filters()
 
     def apply_filters(self):
-        """Filter users based on search text and role, then rebuild UI."""
-        text = (self.search_input.text() or "").strip().lower()
+        """Filter users based on search text and role, then show page 1."""
+        self.search_timer.stop()
+        text = (self.search_input.text() or "").strip()
         role_selected = self.role_filter.currentText()
+        role = None if role_selected == "All Roles" else role_selected
 
-        def role_matches(user_role: str) -> bool:
-            if role_selected == "All Roles":
-                return True
-            return user_role.lower() == role_selected.lower()
-
-        filtered = []
-        for u in self.all_users:
-            if not role_matches(u.role):
-                continue
-
-            if text:
-                haystack = f"{u.name} {u.email} {u.username}".lower()
-                if text not in haystack:
-                    continue
-
-            filtered.append(u)
-
-        self.filtered_users = filtered
-        self._rebuild_user_cards()
+        self.filtered_users = self.search_index.search(text, role)
+        self.go_to_page(0)
 
     # -----------------------
     # UI BUILDING
     # -----------------------
-    def _clear_layout(self, layout: QGridLayout):
-        """Remove all widgets from the grid layout."""
-        while layout.count():
-            item = layout.takeAt(0)
-            w = item.widget()
-            if w is not None:
-                w.deleteLater()
-
-    def _rebuild_user_cards(self):
-        """Rebuild the grid of user cards from filtered_users."""
-        self._clear_layout(self.users_container_layout)
-
-        if not self.filtered_users:
-            # Show a simple "no users" label
-            empty_label = QLabel("No users found.")
-            empty_label.setAlignment(Qt.AlignCenter)
-            empty_label.setStyleSheet("color: #6B7280; margin-top: 16px;")
-            self.users_container_layout.addWidget(empty_label, 0, 0)
-            return
-
-        # Simple 2-column grid (adjust if you want more/less)
-        columns = 2
-        for idx, user in enumerate(self.filtered_users):
-            row = idx // columns
-            col = idx % columns
-            card = self._create_user_card(user)
-            self.users_container_layout.addWidget(card, row, col)
-
-    def _create_user_card(self, user):
-        """Create a single user card frame."""
-        card = QFrame()
-        card.setStyleSheet(
-            """
-            QFrame {
-                background-color: white;
-                border-radius: 12px;
-                border: 1px solid #E5E7EB;
-            }
-            """
-        )
-        card_layout = QVBoxLayout(card)
-        card_layout.setContentsMargins(16, 16, 16, 16)
-        card_layout.setSpacing(8)
-
-        # Top row: name + role
-        top_layout = QHBoxLayout()
-        name_label = QLabel(user.name or "(No name)")
-        name_label.setFont(QFont("Arial", 12, QFont.Bold))
-        name_label.setStyleSheet("color: #111827;")
-        top_layout.addWidget(name_label)
-
-        role_label = QLabel(user.role.title())
-        role_label.setStyleSheet(
-            """
-            QLabel {
-                background-color: #E5E7EB;
-                color: #374151;
-                padding: 4px 8px;
-                border-radius: 999px;
-                font-size: 11px;
-            }
-            """
-        )
-        top_layout.addStretch()
-        top_layout.addWidget(role_label)
-        card_layout.addLayout(top_layout)
-
-        # Email / username row
-        email_label = QLabel(f"Email: {user.email}")
-        email_label.setStyleSheet("color: #4B5563; font-size: 11px;")
-        card_layout.addWidget(email_label)
-
-        username_label = QLabel(f"Username: {user.username}")
-        username_label.setStyleSheet("color: #4B5563; font-size: 11px;")
-        card_layout.addWidget(username_label)
-
-        # Phone row
-        if getattr(user, "phone", ""):
-            phone_label = QLabel(f"Phone: {user.phone}")
-            phone_label.setStyleSheet("color: #4B5563; font-size: 11px;")
-            card_layout.addWidget(phone_label)
-
-        # Status row
-        status_layout = QHBoxLayout()
-        status_text = user.status or "unknown"
-
-        status_label = QLabel(status_text.title())
-        if status_text.lower() == "available":
-            bg = styles.STYLES["success_color"]
-        elif status_text.lower() == "busy":
-            bg = styles.STYLES["warning_color"]
+    def page_count(self):
+        return max(1, -(-len(self.filtered_users) // self.PAGE_SIZE))
+
+    def go_to_page(self, page):
+        """Show one page of filtered_users, clamped to the valid range."""
+        self.page = max(0, min(page, self.page_count() - 1))
+        self._render_page()
+        self.scroll_area.verticalScrollBar().setValue(0)
+
+    def _render_page(self):
+        """Bind the current page of users onto pooled cards."""
+        start = self.page * self.PAGE_SIZE
+        page_users = self.filtered_users[start:start + self.PAGE_SIZE]
+
+        # Grow the pool only as far as a single page ever needs
+        while len(self.card_pool) < len(page_users):
+            idx = len(self.card_pool)
+            card = UserCard(self)
+            self.users_container_layout.addWidget(card, idx // self.COLUMNS, idx % self.COLUMNS)
+            self.card_pool.append(card)
+
+        for idx, card in enumerate(self.card_pool):
+            if idx < len(page_users):
+                card.bind(page_users[idx])
+                card.show()
+            else:
+                card.hide()
+
+        total = len(self.filtered_users)
+        self.empty_label.setVisible(total == 0)
+        if total:
+            self.page_label.setText(
+                f"Showing {start + 1}–{start + len(page_users)} of {total}"
+            )
         else:
-            bg = "#9CA3AF"
-
-        status_label.setStyleSheet(
-            f"""
-            QLabel {{
-                background-color: {bg};
-                color: white;
-                padding: 4px 10px;
-                border-radius: 999px;
-                font-size: 11px;
-            }}
-            """
-        )
-        status_layout.addWidget(QLabel("Status:"))
-        status_layout.addWidget(status_label)
-        status_layout.addStretch()
-        card_layout.addLayout(status_layout)
-
-        # Actions row
-        actions_layout = QHBoxLayout()
-
-        toggle_btn = QPushButton("Toggle Availability")
-        toggle_btn.setStyleSheet(styles.STYLES["button_style"])
-        toggle_btn.clicked.connect(lambda _, u=user: self.toggle_user_status(u))
-        actions_layout.addWidget(toggle_btn)
-
-        dossier_btn = QPushButton("View Dossier →")
-        dossier_btn.setStyleSheet(
-            """
-            QPushButton {
-                background-color: #2c3e50;
-                color: white;
-                border: none;
-                padding: 6px 14px;
-                border-radius: 6px;
-                font-size: 12px;
-                font-weight: bold;
-            }
-            QPushButton:hover { background-color: #34495e; }
-            """
-        )
-        dossier_btn.clicked.connect(lambda _, u=user: self.open_dossier(u))
-        actions_layout.addWidget(dossier_btn)
-
-        # Placeholder for future actions
-        # reset_btn = QPushButton("Reset Password")
-        # reset_btn.setStyleSheet(styles.STYLES["danger_button_style"])
-        # reset_btn.clicked.connect(lambda _, u=user: self.reset_password(u))
-        # actions_layout.addWidget(reset_btn)
-
-        actions_layout.addStretch()
-        card_layout.addLayout(actions_layout)
-
-        return card
+            self.page_label.setText("")
+        self.prev_btn.setEnabled(self.page > 0)
+        self.next_btn.setEnabled(self.page < self.page_count() - 1)
 
     # -----------------------
     # ACTIONS
@@ -307,8 +358,8 @@ class AdminUsers(QWidget):
             "Status Updated",
             f"{user.name}'s status changed to {new_status.title()}."
         )
-        # Reload data to refresh cards
-        self.load_users()
+        # Status isn't indexed, so just re-bind the visible cards
+        self._render_page()
 
     def open_dossier(self, user):
         """Navigate to the UserDossier page for this user via MainWindow."""
@@ -4,10 +4,11 @@ from PyQt5.QtWidgets import (
     QFrame, QScrollArea, QSizePolicy
 )
 from PyQt5.QtCore import Qt, pyqtSignal
-from PyQt5.QtGui import QFont, QColor
+from PyQt5.QtGui import QFont, QColor, QPixmap
 
 from styles import theme
 from incident_data import get_incident_display_name
+from thumbnails import get_thumbnail_service
 
 
 class CaseFile(QWidget):
@@ -15,10 +16,12 @@ class CaseFile(QWidget):
 
     closed = pyqtSignal()   # emitted when user clicks Back
 
-    def __init__(self, incident, db, parent=None):
+    def __init__(self, incident, db, parent=None, bundle=None):
         super().__init__(parent)
-        self.incident = incident
         self.db       = db
+        # incident + reporter/responder/attachments/timeline in one cached query
+        self.bundle   = bundle or db.get_case_bundle(incident.id)
+        self.incident = self.bundle["incident"]
         self._build()
 
     # ── helpers ──────────────────────────────────────────────────────────────
@@ -195,9 +198,8 @@ class CaseFile(QWidget):
         inc = self.incident
         s   = self._s()
 
-        # fetch reporter & responder user objects
-        reporter  = self.db.get_user_by_id(inc.reporter_id)  if inc.reporter_id  else None
-        responder = self.db.get_user_by_id(inc.responder_id) if inc.responder_id else None
+        reporter  = self.bundle["reporter"]
+        responder = self.bundle["responder"]
 
         main = QVBoxLayout(self)
         main.setContentsMargins(0, 0, 0, 0)
@@ -329,40 +331,11 @@ class CaseFile(QWidget):
         tl_lay.setSpacing(4)
         tl_lay.addWidget(self._section_label("Case timeline"))
 
-        tl_events = []
-        tl_events.append((
-            inc.created_at.strftime("%b %d, %Y  %H:%M") if inc.created_at else "—",
-            "Report created",
-            inc.reporter_name or "Reporter",
-            True
-        ))
-        if inc.responder_id:
-            tl_events.append((
-                inc.updated_at.strftime("%b %d, %Y  %H:%M") if inc.updated_at else "—",
-                f"Case assigned to {inc.responder_name or 'responder'}",
-                "Admin",
-                True
-            ))
-            tl_events.append((
-                inc.updated_at.strftime("%b %d, %Y  %H:%M") if inc.updated_at else "—",
-                "Responder acknowledged — en route",
-                inc.responder_name or "Responder",
-                True
-            ))
-        if inc.status == "solved":
-            tl_events.append((
-                inc.updated_at.strftime("%b %d, %Y  %H:%M") if inc.updated_at else "—",
-                "Case resolved and closed",
-                inc.responder_name or "Responder",
-                True
-            ))
-        elif inc.status in ("ongoing", "assigned"):
-            tl_events.append((
-                "—",
-                "Awaiting resolution",
-                "System",
-                False
-            ))
+        tl_events = [
+            (ev["ts"].strftime("%b %d, %Y  %H:%M") if ev["ts"] else "—",
+             ev["action"], ev["by"], ev["done"])
+            for ev in self.bundle["timeline"]
+        ]
 
         for idx, (ts, action, by, done) in enumerate(tl_events):
             tl_lay.addWidget(
@@ -450,6 +423,18 @@ class CaseFile(QWidget):
         lower_row.addWidget(notes_card, 1)
         lay.addLayout(lower_row)
 
+        # ── attachments ──────────────────────────────────────────────────────
+        attachments = self.bundle["attachments"]
+        if attachments:
+            att_card = self._card()
+            att_lay  = QVBoxLayout(att_card)
+            att_lay.setContentsMargins(16, 14, 16, 14)
+            att_lay.setSpacing(8)
+            att_lay.addWidget(self._section_label(f"Attachments ({len(attachments)})"))
+            for att in attachments:
+                att_lay.addWidget(self._attachment_row(att))
+            lay.addWidget(att_card)
+
         # ── final report (only for solved incidents) ──────────────────────────
         if inc.status == "solved":
             fr_card = self._card()
@@ -493,6 +478,64 @@ class CaseFile(QWidget):
         scroll.setWidget(container)
         main.addWidget(scroll)
 
+    def _attachment_row(self, att):
+        """One attachment: preview (filled in asynchronously), name and metadata."""
+        s = self._s()
+        row = QWidget()
+        h = QHBoxLayout(row)
+        h.setContentsMargins(0, 0, 0, 0)
+        h.setSpacing(12)
+
+        mime = att.get("mime_type") or ""
+        preview = QLabel("🖼️" if mime.startswith("image/") else
+                         "🎥" if mime.startswith("video/") else "📎")
+        preview.setFixedSize(64, 64)
+        preview.setAlignment(Qt.AlignCenter)
+        preview.setStyleSheet(
+            f"background: {s['bg_input']}; border: 1px solid {s['border']};"
+            f" border-radius: 6px; font-size: 22px;"
+        )
+        h.addWidget(preview)
+
+        info = QVBoxLayout()
+        info.setSpacing(2)
+        name = QLabel(att.get("original_name") or att["sha256"][:12])
+        name.setStyleSheet(f"color: {s['text_main']}; font-size: 12px; font-weight: bold; border: none;")
+        details = [mime or "unknown type", self._human_size(att.get("size"))]
+        if att.get("width") and att.get("height"):
+            details.append(f"{att['width']}×{att['height']}")
+        meta = QLabel("  ·  ".join(details))
+        meta.setStyleSheet(f"color: {s['text_muted']}; font-size: 11px; border: none;")
+        info.addWidget(name)
+        info.addWidget(meta)
+        h.addLayout(info, 1)
+
+        if mime.startswith(("image/", "video/")):
+            get_thumbnail_service().request(
+                att["storage_path"], 64,
+                lambda image, lbl=preview: self._set_preview(lbl, image),
+                sha256=att["sha256"], mime_type=mime,
+            )
+        return row
+
+    @staticmethod
+    def _set_preview(label, image):
+        if image is None:
+            return
+        try:
+            label.setPixmap(QPixmap.fromImage(image))
+        except RuntimeError:
+            pass  # case file was closed before the thumbnail arrived
+
+    @staticmethod
+    def _human_size(nbytes):
+        if not nbytes:
+            return "—"
+        for unit in ("B", "KB", "MB", "GB"):
+            if nbytes < 1024 or unit == "GB":
+                return f"{nbytes:.0f} {unit}" if unit == "B" else f"{nbytes:.1f} {unit}"
+            nbytes /= 1024
+
     # ── utils ─────────────────────────────────────────────────────────────────
 
     def _build_divider(self):
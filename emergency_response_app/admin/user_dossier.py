@@ -6,6 +6,7 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtGui import QFont, QColor
+from datetime import datetime
 
 from styles import theme
 
@@ -16,10 +17,15 @@ class UserDossier(QWidget):
 
     open_case = pyqtSignal(str)   # carries incident id
 
+    PAGE_SIZE = 50
+
     def __init__(self, user, db, parent=None):
         super().__init__(parent)
         self.subject   = user   # the user being viewed (not the logged-in admin)
         self.db        = db
+        self.role      = "responder" if user.role == "responder" else "reporter"
+        self.page      = 0
+        self.incidents = []     # rows on the current history page
         self._build()
 
     # ── helpers ──────────────────────────────────────────────────────────────
@@ -136,12 +142,7 @@ class UserDossier(QWidget):
 
     def _build(self):
         s      = self.subject
-        all_i  = self.db.get_all_incidents()
-
-        if s.role == "responder":
-            incidents = self.db.get_incidents_by_responder(s.id)
-        else:
-            incidents = self.db.get_incidents_by_reporter(s.id)
+        stats  = self.db.get_user_stats(s.id, self.role)
 
         main = QVBoxLayout(self)
         main.setContentsMargins(0, 0, 0, 0)
@@ -226,6 +227,10 @@ class UserDossier(QWidget):
         grid.addLayout(self._meta_row("Active incidents", s.active_incidents))
         if s.responder_category:
             grid.addLayout(self._meta_row("Specialization", s.responder_category))
+        grid.addLayout(self._meta_row(
+            "Last activity",
+            stats["last_activity"].strftime("%b %d, %Y  %H:%M") if stats["last_activity"] else "—"
+        ))
         grid.addLayout(self._meta_row(
             "Member since",
             s.created_at.strftime("%b %d, %Y") if s.created_at else "—"
@@ -259,10 +264,10 @@ class UserDossier(QWidget):
         stats_row = QHBoxLayout()
         stats_row.setSpacing(10)
 
-        total    = len(incidents)
-        active   = len([i for i in incidents if i.status in ("ongoing", "assigned")])
-        solved   = len([i for i in incidents if i.status == "solved"])
-        pending  = len([i for i in incidents if i.status == "pending"])
+        total    = stats["total"]
+        active   = stats["active"]
+        solved   = stats["solved"]
+        pending  = stats["pending"]
         rate     = f"{int(solved/total*100)}%" if total > 0 else "—"
 
         if s.role == "responder":
@@ -273,10 +278,14 @@ class UserDossier(QWidget):
             stats_row.addWidget(
                 self._stat_card("Active incidents", s.active_incidents, "#534AB7")
             )
+            stats_row.addWidget(self._stat_card(
+                "Avg resolution", self._duration(stats["mean_resolution_s"]), "#378ADD"
+            ))
+            stats_row.addWidget(self._stat_card(
+                "P90 resolution", self._duration(stats["p90_resolution_s"]), "#BA7517"
+            ))
         else:
-            valid   = len([i for i in incidents if i.status == "solved"])
-            false_r = len([i for i in incidents if i.status == "pending" and
-                           (i.updated_at - i.created_at).total_seconds() > 86400])
+            valid   = solved
             acc = f"{int(valid/total*100)}%" if total > 0 else "—"
             stats_row.addWidget(self._stat_card("Total reports", total, "#378ADD"))
             stats_row.addWidget(self._stat_card("Valid reports", valid, "#1D9E75"))
@@ -325,56 +334,38 @@ class UserDossier(QWidget):
         table.setAlternatingRowColors(False)
         table.verticalHeader().setVisible(False)
         table.setShowGrid(True)
-        table.setRowCount(len(incidents))
-
-        for row, inc in enumerate(incidents):
-            # Case ID — clickable style
-            id_item = QTableWidgetItem(inc.id)
-            id_item.setForeground(QColor("#185FA5"))
-            id_item.setFont(QFont("Arial", 11, QFont.Bold))
-            table.setItem(row, 0, id_item)
-
-            table.setItem(row, 1, QTableWidgetItem(
-                (inc.incident_category or inc.type or "—").title()
-            ))
-
-            role_item = QTableWidgetItem(s.role.title())
-            table.setItem(row, 2, role_item)
-
-            dt = inc.created_at.strftime("%b %d %Y  %H:%M") if inc.created_at else "—"
-            dt_item = QTableWidgetItem(dt)
-            dt_item.setForeground(QColor(self._s()['text_muted']))
-            table.setItem(row, 3, dt_item)
-
-            p_item = QTableWidgetItem(inc.priority or "—")
-            pcolor = {
-                "P1": QColor(220, 38, 38), "P2": QColor(234, 88, 12),
-                "P3": QColor(202, 138, 4),  "P4": QColor(22, 163, 74),
-            }.get((inc.priority or "").upper(), QColor(107, 114, 128))
-            p_item.setForeground(pcolor)
-            p_item.setFont(QFont("Arial", 11, QFont.Bold))
-            table.setItem(row, 4, p_item)
-
-            st_item = QTableWidgetItem((inc.status or "—").title())
-            scolor = {
-                "pending":  QColor(202, 138, 4),
-                "ongoing":  QColor(37, 99, 235),
-                "solved":   QColor(22, 163, 74),
-                "assigned": QColor(124, 58, 237),
-            }.get((inc.status or "").lower(), QColor(107, 114, 128))
-            st_item.setForeground(scolor)
-            st_item.setFont(QFont("Arial", 11, QFont.Bold))
-            table.setItem(row, 5, st_item)
-
-            table.setRowHeight(row, 38)
+        self.table = table
 
         # double-click a row to open the case file
         table.cellDoubleClicked.connect(
-            lambda r, _: self._on_view_case(incidents[r].id) if r < len(incidents) else None
+            lambda r, _: self._on_view_case(self.incidents[r].id) if r < len(self.incidents) else None
         )
 
         hist_lay.addWidget(table)
 
+        # pager: only PAGE_SIZE rows are ever fetched and rendered
+        pager = QHBoxLayout()
+        self.prev_btn = QPushButton("‹ Newer")
+        self.next_btn = QPushButton("Older ›")
+        for btn in (self.prev_btn, self.next_btn):
+            btn.setCursor(Qt.PointingHandCursor)
+            btn.setStyleSheet(
+                f"QPushButton {{ background: transparent; color: {self._s()['text_muted']};"
+                f" border: 1px solid {self._s()['border']}; padding: 4px 12px; border-radius: 6px; }}"
+                f"QPushButton:disabled {{ color: {self._s()['border']}; }}"
+            )
+        self.prev_btn.clicked.connect(lambda: self._load_page(self.page - 1))
+        self.next_btn.clicked.connect(lambda: self._load_page(self.page + 1))
+        self.page_lbl = QLabel()
+        self.page_lbl.setStyleSheet(f"color: {self._s()['text_muted']}; font-size: 11px;")
+        pager.addWidget(self.prev_btn)
+        pager.addWidget(self.page_lbl)
+        pager.addWidget(self.next_btn)
+        pager.addStretch()
+        hist_lay.addLayout(pager)
+        self.total_entries = total
+        self._load_page(0)
+
         # View case button below table
         view_btn_row = QHBoxLayout()
         view_btn_row.addStretch()
@@ -386,7 +377,7 @@ class UserDossier(QWidget):
         )
         view_case_btn.setCursor(Qt.PointingHandCursor)
         view_case_btn.clicked.connect(
-            lambda: self._on_view_selected(table, incidents)
+            lambda: self._on_view_selected(table, self.incidents)
         )
         view_btn_row.addWidget(view_case_btn)
         hist_lay.addLayout(view_btn_row)
@@ -404,31 +395,23 @@ class UserDossier(QWidget):
         tl_lay.setSpacing(8)
         tl_lay.addWidget(self._section_label("Activity timeline"))
 
+        # newest 8 events from the incident event log, shown oldest first
+        recent = list(self.db.iter_incident_events(user_id=s.id, newest_first=True, limit=8))
         tl_events = []
-        if s.created_at:
+        if s.created_at and len(recent) < 8:
             tl_events.append((
                 s.created_at.strftime("%b %d, %Y"),
                 "Account created",
                 "System", True
             ))
-        for inc in sorted(incidents, key=lambda x: x.created_at):
+        for ev in reversed(recent):
             tl_events.append((
-                inc.created_at.strftime("%b %d, %Y  %H:%M"),
-                f"{inc.id} — {(inc.incident_category or inc.type or '').title()} reported",
-                inc.reporter_name or "Reporter", True
+                ev["ts"].strftime("%b %d, %Y  %H:%M"),
+                f"{ev['incident_id']} — {self._event_text(ev)}",
+                ev["actor_name"] or ("Admin" if ev["kind"] in ("assigned", "reassigned")
+                                     else ev["responder_name"] or "System"),
+                True
             ))
-            if inc.responder_name:
-                tl_events.append((
-                    inc.updated_at.strftime("%b %d, %Y  %H:%M") if inc.updated_at else "—",
-                    f"{inc.id} — assigned to {inc.responder_name}",
-                    "Admin", True
-                ))
-            if inc.status == "solved":
-                tl_events.append((
-                    inc.updated_at.strftime("%b %d, %Y  %H:%M") if inc.updated_at else "—",
-                    f"{inc.id} — completed",
-                    inc.responder_name or "Responder", True
-                ))
 
         for idx, (ts, action, by, done) in enumerate(tl_events[-8:]):
             item_w  = QWidget()
@@ -474,14 +457,11 @@ class UserDossier(QWidget):
         notes_lay.setSpacing(8)
         notes_lay.addWidget(self._section_label("Notes & flags"))
 
-        # warning flag if any active incidents over-running
-        overdue = [
-            i for i in incidents
-            if i.status == "ongoing" and
-            (i.updated_at - i.created_at).total_seconds() > 7200
-        ]
+        # warning flag for open incidents past their priority SLA
+        now = datetime.now()
+        overdue = self.db.get_overdue_incidents(s.id, self.role)
         if overdue:
-            for inc in overdue[:3]:
+            for inc, deadline in overdue[:3]:
                 flag = QFrame()
                 flag.setStyleSheet(
                     "QFrame { background: #fee2e2; border-left: 3px solid #dc2626;"
@@ -494,8 +474,8 @@ class UserDossier(QWidget):
                 ft.setFont(QFont("Arial", 11, QFont.Bold))
                 ft.setStyleSheet("color: #991b1b; border: none;")
                 fs = QLabel(
-                    f"Ongoing for "
-                    f"{int((inc.updated_at - inc.created_at).total_seconds()//3600)}h"
+                    f"{inc.priority or '—'} SLA missed by "
+                    f"{int((now - deadline).total_seconds()//60)}m"
                     f"  ·  {inc.location or '—'}"
                 )
                 fs.setStyleSheet("color: #6b7280; font-size: 10px; border: none;")
@@ -535,6 +515,86 @@ class UserDossier(QWidget):
         scroll.setWidget(container)
         main.addWidget(scroll)
 
+    def _load_page(self, page):
+        """Fetch and render one page of the activity history."""
+        pages = max(1, -(-self.total_entries // self.PAGE_SIZE))
+        self.page = max(0, min(page, pages - 1))
+        self.incidents = self.db.get_incidents_page(
+            self.subject.id, self.role, self.page * self.PAGE_SIZE, self.PAGE_SIZE
+        )
+        table = self.table
+        s = self.subject
+        table.setRowCount(len(self.incidents))
+
+        for row, inc in enumerate(self.incidents):
+            # Case ID — clickable style
+            id_item = QTableWidgetItem(inc.id)
+            id_item.setForeground(QColor("#185FA5"))
+            id_item.setFont(QFont("Arial", 11, QFont.Bold))
+            table.setItem(row, 0, id_item)
+
+            table.setItem(row, 1, QTableWidgetItem(
+                (inc.incident_category or inc.type or "—").title()
+            ))
+
+            role_item = QTableWidgetItem(s.role.title())
+            table.setItem(row, 2, role_item)
+
+            dt = inc.created_at.strftime("%b %d %Y  %H:%M") if inc.created_at else "—"
+            dt_item = QTableWidgetItem(dt)
+            dt_item.setForeground(QColor(self._s()['text_muted']))
+            table.setItem(row, 3, dt_item)
+
+            p_item = QTableWidgetItem(inc.priority or "—")
+            pcolor = {
+                "P1": QColor(220, 38, 38), "P2": QColor(234, 88, 12),
+                "P3": QColor(202, 138, 4),  "P4": QColor(22, 163, 74),
+            }.get((inc.priority or "").upper(), QColor(107, 114, 128))
+            p_item.setForeground(pcolor)
+            p_item.setFont(QFont("Arial", 11, QFont.Bold))
+            table.setItem(row, 4, p_item)
+
+            st_item = QTableWidgetItem((inc.status or "—").title())
+            scolor = {
+                "pending":  QColor(202, 138, 4),
+                "ongoing":  QColor(37, 99, 235),
+                "solved":   QColor(22, 163, 74),
+                "assigned": QColor(124, 58, 237),
+            }.get((inc.status or "").lower(), QColor(107, 114, 128))
+            st_item.setForeground(scolor)
+            st_item.setFont(QFont("Arial", 11, QFont.Bold))
+            table.setItem(row, 5, st_item)
+
+            table.setRowHeight(row, 38)
+
+        self.page_lbl.setText(f"Page {self.page + 1} of {pages}")
+        self.prev_btn.setEnabled(self.page > 0)
+        self.next_btn.setEnabled(self.page < pages - 1)
+
+    @staticmethod
+    def _duration(seconds):
+        if seconds is None:
+            return "—"
+        minutes = int(seconds // 60)
+        if minutes < 60:
+            return f"{minutes}m"
+        if minutes < 48 * 60:
+            return f"{minutes // 60}h {minutes % 60:02d}m"
+        return f"{minutes // 1440}d"
+
+    @staticmethod
+    def _event_text(ev):
+        kind = ev["kind"]
+        if kind == "created":
+            return "reported"
+        if kind in ("assigned", "reassigned"):
+            return f"{kind} to {ev['responder_name'] or 'responder'}"
+        if kind == "accepted":
+            return f"accepted by {ev['responder_name'] or 'responder'}"
+        if kind == "solved":
+            return "completed"
+        return f"status changed to {ev['to_status'] or '—'}"
+
     # ── actions ───────────────────────────────────────────────────────────────
 
     def _on_view_case(self, incident_id):
@@ -0,0 +1,85 @@
+# admin/user_search.py
+from collections import defaultdict
+
+
+class UserSearchIndex:
+    """
+    In-memory search index over users for the admin Users page.
+
+    - Trigram index over "name email username" for substring queries (3+ chars)
+    - Shorter queries (1-2 chars) have no trigram to look up, so they scan
+      the haystacks; still substring matches, like every other query
+    - Role buckets so the role filter is a set lookup, not a scan
+
+    Results are returned as positions into the original list, so the
+    caller's ordering (created_at DESC from the DB) is preserved.
+    """
+
+    GRAM = 3
+
+    def __init__(self, users=None):
+        self.users = []
+        self._haystacks = []
+        self._trigrams = defaultdict(set)
+        self._roles = defaultdict(set)
+        if users is not None:
+            self.rebuild(users)
+
+    # -----------------------
+    # BUILDING
+    # -----------------------
+    def rebuild(self, users):
+        """Re-index the given list of users from scratch."""
+        self.users = list(users)
+        self._haystacks = []
+        self._trigrams.clear()
+        self._roles.clear()
+
+        for pos, user in enumerate(self.users):
+            haystack = f"{user.name or ''} {user.email or ''} {user.username or ''}".lower()
+            self._haystacks.append(haystack)
+            self._roles[(user.role or "").lower()].add(pos)
+
+            for i in range(len(haystack) - self.GRAM + 1):
+                self._trigrams[haystack[i:i + self.GRAM]].add(pos)
+
+    # -----------------------
+    # QUERYING
+    # -----------------------
+    def search(self, text="", role=None):
+        """
+        Return the users matching `text` (case-insensitive) and `role`.
+        `role` of None / "" means every role.
+        """
+        text = (text or "").strip().lower()
+        candidates = None
+
+        if role:
+            candidates = set(self._roles.get(role.lower(), ()))
+
+        if text:
+            matched = self._match_text(text)
+            candidates = matched if candidates is None else candidates & matched
+
+        if candidates is None:
+            return list(self.users)
+        return [self.users[pos] for pos in sorted(candidates)]
+
+    def _match_text(self, text):
+        if len(text) < self.GRAM:
+            return {pos for pos, haystack in enumerate(self._haystacks) if text in haystack}
+
+        grams = [text[i:i + self.GRAM] for i in range(len(text) - self.GRAM + 1)]
+        # Intersect from the rarest trigram up to keep the working set small
+        postings = sorted((self._trigrams.get(g, set()) for g in set(grams)), key=len)
+        if not postings or not postings[0]:
+            return set()
+
+        result = set(postings[0])
+        for p in postings[1:]:
+            result &= p
+            if not result:
+                return result
+
+        # Trigrams only prove the letters exist, confirm the real substring
+        return {pos for pos in result if text in self._haystacks[pos]}
@@ -0,0 +1,169 @@
+# attachment_store.py
+import hashlib
+import mimetypes
+import os
+import struct
+import tempfile
+
+# The store sits next to the database file, so everyone who shares the
+# database (other accounts, other machines on a shared folder) shares it
+# too; set this to put it elsewhere
+ROOT_ENV = "ERS_ATTACHMENT_DIR"
+
+CHUNK_SIZE = 1024 * 1024   # 1 MiB per read/write
+
+
+class AttachmentStore:
+    """
+    Content-addressed file store for incident attachments.
+
+    Files live under <root>/objects/<first 2 hex chars>/<sha256>, so the
+    same photo attached to five reports is stored once, and stored copies
+    keep working after the user moves or deletes the original. The
+    database records that path relative to the root (see resolve_path).
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.tmp_dir = os.path.join(root, "tmp")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    def path_for(self, sha256):
+        """Absolute path of a stored object."""
+        return os.path.join(self.objects_dir, sha256[:2], sha256)
+
+    @staticmethod
+    def relative_path(sha256):
+        """Path of a stored object below the root, as kept in the database."""
+        return f"objects/{sha256[:2]}/{sha256}"
+
+    def contains(self, sha256):
+        return os.path.exists(self.path_for(sha256))
+
+    def ingest(self, source_path, progress=None, cancelled=None):
+        """
+        Copy `source_path` into the store in CHUNK_SIZE pieces, hashing as
+        it goes (one read of the source). If the content is already stored
+        the temporary copy is dropped, so duplicates never take extra space.
+
+        `progress(done_bytes, total_bytes)` is called after every chunk.
+        `cancelled()` is polled between chunks; returning True aborts.
+        Returns the metadata dict (see describe()).
+        """
+        total = os.path.getsize(source_path)
+        digest = hashlib.sha256()
+        done = 0
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir)
+        try:
+            with open(source_path, "rb") as src, os.fdopen(fd, "wb") as dst:
+                while True:
+                    if cancelled is not None and cancelled():
+                        raise InterruptedError("Attachment ingest cancelled")
+                    chunk = src.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    dst.write(chunk)
+                    done += len(chunk)
+                    if progress is not None:
+                        progress(done, total)
+
+            sha256 = digest.hexdigest()
+            final_path = self.path_for(sha256)
+            if os.path.exists(final_path):
+                os.remove(tmp_path)          # dedup: keep the existing object
+            else:
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                os.replace(tmp_path, final_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        meta = self.describe(sha256, original_name=os.path.basename(source_path))
+        meta["size"] = total
+        return meta
+
+    def describe(self, sha256, original_name=""):
+        """Metadata for a stored object: size, MIME type and image dimensions."""
+        path = self.path_for(sha256)
+        mime, _ = mimetypes.guess_type(original_name or path)
+        width, height = image_dimensions(path)
+        return {
+            "sha256": sha256,
+            "original_name": original_name,
+            "size": os.path.getsize(path),
+            "mime_type": mime or "application/octet-stream",
+            "width": width,
+            "height": height,
+            "storage_path": self.relative_path(sha256),
+        }
+
+
+def store_dir_for(db_name):
+    """Root of the store that belongs to a database file."""
+    return os.environ.get(ROOT_ENV) or os.path.join(
+        os.path.dirname(os.path.abspath(db_name)), "attachments")
+
+
+def resolve_path(root, storage_path):
+    """Absolute path for a database storage_path (rows from older builds are already absolute)."""
+    return os.path.normpath(os.path.join(root, storage_path))
+
+
+# ======================
+# IMAGE HEADER SNIFFING
+# ======================
+
+def image_dimensions(path):
+    """
+    (width, height) read from a PNG/GIF/BMP/JPEG header, or (None, None).
+    Only the first few KB are read, never the whole image.
+    """
+    try:
+        with open(path, "rb") as f:
+            head = f.read(26)
+            if head.startswith(b"\x89PNG\r\n\x1a\n") and head[12:16] == b"IHDR":
+                return struct.unpack(">II", head[16:24])
+            if head[:6] in (b"GIF87a", b"GIF89a"):
+                return struct.unpack("<HH", head[6:10])
+            if head.startswith(b"BM"):
+                w, h = struct.unpack("<ii", head[18:26])
+                return w, abs(h)
+            if head.startswith(b"\xff\xd8"):
+                return _jpeg_dimensions(f)
+    except (OSError, struct.error):
+        pass
+    return None, None
+
+
+def _jpeg_dimensions(f):
+    f.seek(2)
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None, None
+        code = marker[1]
+        if code in (0xD8, 0x01) or 0xD0 <= code <= 0xD7:
+            continue
+        length = struct.unpack(">H", f.read(2))[0]
+        # SOF0..SOF15 (minus DHT/JPG/DAC) carry the frame size
+        if 0xC0 <= code <= 0xCF and code not in (0xC4, 0xC8, 0xCC):
+            f.read(1)
+            h, w = struct.unpack(">HH", f.read(4))
+            return w, h
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+_stores = {}
+
+
+def get_store(db_name):
+    """Shared store instance for a database file (see store_dir_for)."""
+    root = store_dir_for(db_name)
+    if root not in _stores:
+        _stores[root] = AttachmentStore(root)
+    return _stores[root]
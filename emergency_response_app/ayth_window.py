@@ -14,11 +14,8 @@ import os                                             # for file/system operatio
 from database import Database                         # database interaction class
 from models import User                               # User model structure
 import styles                                         # custom stylesheet for UI
-
-import hashlib
-
-def hash_password(password: str) -> str:
-    return hashlib.sha256(password.encode()).hexdigest()
+import passwords                                      # salted scrypt/PBKDF2 hashing
+from workers import run_in_background                 # keeps slow hashing off the GUI thread
 
 # Base directory for loading icons
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -46,6 +43,7 @@ class AuthWindow(QWidget):
     def __init__(self):
         super().__init__()
         self.db = Database()
+        self.login_worker = None
         self.init_ui()
 
     # ------------------------------------------------------------------ UI
@@ -207,12 +205,12 @@ class AuthWindow(QWidget):
         btn_layout = QHBoxLayout()
         btn_layout.setSpacing(10)
 
-        login_btn = QPushButton("Login")
-        login_btn.setStyleSheet(styles.STYLES["button_style"])
-        login_btn.clicked.connect(self.handle_login)
-        login_btn.setDefault(True)
-        login_btn.setAutoDefault(True)
-        btn_layout.addWidget(login_btn)
+        self.login_btn = QPushButton("Login")
+        self.login_btn.setStyleSheet(styles.STYLES["button_style"])
+        self.login_btn.clicked.connect(self.handle_login)
+        self.login_btn.setDefault(True)
+        self.login_btn.setAutoDefault(True)
+        btn_layout.addWidget(self.login_btn)
 
         self.login_username.returnPressed.connect(self.handle_login)
         self.login_password.returnPressed.connect(self.handle_login)
@@ -234,6 +232,15 @@ class AuthWindow(QWidget):
         main_layout.addWidget(login_box)
 
     # ------------------------------------------------------------------ Logic
+    def reset(self):
+        """Clear the form so the same window can be shown again after a logout."""
+        self.login_username.clear()
+        self.login_password.clear()
+        if self.show_pass_btn.isChecked():
+            self.show_pass_btn.setChecked(False)
+            self.toggle_password_visibility()
+        self.login_username.setFocus()
+
     def toggle_password_visibility(self):
         """Show/hide password and swap eye icon."""
         if self.show_pass_btn.isChecked():
@@ -253,16 +260,51 @@ class AuthWindow(QWidget):
             QMessageBox.warning(self, "Error", "Please enter both username and password.")
             return
 
+        if self.login_worker is not None:
+            return      # a check is already running
+
+        # Hashing is deliberately slow, so it runs on the thread pool
+        self.login_btn.setEnabled(False)
+        self.login_btn.setText("Signing in...")
+        self.login_worker = run_in_background(self.check_credentials, username, password)
+        self.login_worker.signals.finished.connect(self.on_login_checked)
+        self.login_worker.signals.failed.connect(self.on_login_error)
+
+    def check_credentials(self, username, password):
+        """Worker thread: return the User if the password matches, else None."""
         user = self.db.get_user_by_username(username)
-        if not user or user.password != hash_password(password):
+        if not user:
+            # Same cost as a real check, so timing does not reveal unknown usernames
+            return passwords.dummy_verify(password) or None
+
+        ok, needs_rehash = passwords.verify_password(password, user.password)
+        if not ok:
+            return None
+        if needs_rehash:
+            # Legacy SHA-256 or an outdated work factor: upgrade while we have the password
+            user.password = passwords.hash_password(password)
+            self.db.update_password(user.id, user.password)
+        return user
+
+    def on_login_checked(self, user):
+        self._reset_login_button()
+        if not user:
             QMessageBox.warning(self, "Error", "Invalid username or password.")
             return
 
-
         # success
         self.login_success.emit(user)
         self.close()
 
+    def on_login_error(self, message):
+        self._reset_login_button()
+        QMessageBox.critical(self, "Error", f"Could not sign in: {message}")
+
+    def _reset_login_button(self):
+        self.login_worker = None
+        self.login_btn.setEnabled(True)
+        self.login_btn.setText("Login")
+
     def open_create_account_window(self):
         self.create_window = CreateAccountWindow(self.db)
         self.create_window.show()
@@ -278,6 +320,7 @@ class CreateAccountWindow(QWidget):
     def __init__(self, db: Database, parent=None):
         super().__init__(parent)
         self.db = db
+        self.create_worker = None
         self.init_ui()
 
     def init_ui(self):
@@ -344,15 +387,15 @@ class CreateAccountWindow(QWidget):
 
         # Buttons
         btn_layout = QHBoxLayout()
-        create_btn = QPushButton("Create")
-        create_btn.setStyleSheet(styles.STYLES["button_style"])
-        create_btn.clicked.connect(self.handle_create)
+        self.create_btn = QPushButton("Create")
+        self.create_btn.setStyleSheet(styles.STYLES["button_style"])
+        self.create_btn.clicked.connect(self.handle_create)
 
         cancel_btn = QPushButton("Cancel")
         cancel_btn.setStyleSheet(styles.STYLES["danger_button_style"])
         cancel_btn.clicked.connect(self.close)
 
-        btn_layout.addWidget(create_btn)
+        btn_layout.addWidget(self.create_btn)
         btn_layout.addWidget(cancel_btn)
 
         layout.addRow(btn_layout)
@@ -367,7 +410,8 @@ class CreateAccountWindow(QWidget):
         self.responder_category_input.setVisible(is_responder)
 
     def handle_create(self):
-        
+        if self.create_worker is not None:
+            return
 
         name = self.name_input.text().strip()
         username = self.username_input.text().strip()
@@ -422,12 +466,12 @@ class CreateAccountWindow(QWidget):
             QMessageBox.warning(self, "Error", "Email already in use.")
             return
 
-        # Create user
+        # Create user (password is hashed on the worker thread)
         user = User(
             id=str(uuid.uuid4()),
             name=name,
             email=email,
-            password=hash_password(password),
+            password=None,
             role=role,
             username=username,
             phone=phone,
@@ -436,10 +480,27 @@ class CreateAccountWindow(QWidget):
             responder_category=responder_category,
         )
 
+        self.create_btn.setEnabled(False)
+        self.create_worker = run_in_background(self.store_user, user, password)
+        self.create_worker.signals.finished.connect(self.on_user_created)
+        self.create_worker.signals.failed.connect(self.on_create_error)
+
+    def store_user(self, user, password):
+        """Worker thread: hash the password and insert the user."""
+        user.password = passwords.hash_password(password)
         self.db.create_user(user)
+        return user
+
+    def on_user_created(self, user):
+        self.create_worker = None
         QMessageBox.information(self, "Success", "Account created successfully.")
         self.close()
 
+    def on_create_error(self, message):
+        self.create_worker = None
+        self.create_btn.setEnabled(True)
+        QMessageBox.critical(self, "Error", f"Could not create account: {message}")
+
 
 # ---------------------------------------------------------------------- Password Recovery
 class PasswordRecoveryDialog(QDialog):
@@ -0,0 +1,70 @@
+# clustering.py
+from datetime import datetime
+
+import geo
+
+# Two reports belong to the same event when they share a category, were
+# filed within CLUSTER_WINDOW_MINUTES of each other and are close together.
+CLUSTER_WINDOW_MINUTES = 30
+CLUSTER_RADIUS_KM = 0.5
+
+# Only unresolved incidents can absorb new duplicates
+OPEN_STATUSES = ("pending", "assigned", "ongoing")
+
+_BUCKET_SECONDS = CLUSTER_WINDOW_MINUTES * 60
+
+
+def time_bucket(ts):
+    """Time bucket number for a datetime (one bucket per cluster window)."""
+    if isinstance(ts, str):
+        ts = datetime.fromisoformat(ts)
+    return int(ts.timestamp() // _BUCKET_SECONDS)
+
+
+def candidate_buckets(ts):
+    """Buckets that can hold a report within the window of `ts`."""
+    b = time_bucket(ts)
+    return (b - 1, b)
+
+
+def _normalize_location(text):
+    return " ".join((text or "").lower().replace(",", " ").split())
+
+
+def match_distance(new, existing):
+    """
+    Distance score between a new report and an open incident, or None if
+    they don't look like the same event. Lower is a better match.
+    """
+    if (new.incident_category or "") != (existing.incident_category or ""):
+        return None
+
+    gap = abs((new.created_at - existing.created_at).total_seconds())
+    if gap > _BUCKET_SECONDS:
+        return None
+
+    if None not in (new.latitude, new.longitude, existing.latitude, existing.longitude):
+        d = geo.haversine_km(new.latitude, new.longitude,
+                             existing.latitude, existing.longitude)
+        return d if d <= CLUSTER_RADIUS_KM else None
+
+    # No coordinates: fall back to the same (normalised) address
+    if _normalize_location(new.location) == _normalize_location(existing.location):
+        return 0.0
+    return None
+
+
+def pick_cluster(new, candidates):
+    """Best matching open incident for `new` among `candidates`, or None."""
+    best, best_score = None, None
+    for existing in candidates:
+        if existing.id == new.id:
+            continue
+        score = match_distance(new, existing)
+        if score is None:
+            continue
+        # Same type wins ties over a merely related type
+        score += 0 if existing.type == new.type else CLUSTER_RADIUS_KM
+        if best_score is None or score < best_score:
+            best, best_score = existing, score
+    return best
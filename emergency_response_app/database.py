@@ -1,90 +1,240 @@
 #database.py
-import hashlib
+import os
 import sqlite3
 import json
+import threading
+from collections import OrderedDict
 from datetime import datetime
 from models import User, Incident
+import geo
+import clustering
+import attachment_store
+import passwords
+import reporting
+from reporting import ReportEngine
+from storage import Storage
+from notifications import EventBus
+from profiler import QueryProfiler
+
+# Columns _row_to_user expects, in order (for JOINs where users.* would be ambiguous)
+USER_COLUMNS = ("id", "name", "username", "email", "password", "role", "phone", "gender",
+                "date_of_birth", "responder_category", "status", "active_incidents", "created_at")
+ATTACHMENT_KEYS = ("sha256", "original_name", "size", "mime_type", "width", "height", "storage_path")
+
+# Per-user statistics (user_stats table)
+STAT_STATUSES = ("pending", "assigned", "ongoing", "solved")
+# Upper edges (minutes) of the resolution-time histogram used for p90
+RESOLUTION_BUCKETS_MIN = (5, 10, 15, 30, 45, 60, 90, 120, 180, 240, 360, 480, 720,
+                          1440, 2880, 4320, 10080)
+
+# Setting this (to the slow-query threshold in ms, or 1 for the default) turns on profiling
+PROFILE_ENV = "ERS_PROFILE"
+# Not timed by the profiler (bookkeeping, or the profiler's own interface)
+UNPROFILED_METHODS = {"get_connection", "add_change_listener", "enable_profiling",
+                      "disable_profiling", "get_profile_report", "reset_profile"}
+# Private helpers worth timing: row decoding is often where list calls spend their time
+PROFILED_HELPERS = ("_row_to_incident", "_row_to_user", "_resolve_coordinates")
+
 
 class Database:
+    CASE_CACHE_SIZE = 32
+
     def __init__(self, db_name="emergency_response.db"):
         self.db_name = db_name
+        # (kind, key) callbacks fired after writes; kind is "incident", "user" or "cluster"
+        self._change_listeners = []
+        self._case_cache = OrderedDict()
+        self._case_lock = threading.Lock()
+        self.add_change_listener(self._invalidate_cases)
+        # Incident created/updated events pushed to subscribers (responder pages)
+        self.events = EventBus(self)
+        # Attachment store of this database file; attachments.storage_path is relative to it
+        self.attachment_dir = attachment_store.store_dir_for(db_name)
+        # Opt-in QueryProfiler (enable_profiling); None means no instrumentation at all
+        self.profiler = None
+        # Owns the users/incidents schema (shared with app_17 and App/) and migrates it
+        self.storage = Storage(db_name)
         self.init_database()
+        if os.environ.get(PROFILE_ENV):
+            try:
+                slow_ms = float(os.environ[PROFILE_ENV])
+            except ValueError:
+                slow_ms = 1
+            self.enable_profiling(slow_ms if slow_ms > 1 else None)
     
     def get_connection(self):
+        if self.profiler is not None:
+            return self.profiler.connect()
         return sqlite3.connect(self.db_name)
     
     def init_database(self):
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        # Enhanced Users table with new fields
+        # users / incidents and their indexes come from storage.schema
+
+        # Content-addressed attachments (see attachment_store.py) and the
+        # incidents that reference them
         cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                username TEXT UNIQUE NOT NULL,
-                email TEXT UNIQUE NOT NULL,
-                password TEXT NOT NULL,
-                role TEXT NOT NULL,
-                phone TEXT,
-                gender TEXT,
-                date_of_birth TEXT,
-                responder_category TEXT,
-                status TEXT DEFAULT 'available',
-                active_incidents INTEGER DEFAULT 0,
+            CREATE TABLE IF NOT EXISTS attachments (
+                sha256 TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mime_type TEXT,
+                width INTEGER,
+                height INTEGER,
+                storage_path TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS incident_attachments (
+                incident_id TEXT NOT NULL,
+                sha256 TEXT NOT NULL,
+                original_name TEXT,
+                PRIMARY KEY (incident_id, sha256),
+                FOREIGN KEY (incident_id) REFERENCES incidents (id),
+                FOREIGN KEY (sha256) REFERENCES attachments (sha256)
+            )
+        ''')
+
+        # Durable outbox for reporter submissions (see submit_pipeline.py)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS outbox (
+                local_id TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'queued',
+                incident_id TEXT,
+                attempts INTEGER DEFAULT 0,
+                last_error TEXT,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
-        
-        # Enhanced Incidents table
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_outbox_status ON outbox (status)")
+
+        # Append-only history of incident state changes (drives timelines)
         cursor.execute('''
-            CREATE TABLE IF NOT EXISTS incidents (
-                id TEXT PRIMARY KEY,
-                type TEXT NOT NULL,
-                location TEXT NOT NULL,
-                description TEXT NOT NULL,
-                priority TEXT NOT NULL,
-                status TEXT DEFAULT 'pending',
-                reporter_id TEXT NOT NULL,
-                reporter_name TEXT NOT NULL,
+            CREATE TABLE IF NOT EXISTS incident_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                incident_id TEXT NOT NULL,
+                ts TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                from_status TEXT,
+                to_status TEXT,
                 responder_id TEXT,
                 responder_name TEXT,
-                incident_category TEXT,
-                specific_questions TEXT,
-                emergency_feedback TEXT,
-                assigned_responders TEXT,
-                attachments TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (reporter_id) REFERENCES users (id),
-                FOREIGN KEY (responder_id) REFERENCES users (id)
+                actor_id TEXT,
+                actor_name TEXT,
+                FOREIGN KEY (incident_id) REFERENCES incidents (id)
+            )
+        ''')
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_incident_events_incident_ts "
+            "ON incident_events (incident_id, ts)"
+        )
+        # (user, ts) -> event for every event of an incident the user reported or
+        # was responder on, so a user's timeline is an index range, not a join + sort
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS incident_event_users (
+                user_id TEXT NOT NULL,
+                ts TEXT NOT NULL,
+                event_id INTEGER NOT NULL,
+                PRIMARY KEY (user_id, ts, event_id)
+            ) WITHOUT ROWID
+        ''')
+        # One-off maintenance progress, e.g. how far _backfill_events has looked
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS markers (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
             )
         ''')
+        self._backfill_events(cursor)
+        cursor.execute("SELECT 1 FROM incident_event_users LIMIT 1")
+        if cursor.fetchone() is None:
+            self._link_event_users(cursor, "1")
 
-        # Add attachments column to existing databases that don't have it yet
-        try:
-            cursor.execute("ALTER TABLE incidents ADD COLUMN attachments TEXT")
-        except Exception:
-            pass  # Column already exists, skip
+        # Per-user counters kept up to date on every incident transition
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS user_stats (
+                user_id TEXT NOT NULL,
+                role TEXT NOT NULL,
+                total INTEGER DEFAULT 0,
+                pending INTEGER DEFAULT 0,
+                assigned INTEGER DEFAULT 0,
+                ongoing INTEGER DEFAULT 0,
+                solved INTEGER DEFAULT 0,
+                resolved_count INTEGER DEFAULT 0,
+                resolution_total_s REAL DEFAULT 0,
+                resolution_hist TEXT,
+                last_activity TEXT,
+                PRIMARY KEY (user_id, role)
+            )
+        ''')
+        # SLA breaches recorded by sla_monitor.SlaMonitor
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sla_breaches (
+                incident_id TEXT PRIMARY KEY,
+                priority TEXT,
+                deadline TEXT NOT NULL,
+                breached_at TEXT NOT NULL,
+                resolved_at TEXT,
+                FOREIGN KEY (incident_id) REFERENCES incidents (id)
+            )
+        ''')
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_sla_breaches_open ON sla_breaches (resolved_at, deadline)"
+        )
+
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM user_stats), EXISTS (SELECT 1 FROM incidents)")
+        has_stats, has_incidents = cursor.fetchone()
+        if has_incidents and not has_stats:
+            self._rebuild_user_stats(cursor)
+
+        # Extended profile table (also created by Profile); responders'
+        # base location lives here
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS user_profiles (
+                user_id TEXT PRIMARY KEY,
+                full_name TEXT,
+                address TEXT,
+                phone TEXT,
+                backup_numbers TEXT,
+                email TEXT,
+                backup_addresses TEXT,
+                country TEXT,
+                city TEXT,
+                responder_category TEXT,
+                responder_role TEXT,
+                work_position TEXT,
+                extra_json TEXT,
+                FOREIGN KEY (user_id) REFERENCES users (id)
+            )
+        ''')
+        for column in ("latitude REAL", "longitude REAL", "geo_cell TEXT"):
+            try:
+                cursor.execute(f"ALTER TABLE user_profiles ADD COLUMN {column}")
+            except Exception:
+                pass
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_profiles_geo_cell ON user_profiles (geo_cell)")
         
         # Create default admin user
         cursor.execute('''
             INSERT OR IGNORE INTO users (id, name, username, email, password, role, status)
             VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', ('admin001', 'System Admin', 'Admin', 'admin@ers.com', hashlib.sha256("Admin@123".encode()).hexdigest(), 'admin', 'available'))
+        ''', ('admin001', 'System Admin', 'Admin', 'admin@ers.com', self._seed_password(cursor, 'admin001', "Admin@123"), 'admin', 'available'))
 
         
         # Create sample responders
         cursor.execute('''
             INSERT OR IGNORE INTO users (id, name, username, email, password, role, status, responder_category)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', ('resp001', 'John Responder', 'john_responder', 'responder@ers.com', hashlib.sha256("Resp@123".encode()).hexdigest(), 'responder', 'available', 'Fire'))
+        ''', ('resp001', 'John Responder', 'john_responder', 'responder@ers.com', self._seed_password(cursor, 'resp001', "Resp@123"), 'responder', 'available', 'Fire'))
         
         cursor.execute('''
             INSERT OR IGNORE INTO users (id, name, username, email, password, role, status, responder_category)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', ('resp002', 'Sarah Medic', 'sarah_medic', 'medic@ers.com', hashlib.sha256("Medic@123".encode()).hexdigest(), 'responder', 'available', 'Medical'))
+        ''', ('resp002', 'Sarah Medic', 'sarah_medic', 'medic@ers.com', self._seed_password(cursor, 'resp002', "Medic@123"), 'responder', 'available', 'Medical'))
         
         # Create sample reporters
         cursor.execute('''
@@ -92,17 +242,25 @@ class Database:
             (id, name, username, email, password, role, status, phone, gender)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
-            'rept001', 'Alex Reporter', 'alex_reporter', 'alex@ers.com', hashlib.sha256("Report@123".encode()).hexdigest(), 'reporter', 'active', '01710000001', 'Male'))
+            'rept001', 'Alex Reporter', 'alex_reporter', 'alex@ers.com', self._seed_password(cursor, 'rept001', "Report@123"), 'reporter', 'active', '01710000001', 'Male'))
 
         cursor.execute('''
             INSERT OR IGNORE INTO users 
             (id, name, username, email, password, role, status, phone, gender)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
-            'rept002', 'Maya Citizen', 'maya_citizen', 'maya@ers.com', hashlib.sha256("Citizen@123".encode()).hexdigest(), 'reporter', 'active', '01710000002', 'Female'))
+            'rept002', 'Maya Citizen', 'maya_citizen', 'maya@ers.com', self._seed_password(cursor, 'rept002', "Citizen@123"), 'reporter', 'active', '01710000002', 'Female'))
 
         conn.commit()
         conn.close()
+
+    @staticmethod
+    def _seed_password(cursor, user_id, password):
+        """Hash a seed account's password only when the account is missing."""
+        cursor.execute("SELECT 1 FROM users WHERE id = ?", (user_id,))
+        if cursor.fetchone():
+            return ""       # INSERT OR IGNORE skips the row anyway
+        return passwords.hash_password(password)
     
     def create_user(self, user):
         conn = self.get_connection()
@@ -176,25 +334,78 @@ class Database:
         conn.close()
         return [self._row_to_user(row) for row in rows]
     
-    def create_incident(self, incident):
+    def _resolve_coordinates(self, incident):
+        """Fill in incident.latitude/longitude from the gazetteer if missing."""
+        if getattr(incident, 'latitude', None) is None or getattr(incident, 'longitude', None) is None:
+            coords = geo.geocode(incident.location)
+            if coords:
+                incident.latitude, incident.longitude = coords
+        return getattr(incident, 'latitude', None), getattr(incident, 'longitude', None)
+
+    def create_incident(self, incident, client_uuid=None):
+        lat, lon = self._resolve_coordinates(incident)
+
         conn = self.get_connection()
         cursor = conn.cursor()
+        # Candidates are read under the write lock, so two reports of the
+        # same event arriving together cannot both become primaries
+        cursor.execute("BEGIN IMMEDIATE")
+        # Online clustering: link to an open report of the same event
+        if getattr(incident, 'cluster_id', None) is None:
+            primary = clustering.pick_cluster(incident, self._cluster_candidates(cursor, incident))
+            if primary is not None:
+                incident.cluster_id = primary.id
+        if incident.cluster_id:
+            # A duplicate starts where its primary is (see _sync_cluster)
+            cursor.execute(
+                'SELECT status, responder_id, responder_name, assigned_responders '
+                'FROM incidents WHERE id = ?', (incident.cluster_id,)
+            )
+            row = cursor.fetchone()
+            if row is not None:
+                incident.status, incident.responder_id, incident.responder_name = row[:3]
+                incident.assigned_responders = json.loads(row[3]) if row[3] else []
+
         cursor.execute('''
             INSERT INTO incidents 
             (id, type, location, description, priority, status, reporter_id, reporter_name, 
+            responder_id, responder_name,
             incident_category, specific_questions, emergency_feedback, assigned_responders,
-            attachments, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            attachments, created_at, updated_at, latitude, longitude, geo_cell,
+            cluster_id, time_bucket, client_uuid)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (incident.id, incident.type, incident.location, incident.description, 
             incident.priority, incident.status, incident.reporter_id, 
-            incident.reporter_name, incident.incident_category,
+            incident.reporter_name, incident.responder_id, incident.responder_name,
+            incident.incident_category,
             json.dumps(incident.specific_questions), incident.emergency_feedback,
             json.dumps(incident.assigned_responders),
             json.dumps(getattr(incident, 'attachments', [])),
-            incident.created_at, incident.updated_at))
+            incident.created_at, incident.updated_at,
+            lat, lon, geo.cell_for(lat, lon),
+            incident.cluster_id, clustering.time_bucket(incident.created_at), client_uuid))
+        self._record_event(cursor, incident.id, "created", None, incident.status,
+                           ts=incident.created_at,
+                           responder_id=incident.responder_id,
+                           responder_name=incident.responder_name,
+                           actor_id=incident.reporter_id,
+                           actor_name=incident.reporter_name)
+        self._apply_stats(cursor, None,
+                          (incident.status, incident.responder_id, incident.reporter_id,
+                           incident.created_at), incident.created_at)
         conn.commit()
         conn.close()
-    
+        self._notify("incident", incident.id, created=True)
+
+    def get_incident_id_for_client_uuid(self, client_uuid):
+        """Id of the incident created from a given client submission, or None."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT id FROM incidents WHERE client_uuid = ?', (client_uuid,))
+        row = cursor.fetchone()
+        conn.close()
+        return row[0] if row else None
+
     def get_incident_by_id(self, incident_id):
         conn = self.get_connection()
         cursor = conn.cursor()
@@ -230,23 +441,58 @@ class Database:
         conn.close()
         return [self._row_to_incident(row) for row in rows]
     
-    def update_incident(self, incident):
+    def update_incident(self, incident, actor=None):
+        """
+        Save an incident. Status / responder changes are logged to
+        incident_events in the same transaction; pass the acting user as
+        `actor` so the log knows who did it.
+        """
+        lat, lon = self._resolve_coordinates(incident)
         conn = self.get_connection()
         cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute(
+            'SELECT status, responder_id, reporter_id, created_at FROM incidents WHERE id = ?',
+            (incident.id,)
+        )
+        before = cursor.fetchone()
         cursor.execute('''
             UPDATE incidents SET 
             type=?, location=?, description=?, priority=?, status=?, 
             reporter_id=?, reporter_name=?, responder_id=?, responder_name=?, 
             incident_category=?, specific_questions=?, emergency_feedback=?,
-            assigned_responders=?, updated_at=?
+            assigned_responders=?, updated_at=?, latitude=?, longitude=?, geo_cell=?
             WHERE id=?
         ''', (incident.type, incident.location, incident.description, incident.priority,
             incident.status, incident.reporter_id, incident.reporter_name,
             incident.responder_id, incident.responder_name, incident.incident_category,
             json.dumps(incident.specific_questions), incident.emergency_feedback,
-            json.dumps(incident.assigned_responders), incident.updated_at, incident.id))
+            json.dumps(incident.assigned_responders), incident.updated_at,
+            lat, lon, geo.cell_for(lat, lon), incident.id))
+        if before is not None:
+            kind = self._transition_kind(before[0], before[1], incident.status,
+                                         incident.responder_id, actor)
+            if kind:
+                self._record_event(cursor, incident.id, kind, before[0], incident.status,
+                                   ts=incident.updated_at,
+                                   responder_id=incident.responder_id,
+                                   responder_name=incident.responder_name,
+                                   actor_id=actor.id if actor else None,
+                                   actor_name=actor.name if actor else None)
+            self._apply_stats(cursor, before,
+                              (incident.status, incident.responder_id, incident.reporter_id,
+                               before[3]), incident.updated_at)
+        # Duplicate reports follow their primary, whichever page made the change
+        synced = 0
+        if not getattr(incident, 'cluster_id', None):
+            synced = self._sync_cluster(cursor, incident.id, incident.status,
+                                        incident.responder_id, incident.responder_name,
+                                        incident.updated_at)
         conn.commit()
         conn.close()
+        self._notify("incident", incident.id)
+        if synced:
+            self._notify("cluster", incident.id)
     
     def update_user(self, user):
         conn = self.get_connection()
@@ -261,28 +507,13 @@ class Database:
             user.status, user.active_incidents, user.id))
         conn.commit()
         conn.close()
+        self._notify("user", user.id)
     
     def get_incident_count_by_status(self, status):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(*) FROM incidents WHERE status = ?', (status,))
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count
+        return self.storage.incidents.count_by_status().get(status, 0)
     
     def get_next_incident_id(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT id FROM incidents WHERE id LIKE 'INC-%' ORDER BY id DESC LIMIT 1")
-        row = cursor.fetchone()
-        conn.close()
-        if row:
-            try:
-                last_num = int(row[0].split('-')[1])
-                return f"INC-{last_num + 1:03d}"
-            except (IndexError, ValueError):
-                pass
-        return "INC-001"
+        return self.storage.incidents.next_id()
     
     def get_next_user_id(self, role):
         conn = self.get_connection()
@@ -328,18 +559,46 @@ class Database:
             assigned_responders=json.loads(row[13]) if row[13] else [],
             attachments=json.loads(row[14]) if row[14] else [],
             created_at=datetime.fromisoformat(row[15]) if isinstance(row[15], str) else row[15],
-            updated_at=datetime.fromisoformat(row[16]) if isinstance(row[16], str) else row[16]
+            updated_at=datetime.fromisoformat(row[16]) if isinstance(row[16], str) else row[16],
+            latitude=row[17] if len(row) > 17 else None,
+            longitude=row[18] if len(row) > 18 else None,
+            cluster_id=row[20] if len(row) > 20 else None
         )
 
     def assign_responder(self, incident_id, responder_id, responder_name):
         """Set responder and mark incident as assigned."""
+        now = datetime.now()
         conn = self.get_connection()
         cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute(
+            'SELECT status, responder_id, reporter_id, created_at FROM incidents WHERE id = ?',
+            (incident_id,)
+        )
+        before = cursor.fetchone()
         cursor.execute("""
             UPDATE incidents
             SET responder_id = ?, responder_name = ?, status = ?, updated_at = ?
             WHERE id = ?
-        """, (responder_id, responder_name, "assigned", datetime.now().isoformat(), incident_id))
+        """, (responder_id, responder_name, "assigned", now.isoformat(), incident_id))
+        if before is not None:
+            self._record_event(cursor, incident_id, "reassigned" if before[1] else "assigned",
+                               before[0], "assigned", ts=now,
+                               responder_id=responder_id, responder_name=responder_name)
+            self._apply_stats(cursor, before, ("assigned", responder_id, before[2], before[3]), now)
+        synced = self._sync_cluster(cursor, incident_id, "assigned", responder_id,
+                                    responder_name, now.isoformat())
+        conn.commit()
+        conn.close()
+        self._notify("incident", incident_id)
+        if synced:
+            self._notify("cluster", incident_id)
+
+    def update_password(self, user_id, encoded):
+        """Store a new password hash (e.g. after upgrading a legacy one)."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("UPDATE users SET password = ? WHERE id = ?", (encoded, user_id))
         conn.commit()
         conn.close()
 
@@ -354,3 +613,915 @@ class Database:
         """, (new_status, datetime.now().isoformat(), user_id))
         conn.commit()
         conn.close()
+        self._notify("user", user_id)
+
+    # ------------------------------------------------------------------ geo
+    def set_user_location(self, user_id, latitude, longitude):
+        """Store a user's (responder's) base coordinates in user_profiles."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("INSERT OR IGNORE INTO user_profiles (user_id) VALUES (?)", (user_id,))
+        cursor.execute("""
+            UPDATE user_profiles
+            SET latitude = ?, longitude = ?, geo_cell = ?
+            WHERE user_id = ?
+        """, (latitude, longitude, geo.cell_for(latitude, longitude), user_id))
+        conn.commit()
+        conn.close()
+
+    def find_incidents_near(self, lat, lon, radius_km, statuses=None):
+        """
+        Incidents within radius_km of (lat, lon), nearest first.
+        Returns a list of (incident, distance_km).
+        """
+        cells = geo.cells_covering(lat, lon, radius_km)
+        if cells is not None:
+            where = f"geo_cell IN ({','.join('?' * len(cells))})"
+            params = list(cells)
+        else:
+            min_lat, max_lat, min_lon, max_lon = geo.bounding_box(lat, lon, radius_km)
+            where = "latitude BETWEEN ? AND ? AND longitude BETWEEN ? AND ?"
+            params = [min_lat, max_lat, min_lon, max_lon]
+        if statuses:
+            where += f" AND status IN ({','.join('?' * len(statuses))})"
+            params.extend(statuses)
+
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT * FROM incidents WHERE {where}", params)
+        rows = cursor.fetchall()
+        conn.close()
+
+        results = []
+        for row in rows:
+            d = geo.haversine_km(lat, lon, row[17], row[18])
+            if d <= radius_km:
+                results.append((self._row_to_incident(row), d))
+        results.sort(key=lambda pair: pair[1])
+        return results
+
+    def nearest_available_responders(self, incident, k=3, max_radius_km=16):
+        """
+        The k closest available responders to an incident, as a list of
+        (user, distance_km). Searches growing rings of grid cells and only
+        falls back to every located responder past max_radius_km.
+        """
+        lat, lon = self._resolve_coordinates(incident)
+        if lat is None or lon is None:
+            return []
+
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        base_sql = '''
+            SELECT u.*, p.latitude, p.longitude
+            FROM users u JOIN user_profiles p ON p.user_id = u.id
+            WHERE u.role = 'responder' AND u.status = 'available'
+              AND p.latitude IS NOT NULL AND p.longitude IS NOT NULL
+        '''
+
+        radius = 2.0
+        ranked = []
+        while True:
+            cells = geo.cells_covering(lat, lon, radius) if radius <= max_radius_km else None
+            if cells is not None:
+                cursor.execute(
+                    base_sql + f" AND p.geo_cell IN ({','.join('?' * len(cells))})", cells
+                )
+            else:
+                cursor.execute(base_sql)
+            ranked = []
+            for row in cursor.fetchall():
+                d = geo.haversine_km(lat, lon, row[-2], row[-1])
+                if cells is None or d <= radius:
+                    ranked.append((self._row_to_user(row), d))
+            if len(ranked) >= k or cells is None:
+                break
+            radius *= 2
+        conn.close()
+
+        ranked.sort(key=lambda pair: pair[1])
+        return ranked[:k]
+
+    # ------------------------------------------------------------------ clustering
+    def find_cluster_candidates(self, incident):
+        """
+        Open primary incidents in the same category whose time bucket is
+        within one cluster window of `incident`. Uses the
+        (incident_category, time_bucket) index, so only a handful of rows
+        are ever compared.
+        """
+        conn = self.get_connection()
+        candidates = self._cluster_candidates(conn.cursor(), incident)
+        conn.close()
+        return candidates
+
+    def _cluster_candidates(self, cursor, incident):
+        """find_cluster_candidates inside the caller's transaction."""
+        buckets = clustering.candidate_buckets(incident.created_at)
+        cursor.execute(f'''
+            SELECT * FROM incidents
+            WHERE incident_category = ? AND time_bucket IN (?, ?)
+              AND cluster_id IS NULL
+              AND status IN ({','.join('?' * len(clustering.OPEN_STATUSES))})
+        ''', (incident.incident_category, *buckets, *clustering.OPEN_STATUSES))
+        return [self._row_to_incident(row) for row in cursor.fetchall()]
+
+    def get_linked_incidents(self, primary_id):
+        """Duplicate reports linked to a primary incident."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            'SELECT * FROM incidents WHERE cluster_id = ? ORDER BY created_at', (primary_id,)
+        )
+        rows = cursor.fetchall()
+        conn.close()
+        return [self._row_to_incident(row) for row in rows]
+
+    def sync_cluster(self, primary):
+        """
+        Copy the primary incident's responder and status onto its duplicates.
+        update_incident / assign_responder already do this; it is only
+        needed after writes made some other way.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        synced = self._sync_cluster(cursor, primary.id, primary.status, primary.responder_id,
+                                    primary.responder_name, primary.updated_at)
+        conn.commit()
+        conn.close()
+        if synced:
+            self._notify("cluster", primary.id)
+
+    def _sync_cluster(self, cursor, primary_id, status, responder_id, responder_name, updated_at):
+        """
+        sync_cluster inside the caller's transaction; returns how many
+        duplicates changed (the caller notifies "cluster" when any did).
+        """
+        # Log the change for every duplicate it actually affects
+        cursor.execute("""
+            INSERT INTO incident_events
+            (incident_id, ts, kind, from_status, to_status, responder_id, responder_name, actor_name)
+            SELECT id, ?,
+                   CASE WHEN ? = 'solved' THEN 'solved'
+                        WHEN responder_id IS NULL AND ? IS NOT NULL THEN 'assigned'
+                        WHEN responder_id IS NOT ? THEN 'reassigned'
+                        WHEN ? = 'ongoing' THEN 'accepted'
+                        ELSE 'status' END,
+                   status, ?, ?, ?, ?
+            FROM incidents
+            WHERE cluster_id = ? AND (status IS NOT ? OR responder_id IS NOT ?)
+        """, (self._ts(updated_at), status, responder_id,
+              responder_id, status,
+              status, responder_id, responder_name,
+              f"Linked to {primary_id}", primary_id, status, responder_id))
+        cursor.execute("""
+            SELECT status, responder_id, reporter_id, created_at FROM incidents
+            WHERE cluster_id = ? AND (status IS NOT ? OR responder_id IS NOT ?)
+        """, (primary_id, status, responder_id))
+        changed = cursor.fetchall()
+        for before in changed:
+            self._apply_stats(cursor, before, (status, responder_id, before[2], before[3]),
+                              updated_at)
+        if changed:
+            cursor.execute("""
+                UPDATE incidents
+                SET responder_id = ?, responder_name = ?, status = ?, updated_at = ?
+                WHERE cluster_id = ?
+            """, (responder_id, responder_name, status, updated_at, primary_id))
+            self._link_event_users(cursor, "i.cluster_id = ?", (primary_id,))
+        return len(changed)
+
+    def unlink_incident(self, incident_id):
+        """Detach a report from its cluster (admin says it's a separate event)."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('UPDATE incidents SET cluster_id = NULL WHERE id = ?', (incident_id,))
+        conn.commit()
+        conn.close()
+        self._notify("incident", incident_id)
+
+    # ------------------------------------------------------------------ attachments
+    def save_attachment(self, meta):
+        """Record a stored attachment's metadata (no-op if already known)."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT OR IGNORE INTO attachments (sha256, size, mime_type, width, height, storage_path)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (meta["sha256"], meta["size"], meta.get("mime_type"), meta.get("width"),
+              meta.get("height"), meta["storage_path"]))
+        conn.commit()
+        conn.close()
+
+    def link_attachment(self, incident_id, sha256, original_name=""):
+        """
+        Attach a stored file to an incident. Also keeps the incident's
+        attachments JSON list (of sha256 digests) in step.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT OR IGNORE INTO incident_attachments (incident_id, sha256, original_name)
+            VALUES (?, ?, ?)
+        """, (incident_id, sha256, original_name))
+        if cursor.rowcount:
+            cursor.execute("SELECT attachments FROM incidents WHERE id = ?", (incident_id,))
+            row = cursor.fetchone()
+            refs = json.loads(row[0]) if row and row[0] else []
+            if sha256 not in refs:
+                refs.append(sha256)
+                cursor.execute("UPDATE incidents SET attachments = ? WHERE id = ?",
+                               (json.dumps(refs), incident_id))
+        conn.commit()
+        conn.close()
+        self._notify("incident", incident_id)
+
+    def get_incident_attachments(self, incident_id):
+        """Attachment metadata dicts for an incident, in the order they were linked."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT a.sha256, ia.original_name, a.size, a.mime_type, a.width, a.height, a.storage_path
+            FROM incident_attachments ia JOIN attachments a ON a.sha256 = ia.sha256
+            WHERE ia.incident_id = ?
+            ORDER BY ia.rowid
+        """, (incident_id,))
+        rows = cursor.fetchall()
+        conn.close()
+        return [self._attachment_meta(row) for row in rows]
+
+    def _attachment_meta(self, row):
+        """ATTACHMENT_KEYS dict, storage_path resolved against this database's store."""
+        meta = dict(zip(ATTACHMENT_KEYS, row))
+        meta["storage_path"] = attachment_store.resolve_path(self.attachment_dir, meta["storage_path"])
+        return meta
+
+    # ------------------------------------------------------------------ incident events
+    @staticmethod
+    def _ts(value):
+        """Event timestamps are ISO strings so they sort and range-scan correctly."""
+        if value is None:
+            return datetime.now().isoformat()
+        if isinstance(value, str):
+            return value.replace(" ", "T")
+        return value.isoformat()
+
+    @staticmethod
+    def _transition_kind(old_status, old_responder, new_status, new_responder, actor=None):
+        """Name the state change between two incident snapshots, or None."""
+        if new_status == "solved" and old_status != "solved":
+            return "solved"
+        if new_responder != old_responder and new_responder:
+            if actor is not None and actor.id == new_responder:
+                return "accepted"           # responder took the case themselves
+            return "reassigned" if old_responder else "assigned"
+        if new_status == "ongoing" and old_status != "ongoing":
+            return "accepted"
+        if new_status != old_status:
+            return "status"
+        return None
+
+    def _record_event(self, cursor, incident_id, kind, from_status, to_status, ts=None,
+                      responder_id=None, responder_name=None, actor_id=None, actor_name=None):
+        """Append one event using the caller's cursor (same transaction as the change)."""
+        cursor.execute("""
+            INSERT INTO incident_events
+            (incident_id, ts, kind, from_status, to_status, responder_id, responder_name,
+             actor_id, actor_name)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (incident_id, self._ts(ts), kind, from_status, to_status, responder_id,
+              responder_name, actor_id, actor_name))
+        # Also links the incident's earlier events to a newly assigned responder
+        self._link_event_users(cursor, "i.id = ?", (incident_id,))
+
+    @staticmethod
+    def _link_event_users(cursor, where, params=()):
+        """Index the events of the incidents matching `where` under their reporter and responder."""
+        for column in ("reporter_id", "responder_id"):
+            cursor.execute(f"""
+                INSERT OR IGNORE INTO incident_event_users (user_id, ts, event_id)
+                SELECT i.{column}, e.ts, e.id
+                FROM incidents i JOIN incident_events e ON e.incident_id = i.id
+                WHERE i.{column} IS NOT NULL AND {where}
+            """, params)
+
+    def _backfill_events(self, cursor):
+        """
+        Give incidents that predate the event log (or were written by
+        app_17 / App/, which keep none) a best-effort history: created,
+        plus assigned / solved at updated_at. Only incidents added since
+        the last run are looked at (the "events_backfilled" rowid marker),
+        so a start-up costs nothing once the history is complete.
+        """
+        cursor.execute("SELECT value FROM markers WHERE name = 'events_backfilled'")
+        row = cursor.fetchone()
+        done = row[0] if row else 0
+        cursor.execute("SELECT COALESCE(MAX(rowid), 0) FROM incidents")
+        upto = cursor.fetchone()[0]
+        if upto <= done:
+            return
+        cursor.execute("""
+            SELECT id, created_at, updated_at, status, reporter_id, reporter_name,
+                   responder_id, responder_name
+            FROM incidents i
+            WHERE i.rowid > ? AND i.rowid <= ?
+              AND NOT EXISTS (SELECT 1 FROM incident_events e WHERE e.incident_id = i.id)
+        """, (done, upto))
+        for (inc_id, created, updated, status, rep_id, rep_name,
+             resp_id, resp_name) in cursor.fetchall():
+            self._record_event(cursor, inc_id, "created", None, "pending", ts=created,
+                               actor_id=rep_id, actor_name=rep_name)
+            if resp_id:
+                self._record_event(cursor, inc_id, "assigned", "pending", status, ts=updated,
+                                   responder_id=resp_id, responder_name=resp_name)
+            if status == "solved":
+                self._record_event(cursor, inc_id, "solved", None, "solved", ts=updated,
+                                   responder_id=resp_id, responder_name=resp_name)
+        cursor.execute("INSERT OR REPLACE INTO markers (name, value) VALUES ('events_backfilled', ?)",
+                       (upto,))
+
+    def iter_incident_events(self, incident_id=None, user_id=None, since=None, until=None,
+                             newest_first=False, batch_size=500, limit=None):
+        """
+        Stream incident events as dicts, oldest first by default.
+
+        Filter by one incident (uses the (incident_id, ts) index), by a
+        user involved as reporter or responder (the incident_event_users
+        (user_id, ts) key, already in timeline order), and/or by a
+        [since, until) time range; `limit` caps the rows in SQL. Rows are
+        fetched batch_size at a time, so long histories never sit in
+        memory all at once.
+        """
+        clauses, params = [], []
+        source, ts_col, id_col = "incident_events e", "e.ts", "e.id"
+        if user_id is not None:
+            source = "incident_event_users u JOIN incident_events e ON e.id = u.event_id"
+            ts_col, id_col = "u.ts", "u.event_id"
+            clauses.append("u.user_id = ?")
+            params.append(user_id)
+        if incident_id is not None:
+            clauses.append("e.incident_id = ?")
+            params.append(incident_id)
+        if since is not None:
+            clauses.append(f"{ts_col} >= ?")
+            params.append(self._ts(since))
+        if until is not None:
+            clauses.append(f"{ts_col} < ?")
+            params.append(self._ts(until))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        order = "DESC" if newest_first else "ASC"
+        limit_sql = ""
+        if limit is not None:
+            limit_sql = "LIMIT ?"
+            params.append(limit)
+
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT e.incident_id, e.ts, e.kind, e.from_status, e.to_status,
+                       e.responder_id, e.responder_name, e.actor_id, e.actor_name
+                FROM {source}
+                {where}
+                ORDER BY {ts_col} {order}, {id_col} {order}
+                {limit_sql}
+            """, params)
+            keys = ("incident_id", "ts", "kind", "from_status", "to_status",
+                    "responder_id", "responder_name", "actor_id", "actor_name")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    event = dict(zip(keys, row))
+                    event["ts"] = datetime.fromisoformat(event["ts"])
+                    yield event
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------------------ user stats
+    def _apply_stats(self, cursor, before, after, ts):
+        """
+        Move an incident between user_stats counters. `before` / `after`
+        are (status, responder_id, reporter_id, created_at) snapshots,
+        `before` None for a new incident. Runs in the caller's transaction.
+        """
+        ts = self._ts(ts)
+        for role, idx in (("responder", 1), ("reporter", 2)):
+            old_user = before[idx] if before else None
+            new_user = after[idx]
+            old_status = before[0] if before else None
+            if old_user == new_user and old_status == after[0]:
+                continue
+            if old_user:
+                self._bump_stats(cursor, old_user, role, old_status, -1, ts)
+            if new_user:
+                self._bump_stats(cursor, new_user, role, after[0], 1, ts)
+
+        if after[0] == "solved" and (before is None or before[0] != "solved"):
+            seconds = (datetime.fromisoformat(ts) -
+                       datetime.fromisoformat(self._ts(after[3]))).total_seconds()
+            for role, user_id in (("responder", after[1]), ("reporter", after[2])):
+                if user_id:
+                    self._add_resolution(cursor, user_id, role, max(0.0, seconds))
+
+    @staticmethod
+    def _bump_stats(cursor, user_id, role, status, delta, ts):
+        cursor.execute("INSERT OR IGNORE INTO user_stats (user_id, role) VALUES (?, ?)",
+                       (user_id, role))
+        status_sql = f", {status} = {status} + ?" if status in STAT_STATUSES else ""
+        params = [delta] + ([delta] if status_sql else []) + [ts, user_id, role]
+        cursor.execute(f"""
+            UPDATE user_stats
+            SET total = total + ?{status_sql},
+                last_activity = MAX(COALESCE(last_activity, ''), ?)
+            WHERE user_id = ? AND role = ?
+        """, params)
+
+    @staticmethod
+    def _add_resolution(cursor, user_id, role, seconds):
+        cursor.execute("SELECT resolution_hist FROM user_stats WHERE user_id = ? AND role = ?",
+                       (user_id, role))
+        row = cursor.fetchone()
+        hist = json.loads(row[0]) if row and row[0] else [0] * (len(RESOLUTION_BUCKETS_MIN) + 1)
+        minutes = seconds / 60
+        bucket = next((i for i, edge in enumerate(RESOLUTION_BUCKETS_MIN) if minutes <= edge),
+                      len(RESOLUTION_BUCKETS_MIN))
+        hist[bucket] += 1
+        cursor.execute("""
+            UPDATE user_stats
+            SET resolved_count = resolved_count + 1,
+                resolution_total_s = resolution_total_s + ?,
+                resolution_hist = ?
+            WHERE user_id = ? AND role = ?
+        """, (seconds, json.dumps(hist), user_id, role))
+
+    def _rebuild_user_stats(self, cursor):
+        """Recompute user_stats from scratch (first run / repair)."""
+        cursor.execute("DELETE FROM user_stats")
+        cursor.execute("""
+            SELECT i.status, i.responder_id, i.reporter_id, i.created_at,
+                   COALESCE(MAX(e.ts), i.updated_at, i.created_at)
+            FROM incidents i
+            LEFT JOIN incident_events e ON e.incident_id = i.id
+            GROUP BY i.id
+        """)
+        for status, responder_id, reporter_id, created_at, last_ts in cursor.fetchall():
+            after = ("pending", responder_id, reporter_id, created_at)
+            self._apply_stats(cursor, None, after, created_at)
+            if status != "pending":
+                self._apply_stats(cursor, after, (status,) + after[1:], last_ts)
+
+    def rebuild_user_stats(self):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        self._rebuild_user_stats(cursor)
+        conn.commit()
+        conn.close()
+
+    def get_user_stats(self, user_id, role):
+        """
+        Dashboard numbers for one user as "reporter" or "responder": status
+        totals, mean / p90 resolution time (seconds, p90 from the histogram
+        bucket edge), overdue count and last activity.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT total, pending, assigned, ongoing, solved, resolved_count,
+                   resolution_total_s, resolution_hist, last_activity
+            FROM user_stats WHERE user_id = ? AND role = ?
+        """, (user_id, role))
+        row = cursor.fetchone() or (0, 0, 0, 0, 0, 0, 0.0, None, None)
+        # Same rows as get_overdue_incidents, counted without loading them
+        column = "responder_id" if role == "responder" else "reporter_id"
+        cursor.execute(f"""
+            SELECT COUNT(*)
+            FROM sla_breaches b JOIN incidents i ON i.id = b.incident_id
+            WHERE b.resolved_at IS NULL AND i.{column} = ?
+        """, (user_id,))
+        overdue = cursor.fetchone()[0]
+        conn.close()
+
+        total, pending, assigned, ongoing, solved, resolved, res_total, hist, last = row
+        p90 = None
+        if hist and resolved:
+            hist = json.loads(hist)
+            target = 0.9 * resolved
+            running = 0
+            for i, count in enumerate(hist):
+                running += count
+                if running >= target:
+                    edge = RESOLUTION_BUCKETS_MIN[i] if i < len(RESOLUTION_BUCKETS_MIN) else None
+                    p90 = edge * 60 if edge is not None else res_total / resolved
+                    break
+        return {
+            "total": total,
+            "pending": pending,
+            "assigned": assigned,
+            "ongoing": ongoing,
+            "active": assigned + ongoing,
+            "solved": solved,
+            "mean_resolution_s": res_total / resolved if resolved else None,
+            "p90_resolution_s": p90,
+            "overdue": overdue,
+            "last_activity": datetime.fromisoformat(last) if last else None,
+        }
+
+    def get_overdue_incidents(self, user_id, role):
+        """
+        [(incident, sla_deadline)] for the user's open incidents with an
+        unresolved SLA breach, most overdue first. Reads the breaches the
+        SLA monitor recorded, so this is an index lookup, not a scan.
+        """
+        column = "responder_id" if role == "responder" else "reporter_id"
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT i.*, b.deadline
+            FROM sla_breaches b JOIN incidents i ON i.id = b.incident_id
+            WHERE b.resolved_at IS NULL AND i.{column} = ?
+            ORDER BY b.deadline
+        """, (user_id,))
+        rows = cursor.fetchall()
+        conn.close()
+        return [(self._row_to_incident(row[:-1]), datetime.fromisoformat(row[-1])) for row in rows]
+
+    def get_incidents_page(self, user_id, role, offset=0, limit=50):
+        """One page of a user's incidents, newest first (index-backed)."""
+        column = "responder_id" if role == "responder" else "reporter_id"
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT * FROM incidents WHERE {column} = ?
+            ORDER BY created_at DESC LIMIT ? OFFSET ?
+        """, (user_id, limit, offset))
+        rows = cursor.fetchall()
+        conn.close()
+        return [self._row_to_incident(row) for row in rows]
+
+    # ------------------------------------------------------------------ SLA
+    def get_open_incidents(self):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT * FROM incidents WHERE status IN ({','.join('?' * len(clustering.OPEN_STATUSES))})",
+            clustering.OPEN_STATUSES,
+        )
+        rows = cursor.fetchall()
+        conn.close()
+        return [self._row_to_incident(row) for row in rows]
+
+    def record_sla_breach(self, incident_id, priority, deadline):
+        """Persist a breach once; returns False if it was already recorded."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT OR IGNORE INTO sla_breaches (incident_id, priority, deadline, breached_at)
+            VALUES (?, ?, ?, ?)
+        """, (incident_id, priority, self._ts(deadline), self._ts(None)))
+        added = cursor.rowcount > 0
+        conn.commit()
+        conn.close()
+        return added
+
+    def resolve_sla_breach(self, incident_id):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE sla_breaches SET resolved_at = ? WHERE incident_id = ? AND resolved_at IS NULL",
+            (self._ts(None), incident_id),
+        )
+        conn.commit()
+        conn.close()
+
+    def get_sla_breaches(self, open_only=True):
+        """Breach rows as dicts, most overdue first."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT incident_id, priority, deadline, breached_at, resolved_at FROM sla_breaches
+            {"WHERE resolved_at IS NULL" if open_only else ""}
+            ORDER BY deadline
+        """)
+        rows = cursor.fetchall()
+        conn.close()
+        keys = ("incident_id", "priority", "deadline", "breached_at", "resolved_at")
+        return [dict(zip(keys, row)) for row in rows]
+
+    # ------------------------------------------------------------------ resources
+    def get_resource_utilisation(self, hours=24, forecast_hours=6):
+        """
+        Fleet utilisation written by the CLI's ResourceManager (app_17) into
+        the resources / resource_usage / resource_occupancy / resource_state
+        tables, one dict per resource type. Reads only those small summary
+        tables, never deployed_resources. Returns [] when the database has no
+        resource tables.
+        """
+        now = datetime.now().timestamp()
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT r.resource_type, r.total_count, r.available_count, s.changed_at,
+                       (SELECT MIN(u.min_available) FROM resource_usage u
+                        WHERE u.resource_type = r.resource_type AND u.bucket_start >= ?),
+                       (SELECT COALESCE(SUM(u.reserved - u.released), 0) FROM resource_usage u
+                        WHERE u.resource_type = r.resource_type AND u.bucket_start >= ?)
+                FROM resources r LEFT JOIN resource_state s ON s.resource_type = r.resource_type
+                ORDER BY r.resource_type
+            """, (self._hour_floor(now - hours * 3600), self._hour_floor(now - forecast_hours * 3600)))
+            resources = cursor.fetchall()
+            cursor.execute("SELECT resource_type, occupied, seconds FROM resource_occupancy")
+            occupancy = cursor.fetchall()
+        except sqlite3.OperationalError:
+            conn.close()
+            return []
+        conn.close()
+
+        levels = {}
+        for rtype, occupied, seconds in occupancy:
+            levels.setdefault(rtype, {})[occupied] = seconds
+
+        report = []
+        for rtype, total, available, changed_at, low, net in resources:
+            # time-weighted occupancy, including the interval still running
+            hist = dict(levels.get(rtype, {}))
+            if changed_at is not None and now > changed_at:
+                hist[total - available] = hist.get(total - available, 0) + now - changed_at
+            percentiles = self._histogram_percentiles(hist, (50, 90, 99))
+
+            rate = net / forecast_hours
+            eta = datetime.fromtimestamp(now + available / rate * 3600) if rate > 0 else None
+            report.append({
+                "resource_type": rtype,
+                "total": total,
+                "available": available,
+                "peak_occupied": total - min(available, low if low is not None else available),
+                "p50": percentiles[50], "p90": percentiles[90], "p99": percentiles[99],
+                "rate_per_hour": rate,
+                "exhaustion_eta": eta,
+            })
+        return report
+
+    @staticmethod
+    def _hour_floor(ts):
+        # resource_usage buckets are hourly (app_17 UTILISATION_BUCKET_MINUTES)
+        return int(ts // 3600 * 3600)
+
+    @staticmethod
+    def _histogram_percentiles(hist, percentiles):
+        """Percentiles of a {value: weight} histogram (None when empty)."""
+        total = sum(hist.values())
+        if not total:
+            return {p: None for p in percentiles}
+        cumulative, running = [], 0
+        for value, weight in sorted(hist.items()):
+            running += weight
+            cumulative.append((running, value))
+        return {p: next((v for upto, v in cumulative if upto >= total * p / 100), cumulative[-1][1])
+                for p in percentiles}
+
+    # ------------------------------------------------------------------ reports
+    _report_engine = ReportEngine(**reporting.INCIDENT_SCHEMA)
+
+    def get_incident_report(self, start=None, end=None, granularity="day"):
+        """
+        Incident counts per period/category/status for start <= created_at < end
+        (see reporting.ReportEngine.run); one grouped query on the created_at index.
+        """
+        conn = self.get_connection()
+        try:
+            return self._report_engine.run(conn, start, end, granularity)
+        finally:
+            conn.close()
+
+    def get_incident_trend(self, start=None, end=None, granularity="day"):
+        """[(datetime, count)] per non-empty period, ascending."""
+        return ReportEngine.series(self.get_incident_report(start, end, granularity), granularity)
+
+    def export_incident_report(self, path, start=None, end=None, granularity="day"):
+        """Write the report to path (.json for JSON, anything else CSV); returns the rows."""
+        rows = self.get_incident_report(start, end, granularity)
+        self._report_engine.export(rows, path, start=start, end=end, granularity=granularity)
+        return rows
+
+    # ------------------------------------------------------------------ profiling
+    def enable_profiling(self, slow_ms=None):
+        """
+        Time every public method (and PROFILED_HELPERS) per calling widget,
+        and log SQL statements slower than slow_ms with their query plan
+        (see profiler.QueryProfiler). Returns True; already-enabled keeps
+        the collected data.
+        """
+        if self.profiler is None:
+            self.profiler = QueryProfiler(self.db_name)
+            for name in self._profiled_methods():
+                # Instance attributes shadow the class methods, internal self.x() calls included
+                setattr(self, name, self.profiler.wrap(name, getattr(self, name)))
+        if slow_ms is not None:
+            self.profiler.slow_ms = slow_ms
+        return True
+
+    def disable_profiling(self):
+        if self.profiler is not None:
+            for name in self._profiled_methods():
+                self.__dict__.pop(name, None)
+            self.profiler = None
+
+    def get_profile_report(self):
+        """QueryProfiler.snapshot(), or {"enabled": False} when profiling is off."""
+        if self.profiler is None:
+            return {"enabled": False}
+        return self.profiler.snapshot()
+
+    def reset_profile(self):
+        if self.profiler is not None:
+            self.profiler.reset()
+
+    def _profiled_methods(self):
+        public = [name for name, member in vars(Database).items()
+                  if callable(member) and not name.startswith("_") and name not in UNPROFILED_METHODS]
+        return public + list(PROFILED_HELPERS)
+
+    # ------------------------------------------------------------------ change events
+    def add_change_listener(self, callback):
+        """Call callback(kind, key) after every write made through this object."""
+        self._change_listeners.append(callback)
+
+    def _notify(self, kind, key, created=False):
+        for callback in self._change_listeners:
+            callback(kind, key)
+        self.events.publish(kind, key, created)
+
+    # ------------------------------------------------------------------ case files
+    def get_case_bundle(self, incident_id):
+        """
+        Everything a case file shows: a dict with the incident, its
+        reporter and responder (User or None) and attachment metadata
+        dicts from one JOIN, plus the timeline from incident_events. Bundles are kept in a small LRU
+        cache, so treat them as read-only. Writes through this object
+        invalidate it; a cached bundle is also checked against a one-row
+        stamp (see _case_stamp) before it is returned, so writes by other
+        processes or app_17 are never missed. Returns None for an unknown
+        incident.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        stamp = self._case_stamp(cursor, incident_id)
+        with self._case_lock:
+            cached = self._case_cache.get(incident_id)
+            if cached is not None and cached[0] == stamp:
+                self._case_cache.move_to_end(incident_id)
+                conn.close()
+                return cached[1]
+        if stamp is None:
+            conn.close()
+            return None
+
+        user_cols = lambda alias: ", ".join(f"{alias}.{c}" for c in USER_COLUMNS)
+        cursor.execute(f"""
+            SELECT {user_cols("r")}, {user_cols("s")},
+                   a.sha256, ia.original_name, a.size, a.mime_type, a.width, a.height, a.storage_path,
+                   i.*
+            FROM incidents i
+            LEFT JOIN users r ON r.id = i.reporter_id
+            LEFT JOIN users s ON s.id = i.responder_id
+            LEFT JOIN incident_attachments ia ON ia.incident_id = i.id
+            LEFT JOIN attachments a ON a.sha256 = ia.sha256
+            WHERE i.id = ?
+            ORDER BY ia.rowid
+        """, (incident_id,))
+        rows = cursor.fetchall()
+        conn.close()
+        if not rows:
+            return None
+
+        n = len(USER_COLUMNS)
+        first = rows[0]
+        incident = self._row_to_incident(first[2 * n + len(ATTACHMENT_KEYS):])
+        bundle = {
+            "incident": incident,
+            "reporter": self._row_to_user(first[:n]) if first[0] is not None else None,
+            "responder": self._row_to_user(first[n:2 * n]) if first[n] is not None else None,
+            "attachments": [
+                self._attachment_meta(row[2 * n:2 * n + len(ATTACHMENT_KEYS)])
+                for row in rows if row[2 * n] is not None
+            ],
+            "timeline": self._case_timeline(incident),
+        }
+
+        with self._case_lock:
+            self._case_cache[incident_id] = (stamp, bundle)
+            while len(self._case_cache) > self.CASE_CACHE_SIZE:
+                self._case_cache.popitem(last=False)
+        return bundle
+
+    @staticmethod
+    def _case_stamp(cursor, incident_id):
+        """
+        Everything a bundle is built from that can change, in one indexed
+        row: the incident and user rows, the newest event id and the
+        number of linked attachments (attachment rows themselves are
+        immutable). None for an unknown incident.
+        """
+        cursor.execute("""
+            SELECT i.*, r.*, s.*,
+                   (SELECT MAX(e.id) FROM incident_events e WHERE e.incident_id = i.id),
+                   (SELECT COUNT(*) FROM incident_attachments ia WHERE ia.incident_id = i.id)
+            FROM incidents i
+            LEFT JOIN users r ON r.id = i.reporter_id
+            LEFT JOIN users s ON s.id = i.responder_id
+            WHERE i.id = ?
+        """, (incident_id,))
+        return cursor.fetchone()
+
+    def _case_timeline(self, inc):
+        """Timeline steps from the incident's event log, oldest first."""
+        events = []
+        for ev in self.iter_incident_events(incident_id=inc.id):
+            who = ev["responder_name"] or "responder"
+            if ev["kind"] == "created":
+                action, by = "Report created", ev["actor_name"] or inc.reporter_name or "Reporter"
+            elif ev["kind"] in ("assigned", "reassigned"):
+                verb = "assigned" if ev["kind"] == "assigned" else "reassigned"
+                action, by = f"Case {verb} to {who}", ev["actor_name"] or "Admin"
+            elif ev["kind"] == "accepted":
+                action, by = "Responder acknowledged — en route", ev["actor_name"] or who
+            elif ev["kind"] == "solved":
+                action, by = "Case resolved and closed", ev["actor_name"] or who
+            else:
+                action = f"Status changed to {ev['to_status'] or '—'}"
+                by = ev["actor_name"] or "System"
+            events.append({"ts": ev["ts"], "action": action, "by": by, "done": True})
+        if inc.status in ("ongoing", "assigned"):
+            events.append({"ts": None, "action": "Awaiting resolution",
+                           "by": "System", "done": False})
+        return events
+
+    def _invalidate_cases(self, kind, key):
+        with self._case_lock:
+            if kind == "incident":
+                self._case_cache.pop(key, None)
+                return
+            for incident_id, (_stamp, bundle) in list(self._case_cache.items()):
+                inc = bundle["incident"]
+                if kind == "user" and key in (inc.reporter_id, inc.responder_id):
+                    del self._case_cache[incident_id]
+                elif kind == "cluster" and key == inc.cluster_id:
+                    del self._case_cache[incident_id]
+
+    # ------------------------------------------------------------------ outbox
+    def enqueue_submission(self, local_id, payload):
+        """Durably record an accepted-but-unprocessed report."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT OR IGNORE INTO outbox (local_id, payload) VALUES (?, ?)",
+            (local_id, json.dumps(payload)),
+        )
+        conn.commit()
+        conn.close()
+
+    def enqueue_submissions(self, entries):
+        """
+        Batch form of enqueue_submission for journal replay: every
+        (local_id, payload) pair goes in under one commit, and ids already
+        in the outbox are skipped, so replaying the same batch is harmless.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.executemany(
+            "INSERT OR IGNORE INTO outbox (local_id, payload) VALUES (?, ?)",
+            [(local_id, json.dumps(payload)) for local_id, payload in entries],
+        )
+        conn.commit()
+        conn.close()
+
+    def mark_submission(self, local_id, status, incident_id=None, error=None):
+        """Advance an outbox entry: queued -> persisted -> done (or failed)."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE outbox
+            SET status = ?, incident_id = COALESCE(?, incident_id), last_error = ?,
+                attempts = attempts + (CASE WHEN ? IS NULL THEN 0 ELSE 1 END),
+                updated_at = ?
+            WHERE local_id = ?
+        """, (status, incident_id, error, error, datetime.now().isoformat(), local_id))
+        conn.commit()
+        conn.close()
+
+    def get_unfinished_submissions(self):
+        """Outbox entries that still need work, oldest first, as (local_id, payload, status, incident_id)."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT local_id, payload, status, incident_id FROM outbox
+            WHERE status IN ('queued', 'persisted')
+            ORDER BY created_at, rowid
+        """)
+        rows = cursor.fetchall()
+        conn.close()
+        return [(r[0], json.loads(r[1]), r[2], r[3]) for r in rows]
@@ -0,0 +1,175 @@
+# dispatch_client.py
+import itertools
+import socket
+import sqlite3
+import threading
+
+import ipc
+from database import Database
+
+# Exceptions re-raised with their own type, so callers' except clauses still match
+_ERRORS = {
+    "IntegrityError": sqlite3.IntegrityError,
+    "OperationalError": sqlite3.OperationalError,
+    "ValueError": ValueError,
+    "KeyError": KeyError,
+    "TypeError": TypeError,
+    "AttributeError": AttributeError,
+}
+
+
+class RemoteError(RuntimeError):
+    """An error raised inside the dispatch service with no local equivalent."""
+
+
+class RemoteDatabase:
+    """
+    Drop-in stand-in for Database that forwards every public method to the
+    dispatch service (dispatch_service.py). Each thread gets its own
+    connection, so background workers do not queue behind the GUI thread.
+
+    Change listeners fire for writes made through this object, exactly as
+    with a local Database: the service returns the change events each call
+    produced. get_connection() still opens the SQLite file directly, for
+    the few widgets (Profile) that keep tables of their own.
+
+    Connections present the per-user secret (ipc.SECRET_PATH) the service
+    wrote on start; methods it does not expose raise AttributeError.
+    """
+
+    def __init__(self, address=None, db_name="emergency_response.db", timeout=30):
+        self.address = address or ipc.default_address()
+        self.db_name = db_name
+        self.timeout = timeout
+        self.secret = ipc.load_secret()     # OSError with no service ever started
+        self._local = threading.local()
+        self._ids = itertools.count(1)
+        self._change_listeners = []
+        self.events = RemoteEventBus(self)
+        self.call("ping")      # fail fast (OSError) when no service is running
+
+    def __getattr__(self, name):
+        if name.startswith("_") or not callable(getattr(Database, name, None)):
+            raise AttributeError(name)
+
+        def remote(*args, **kwargs):
+            return self.call(name, *args, **kwargs)
+        remote.__name__ = name
+        return remote
+
+    def get_connection(self):
+        return sqlite3.connect(self.db_name)
+
+    def add_change_listener(self, callback):
+        self._change_listeners.append(callback)
+
+    def call(self, method, *args, **kwargs):
+        request_id = next(self._ids)
+        sock, stream = self._connection()
+        try:
+            sock.sendall(ipc.dumps({"id": request_id, "method": method,
+                                    "args": args, "kwargs": kwargs}))
+            line = stream.readline()
+        except OSError:
+            self._drop_connection()
+            raise
+        if not line:
+            self._drop_connection()
+            raise ConnectionError("dispatch service closed the connection")
+
+        reply = ipc.loads(line)
+        if "error" in reply:
+            error = reply["error"]
+            raise _ERRORS.get(error["type"], RemoteError)(error["message"])
+        for kind, key in reply.get("changes", ()):
+            for callback in self._change_listeners:
+                callback(kind, key)
+        return reply["result"]
+
+    def close(self):
+        self._drop_connection()
+
+    # -----------------------
+    # INTERNAL
+    # -----------------------
+    def _connection(self):
+        if getattr(self._local, "sock", None) is None:
+            sock = ipc.connect(self.address, self.timeout, self.secret)
+            self._local.sock = sock
+            self._local.stream = sock.makefile("rb")
+        return self._local.sock, self._local.stream
+
+    def _drop_connection(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            self._local.stream.close()
+            sock.close()
+        self._local.sock = None
+
+
+class RemoteEventBus:
+    """
+    notifications.EventBus over the dispatch service: each subscription
+    holds its own connection and a daemon thread that blocks on it, so
+    nothing is sent or queried while no incident changes. Callbacks run on
+    that thread.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self._lock = threading.Lock()
+        self._streams = {}
+        self._tokens = itertools.count(1)
+
+    def subscribe(self, callback, category=None):
+        sock = ipc.connect(self.client.address, self.client.timeout, self.client.secret)
+        stream = sock.makefile("rb")
+        try:
+            sock.sendall(ipc.dumps({"id": 0, "method": "subscribe", "args": [],
+                                    "kwargs": {"category": category}}))
+            reply = ipc.loads(stream.readline() or b"{}")
+        except OSError:
+            stream.close()
+            sock.close()
+            raise
+        if "result" not in reply:
+            stream.close()
+            sock.close()
+            raise RemoteError(reply.get("error", {}).get("message", "subscribe refused"))
+        sock.settimeout(None)      # events may be hours apart
+
+        token = next(self._tokens)
+        with self._lock:
+            self._streams[token] = sock
+        threading.Thread(target=self._listen, args=(token, stream, callback),
+                         name=f"dispatch-events-{token}", daemon=True).start()
+        return token
+
+    def unsubscribe(self, token):
+        with self._lock:
+            sock = self._streams.pop(token, None)
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)     # wakes the listener thread
+            except OSError:
+                pass
+            sock.close()
+
+    def _listen(self, token, stream, callback):
+        try:
+            for line in stream:
+                callback(ipc.loads(line))
+        except (OSError, ValueError):
+            pass
+        finally:
+            stream.close()
+            with self._lock:
+                self._streams.pop(token, None)
+
+
+def open_database(db_name="emergency_response.db"):
+    """The dispatch service's client when a service is running, else a local Database."""
+    try:
+        return RemoteDatabase(db_name=db_name)
+    except OSError:
+        return Database(db_name)
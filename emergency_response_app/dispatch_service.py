@@ -0,0 +1,342 @@
+# dispatch_service.py
+"""
+Headless dispatch service: one process owns the database and every GUI
+(and any other client) talks to it over a local socket.
+
+    python dispatch_service.py [--db emergency_response.db] [--socket PATH | --port N]
+
+- Every connection must first present the per-user secret
+  (ipc.SECRET_PATH, created owner-only on first start); then the
+  Database methods in ALLOWED_METHODS are callable by name (see ipc.py
+  for the wire format). dispatch_client.RemoteDatabase is the drop-in
+  client.
+- Writes run one at a time on a single writer thread, so concurrent
+  dispatchers never contend for SQLite's write lock.
+- Incidents are kept in memory for hot reads (incident lists, by id /
+  reporter / responder). Writes through the service update just the
+  incidents they touched before their reply is sent; writes by app_17
+  or a GUI on a local Database make the next read reload the lot.
+- Other reads run on a small thread pool, each with its own connection.
+- A "subscribe" request (kwargs: category) turns its connection into a
+  one-way stream of incident.created / incident.updated events from the
+  Database event bus (notifications.py), one event line per change.
+"""
+import argparse
+import asyncio
+import inspect
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import ipc
+from database import Database
+
+READ_PREFIXES = ("get_", "find_", "iter_", "nearest_", "search_")
+# Database methods clients may call: what the GUI uses, nothing that writes
+# files (export_incident_report), rebuilds tables or switches profiling on
+ALLOWED_METHODS = frozenset({
+    # users
+    "create_user", "get_user_by_username", "get_user_by_email", "get_user_by_id",
+    "get_user_by_email_and_phone", "get_all_users", "get_responders", "update_user",
+    "update_user_status", "update_password", "set_user_location", "get_user_stats",
+    # incidents
+    "create_incident", "get_incident_id_for_client_uuid", "get_incident_by_id",
+    "get_all_incidents", "get_incidents_by_reporter", "get_incidents_by_responder",
+    "get_incidents_page", "get_open_incidents", "get_overdue_incidents", "update_incident",
+    "assign_responder", "get_incident_count_by_status", "get_next_incident_id",
+    "iter_incident_events", "get_case_bundle",
+    # geo / clustering
+    "find_incidents_near", "nearest_available_responders", "get_linked_incidents",
+    "sync_cluster", "unlink_incident",
+    # attachments
+    "save_attachment", "link_attachment", "get_incident_attachments",
+    # SLA, resources, reports
+    "record_sla_breach", "resolve_sla_breach", "get_sla_breaches", "get_resource_utilisation",
+    "get_incident_report", "get_incident_trend",
+    # submission outbox
+    "enqueue_submission", "enqueue_submissions", "mark_submission", "get_unfinished_submissions",
+    # diagnostics (profiling itself is switched on with ERS_PROFILE at service start)
+    "get_profile_report", "reset_profile",
+})
+READ_WORKERS = 4
+
+
+class IncidentCache:
+    """
+    All incidents by id, as of the last commit to the database file.
+
+    Writes made through the service are applied in place: the writer
+    thread knows which incidents each call changed (its change events)
+    and re-reads just those. Everything else that commits to the file,
+    app_17 or a GUI on a local Database, is noticed through PRAGMA
+    data_version on a connection kept open for the purpose: when it
+    moved and no service write accounts for it, the next read reloads
+    all incidents.
+
+    A commit from another process landing in the same instant as a
+    service write (between its data_version reads) is taken for part of
+    that write; the next unexplained change reloads it.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._lock = threading.Lock()
+        self._incidents = {}
+        self._version = None
+        self._writing = False
+        self._watch = sqlite3.connect(db.db_name, check_same_thread=False)
+        self.reloads = 0
+
+    def load(self):
+        with self._lock:
+            self._fresh()
+
+    def close(self):
+        self._watch.close()
+
+    def _data_version(self):
+        return self._watch.execute("PRAGMA data_version").fetchone()[0]
+
+    def _fresh(self):
+        """{id: Incident}, reloaded first if another process committed; call with the lock held."""
+        # While a service write is running its own commit moves data_version;
+        # readers keep the pre-write view until write() applies it
+        if not self._writing:
+            version = self._data_version()
+            if version != self._version:
+                # Version read first: a commit during the reload triggers another one
+                self._incidents = {i.id: i for i in self.db.get_all_incidents()}
+                self._version = version
+                self.reloads += 1
+        return self._incidents
+
+    @contextmanager
+    def write(self):
+        """
+        Wrap one service write (writer thread only). Yields a list for the
+        call's (kind, key) change events; the incidents they name are
+        re-read and applied when the block ends without an error.
+        """
+        with self._lock:
+            self._fresh()           # an earlier outside change is folded in first
+            self._writing = True
+        changes = []
+        try:
+            yield changes
+            fresh = {}
+            for kind, key in changes:
+                if kind == "cluster":
+                    fresh[key] = self.db.get_incident_by_id(key)
+                    fresh.update((i.id, i) for i in self.db.get_linked_incidents(key))
+                elif kind == "incident" and key:
+                    fresh[key] = self.db.get_incident_by_id(key)
+            with self._lock:
+                for incident_id, incident in fresh.items():
+                    if incident is None:
+                        self._incidents.pop(incident_id, None)
+                    else:
+                        self._incidents[incident_id] = incident
+                self._version = self._data_version()
+        finally:
+            with self._lock:
+                # After an error the version stays behind: the next read reloads
+                self._writing = False
+
+    def _newest_first(self, predicate=None):
+        with self._lock:
+            incidents = [i for i in self._fresh().values() if predicate is None or predicate(i)]
+        return sorted(incidents, key=lambda i: str(i.created_at), reverse=True)
+
+    # Same results as the Database methods of the same name
+    def get_all_incidents(self):
+        return self._newest_first()
+
+    def get_incident_by_id(self, incident_id):
+        with self._lock:
+            return self._fresh().get(incident_id)
+
+    def get_incidents_by_reporter(self, reporter_id):
+        return self._newest_first(lambda i: i.reporter_id == reporter_id)
+
+    def get_incidents_by_responder(self, responder_id):
+        return self._newest_first(lambda i: i.responder_id == responder_id)
+
+    def get_incident_count_by_status(self, status):
+        with self._lock:
+            return sum(1 for i in self._fresh().values() if i.status == status)
+
+
+class DispatchService:
+    CACHED = ("get_all_incidents", "get_incident_by_id", "get_incidents_by_reporter",
+              "get_incidents_by_responder", "get_incident_count_by_status")
+
+    def __init__(self, db_name="emergency_response.db", secret=None):
+        self.db = Database(db_name)
+        self.secret = secret or ipc.load_secret(create=True)
+        self.cache = IncidentCache(self.db)
+        self.cache.load()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dispatch-writer")
+        self._readers = ThreadPoolExecutor(max_workers=READ_WORKERS, thread_name_prefix="dispatch-reader")
+        # change events raised by the call running on this thread
+        self._changes = threading.local()
+        self.db.add_change_listener(self._on_change)
+        self.methods = ALLOWED_METHODS & {
+            name for name, _ in inspect.getmembers(Database, inspect.isfunction)
+        }
+        self.calls = 0
+
+    # -----------------------
+    # DISPATCH
+    # -----------------------
+    def _on_change(self, kind, key):
+        pending = getattr(self._changes, "pending", None)
+        if pending is not None:
+            pending.append((kind, key))
+
+    def _write(self, method, args, kwargs):
+        """_run on the writer thread, with the call's changes applied to the cache."""
+        with self.cache.write() as changes:
+            result, pending = self._run(method, args, kwargs)
+            changes.extend(pending)
+        return result, pending
+
+    def _run(self, method, args, kwargs):
+        """Call a Database method on a worker thread; returns (result, changes)."""
+        self._changes.pending = []
+        try:
+            result = getattr(self.db, method)(*args, **kwargs)
+            if inspect.isgenerator(result):
+                result = list(result)
+            return result, self._changes.pending
+        finally:
+            self._changes.pending = None
+
+    async def call(self, method, args=(), kwargs=None):
+        kwargs = kwargs or {}
+        self.calls += 1
+        if method == "ping":
+            return {"calls": self.calls, "incidents": len(self.cache.get_all_incidents())}, []
+        if method not in self.methods:
+            raise AttributeError(f"unknown method: {method}")
+        loop = asyncio.get_running_loop()
+        if method in self.CACHED:
+            # Off the event loop: the first read after a commit reloads the cache
+            result = await loop.run_in_executor(
+                self._readers, lambda: getattr(self.cache, method)(*args, **kwargs))
+            return result, []
+        if method.startswith(READ_PREFIXES):
+            return await loop.run_in_executor(self._readers, self._run, method, args, kwargs)
+        return await loop.run_in_executor(self._writer, self._write, method, args, kwargs)
+
+    # -----------------------
+    # SOCKET
+    # -----------------------
+    async def authenticate(self, reader, writer):
+        """Read the hello line; True when it carries this user's secret."""
+        try:
+            hello = ipc.loads(await reader.readline() or b"{}")
+        except ValueError:
+            hello = {}
+        ok = isinstance(hello, dict) and ipc.check_secret(hello.get("auth"), self.secret)
+        writer.write(ipc.dumps({"auth": True} if ok else
+                               {"error": {"type": "PermissionError", "message": "bad secret"}}))
+        await writer.drain()
+        return ok
+
+    async def handle(self, reader, writer):
+        try:
+            if not await self.authenticate(reader, writer):
+                return
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                request = {}
+                try:
+                    request = ipc.loads(line)
+                    if request.get("method") == "subscribe":
+                        await self.stream_events(request, reader, writer)
+                        break
+                    result, changes = await self.call(
+                        request["method"], request.get("args", ()), request.get("kwargs"))
+                    reply = {"id": request.get("id"), "result": result, "changes": changes}
+                except Exception as e:
+                    reply = {"id": request.get("id"),
+                             "error": {"type": type(e).__name__, "message": str(e)}}
+                try:
+                    data = ipc.dumps(reply)
+                except TypeError as e:
+                    data = ipc.dumps({"id": reply["id"],
+                                      "error": {"type": "TypeError", "message": str(e)}})
+                writer.write(data)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def stream_events(self, request, reader, writer):
+        """Push incident events for the requested category until the client disconnects."""
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        # Published on the writer thread; hand over to the event loop
+        token = self.db.events.subscribe(
+            lambda message: loop.call_soon_threadsafe(queue.put_nowait, message),
+            (request.get("kwargs") or {}).get("category"))
+        closed = asyncio.ensure_future(reader.read())     # EOF = client went away
+        try:
+            writer.write(ipc.dumps({"id": request.get("id"), "result": True, "changes": []}))
+            await writer.drain()
+            while True:
+                next_event = asyncio.ensure_future(queue.get())
+                await asyncio.wait({next_event, closed}, return_when=asyncio.FIRST_COMPLETED)
+                if not next_event.done():
+                    next_event.cancel()
+                    break
+                writer.write(ipc.dumps(next_event.result()))
+                await writer.drain()
+        finally:
+            self.db.events.unsubscribe(token)
+            closed.cancel()
+
+    async def serve(self, address=None):
+        address = address or ipc.default_address()
+        if isinstance(address, str):
+            os.makedirs(os.path.dirname(address), exist_ok=True)
+            if os.path.exists(address):
+                os.remove(address)      # stale socket from a previous run
+            server = await asyncio.start_unix_server(self.handle, path=address, limit=ipc.MAX_LINE)
+            os.chmod(address, 0o600)    # this user's clients only
+        else:
+            server = await asyncio.start_server(self.handle, *address, limit=ipc.MAX_LINE)
+        print(f"Dispatch service on {address} ({self.db.db_name}, "
+              f"{len(self.cache.get_all_incidents())} incidents cached)")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self._writer.shutdown(wait=True)
+            self._readers.shutdown(wait=False)
+            self.cache.close()
+            if isinstance(address, str) and os.path.exists(address):
+                os.remove(address)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless dispatch service")
+    parser.add_argument("--db", default="emergency_response.db")
+    parser.add_argument("--socket", help=f"Unix socket path (default {ipc.SOCKET_PATH})")
+    parser.add_argument("--port", type=int, help="listen on 127.0.0.1:PORT instead of a Unix socket")
+    args = parser.parse_args()
+
+    address = ("127.0.0.1", args.port) if args.port else args.socket
+    try:
+        asyncio.run(DispatchService(args.db).serve(address))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# geo.py
+import csv
+import math
+import os
+import re
+
+# Base directory for loading the offline gazetteer
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+GAZETTEER_PATH = os.path.join(BASE_DIR, "data", "gazetteer.csv")
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEG_LAT = 111.32
+
+# Grid index: every point is filed under a fixed-size lat/lon cell.
+# 0.01 deg is roughly 1.1 km, so a 2 km radius touches about 5x5 cells.
+CELL_DEG = 0.01
+MAX_CELLS = 900   # above this a bounding-box query is cheaper than IN (...)
+
+
+# ======================
+# DISTANCE / GRID
+# ======================
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points in kilometres."""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def cell_for(lat, lon):
+    """Grid cell key for a point, e.g. '2374:9037'."""
+    if lat is None or lon is None:
+        return None
+    return f"{math.floor(lat / CELL_DEG)}:{math.floor(lon / CELL_DEG)}"
+
+
+def bounding_box(lat, lon, radius_km):
+    """(min_lat, max_lat, min_lon, max_lon) enclosing the radius."""
+    dlat = radius_km / KM_PER_DEG_LAT
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    dlon = radius_km / (KM_PER_DEG_LAT * cos_lat)
+    return lat - dlat, lat + dlat, lon - dlon, lon + dlon
+
+
+def cells_covering(lat, lon, radius_km):
+    """
+    Grid cell keys that cover the circle, or None if there would be more
+    than MAX_CELLS of them (caller should fall back to a bounding box).
+    """
+    min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+    rows = range(math.floor(min_lat / CELL_DEG), math.floor(max_lat / CELL_DEG) + 1)
+    cols = range(math.floor(min_lon / CELL_DEG), math.floor(max_lon / CELL_DEG) + 1)
+    if len(rows) * len(cols) > MAX_CELLS:
+        return None
+    return [f"{r}:{c}" for r in rows for c in cols]
+
+
+# ======================
+# GEOCODING (offline)
+# ======================
+
+# A location that is only a "lat, lon" pair; decimals are required so house
+# and flat numbers ("Flat 4, 12 Canal Road") are never read as coordinates
+_COORD_RE = re.compile(r"(-?\d{1,2}\.\d+)\s*,\s*(-?\d{1,3}\.\d+)")
+
+
+class Gazetteer:
+    """
+    Local stand-in for a geocoding service.
+
+    Loads place names from a CSV file (name, latitude, longitude) and
+    resolves free-text locations by looking for the longest known place
+    name inside the text. A location that is just a decimal "lat, lon"
+    pair is also accepted.
+    """
+
+    def __init__(self, path=GAZETTEER_PATH):
+        self.path = path
+        self.places = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                try:
+                    self.places[row["name"].strip().lower()] = (
+                        float(row["latitude"]), float(row["longitude"])
+                    )
+                except (KeyError, TypeError, ValueError):
+                    continue
+        # Longest names first so "Dhanmondi" beats "Dhaka" inside an address
+        self._names = sorted(self.places, key=len, reverse=True)
+
+    def geocode(self, text):
+        """Return (lat, lon) for a free-text location, or None."""
+        if not text:
+            return None
+
+        m = _COORD_RE.fullmatch(text.strip())
+        if m:
+            lat, lon = float(m.group(1)), float(m.group(2))
+            if -90 <= lat <= 90 and -180 <= lon <= 180:
+                return lat, lon
+
+        key = text.strip().lower()
+        if key in self.places:
+            return self.places[key]
+        for name in getattr(self, "_names", []):
+            if re.search(rf"\b{re.escape(name)}\b", key):
+                return self.places[name]
+        return None
+
+
+_gazetteer = None
+
+
+def geocode(text):
+    """Geocode with the shared, lazily loaded gazetteer."""
+    global _gazetteer
+    if _gazetteer is None:
+        _gazetteer = Gazetteer()
+    return _gazetteer.geocode(text)
@@ -3,7 +3,14 @@
 from .categories import incident_categories
 from .display_names import incident_display_names
 from .questions import general_questions, incident_questions, get_questions_for_incident
-from .feedback import emergency_feedback, get_feedback_for_incident
-from .responders import responders, get_responders_for_incident
-from .utils import get_incident_display_name, get_incident_category
-from .incident_priority import get_incident_priority
+from .feedback import emergency_feedback
+from .responders import responders
+from .taxonomy import (
+    get_incident_category,
+    get_incident_display_name,
+    get_incident_priority,
+    get_sla_minutes,
+    get_feedback_for_incident,
+    get_responders_for_incident,
+    consistency_report,
+)
@@ -133,8 +133,6 @@ emergency_feedback = {
 }
 
 
-def get_feedback_for_incident(incident_type):
-    for category, incidents in emergency_feedback.items():
-        if incident_type in incidents:
-            return incidents[incident_type]
-    return "Follow general emergency procedures. Stay safe and await professional help."
+DEFAULT_FEEDBACK = "Follow general emergency procedures. Stay safe and await professional help."
+
+# get_feedback_for_incident lives in taxonomy.py (compiled type -> feedback table)
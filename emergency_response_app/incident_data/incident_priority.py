@@ -136,12 +136,16 @@ INCIDENT_PRIORITY_MAP = {
 
 DEFAULT_PRIORITY = "P3"
 
+# ======================
+# RESOLUTION SLA (minutes from report to solved)
+# ======================
+SLA_MINUTES = {
+    "P1": 15,
+    "P2": 30,
+    "P3": 60,
+    "P4": 240,
+    "P5": 1440,
+}
+
 
-def get_incident_priority(incident_type: str) -> str:
-    """
-    Returns priority code: P1, P2, P3, P4, or P5
-    """
-    for priority, incidents in INCIDENT_PRIORITY_MAP.items():
-        if incident_type in incidents:
-            return priority
-    return DEFAULT_PRIORITY
+# get_incident_priority lives in taxonomy.py (compiled type -> priority table)
@@ -1,5 +1,7 @@
 #incident_data/questions.py
 
+from types import MappingProxyType
+
 # 6-General questions for all incidents
 general_questions = {
     "location": "What is the address of the emergency?",
@@ -428,11 +430,18 @@ incident_questions = {
 }
 
 
+# Merged (general + specific) question sets, built once at import time.
+# They are read-only views, so every caller can share the same snapshot.
+_GENERAL_ONLY = MappingProxyType(dict(general_questions))
+_MERGED_QUESTIONS = {
+    incident_type: MappingProxyType({**general_questions, **specific})
+    for incident_type, specific in incident_questions.items()
+}
+
+
 def get_questions_for_incident(incident_type):
     """
-    Get all questions for a specific incident type
+    Get all questions for a specific incident type.
+    Returns a shared read-only mapping; copy it with dict() to modify.
     """
-    general = general_questions.copy()
-    specific = incident_questions.get(incident_type, {})
-    general.update(specific)
-    return general
+    return _MERGED_QUESTIONS.get(incident_type, _GENERAL_ONLY)
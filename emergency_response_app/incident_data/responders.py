@@ -1,7 +1,5 @@
 #incident_data/responders.py
 
-from .utils import get_incident_category
-
 responders = {
     "medical": [
         "Paramedics", "Doctors", "Emergency Medical Technicians (EMTs)"
@@ -64,7 +62,6 @@ responders = {
 }
 
 
-def get_responders_for_incident(incident_type):
-    """Get recommended responders for a specific incident type"""
-    category = get_incident_category(incident_type)
-    return responders.get(category, ["Emergency Responders"])
+DEFAULT_RESPONDERS = ["Emergency Responders"]
+
+# get_responders_for_incident lives in taxonomy.py (compiled type -> responders table)
@@ -0,0 +1,139 @@
+# incident_data/taxonomy.py
+
+from types import MappingProxyType
+
+from .categories import incident_categories
+from .display_names import incident_display_names
+from .questions import incident_questions
+from .feedback import emergency_feedback, DEFAULT_FEEDBACK
+from .responders import responders, DEFAULT_RESPONDERS
+from .incident_priority import INCIDENT_PRIORITY_MAP, DEFAULT_PRIORITY, SLA_MINUTES
+
+# ======================
+# COMPILED LOOKUP TABLES
+# ======================
+# The source modules group incident types by category / priority / etc.
+# These flat type -> value dicts are built once at import time so every
+# lookup below is a single dict hit.
+
+
+class TaxonomyConflictError(ValueError):
+    """Raised when an incident type is assigned two different values."""
+
+
+def _invert(grouped, table_name):
+    """{group: [types]} -> {type: group}, refusing duplicate assignments."""
+    flat = {}
+    for group, types in grouped.items():
+        for incident_type in types:
+            if incident_type in flat and flat[incident_type] != group:
+                raise TaxonomyConflictError(
+                    f"{table_name}: '{incident_type}' is listed under both "
+                    f"'{flat[incident_type]}' and '{group}'"
+                )
+            flat[incident_type] = group
+    return flat
+
+
+TYPE_TO_CATEGORY = MappingProxyType(_invert(incident_categories, "categories"))
+TYPE_TO_PRIORITY = MappingProxyType(_invert(INCIDENT_PRIORITY_MAP, "priorities"))
+TYPE_TO_DISPLAY_NAME = MappingProxyType(dict(incident_display_names))
+TYPE_TO_QUESTIONS = MappingProxyType(
+    {t: MappingProxyType(dict(q)) for t, q in incident_questions.items()}
+)
+
+_feedback_category = _invert(emergency_feedback, "feedback")
+TYPE_TO_FEEDBACK = MappingProxyType(
+    {t: emergency_feedback[cat][t] for t, cat in _feedback_category.items()}
+)
+
+TYPE_TO_RESPONDERS = MappingProxyType(
+    {t: tuple(responders[cat]) for t, cat in TYPE_TO_CATEGORY.items() if cat in responders}
+)
+
+ALL_INCIDENT_TYPES = frozenset(TYPE_TO_CATEGORY)
+
+
+# ======================
+# LOOKUPS
+# ======================
+
+def get_incident_category(incident_type):
+    """Get the category for a specific incident type"""
+    return TYPE_TO_CATEGORY.get(incident_type, "other")
+
+
+def get_incident_priority(incident_type: str) -> str:
+    """
+    Returns priority code: P1, P2, P3, P4, or P5
+    """
+    return TYPE_TO_PRIORITY.get(incident_type, DEFAULT_PRIORITY)
+
+
+def get_sla_minutes(priority):
+    """Minutes an incident of this priority may stay open"""
+    return SLA_MINUTES.get((priority or "").upper(), SLA_MINUTES[DEFAULT_PRIORITY])
+
+
+def get_incident_display_name(incident_type):
+    """Get the display name for an incident type"""
+    name = TYPE_TO_DISPLAY_NAME.get(incident_type)
+    if name is None:
+        return incident_type.replace('_', ' ').title()
+    return name
+
+
+def get_feedback_for_incident(incident_type):
+    """Get the emergency instructions shown to the reporter"""
+    return TYPE_TO_FEEDBACK.get(incident_type, DEFAULT_FEEDBACK)
+
+
+def get_responders_for_incident(incident_type):
+    """Get recommended responders for a specific incident type"""
+    return list(TYPE_TO_RESPONDERS.get(incident_type, DEFAULT_RESPONDERS))
+
+
+# ======================
+# CONSISTENCY REPORT
+# ======================
+
+def consistency_report():
+    """
+    Types that are missing from (or unknown to) each lookup table.
+
+    Returns {table_name: {"missing": [...], "unknown": [...]}} plus a
+    "category_mismatch" list for feedback filed under a different
+    category than the type itself. Empty lists mean the table is complete.
+    """
+    tables = {
+        "priority": TYPE_TO_PRIORITY,
+        "display_name": TYPE_TO_DISPLAY_NAME,
+        "questions": TYPE_TO_QUESTIONS,
+        "feedback": TYPE_TO_FEEDBACK,
+        "responders": TYPE_TO_RESPONDERS,
+    }
+    report = {}
+    for name, table in tables.items():
+        report[name] = {
+            "missing": sorted(ALL_INCIDENT_TYPES - set(table)),
+            "unknown": sorted(set(table) - ALL_INCIDENT_TYPES),
+        }
+    report["category_mismatch"] = sorted(
+        (t, cat, TYPE_TO_CATEGORY[t])
+        for t, cat in _feedback_category.items()
+        if t in TYPE_TO_CATEGORY and TYPE_TO_CATEGORY[t] != cat
+    )
+    return report
+
+
+if __name__ == "__main__":
+    # python -m incident_data.taxonomy
+    for table, result in consistency_report().items():
+        if table == "category_mismatch":
+            for t, listed, actual in result:
+                print(f"[feedback] {t}: filed under '{listed}', category is '{actual}'")
+            continue
+        for t in result["missing"]:
+            print(f"[{table}] missing: {t}")
+        for t in result["unknown"]:
+            print(f"[{table}] not a known incident type: {t}")
@@ -3,8 +3,7 @@
 from datetime import datetime
 import re
 import uuid
-from .categories import incident_categories
-from .display_names import incident_display_names
+from .taxonomy import get_incident_category, get_incident_display_name  # noqa: F401 (re-export)
 
 # ======================
 # TIME UTILITIES
@@ -97,15 +96,3 @@ def format_log_entry(case_id, incident_type, priority, message):
         f"{message}"
     )
 
-
-def get_incident_category(incident_type):
-    """Get the category for a specific incident type"""
-    for category, types in incident_categories.items():
-        if incident_type in types:
-            return category
-    return "other"
-
-
-def get_incident_display_name(incident_type):
-    """Get the display name for an incident type"""
-    return incident_display_names.get(incident_type, incident_type.replace('_', ' ').title())
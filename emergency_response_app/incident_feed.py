@@ -0,0 +1,94 @@
+# incident_feed.py
+import sqlite3
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from database import Database
+
+# How often a local database file is checked for other processes' writes (ms)
+WATCH_INTERVAL_MS = 5000
+
+
+class IncidentFeed(QObject):
+    """
+    Qt side of the Database event bus (notifications.EventBus, or the
+    dispatch service's stream through RemoteDatabase.events).
+
+    Events are published on whichever thread made the write (or on the
+    stream's listener thread), so they are forwarded to the GUI thread
+    through a queued signal before `event` is emitted.
+
+    Pushes only cover writes made through this process's Database. On a
+    local Database (no dispatch service) other GUI processes and app_17
+    write to the same file unseen, so the feed also polls PRAGMA
+    data_version and emits `stale` when anything else committed; pages
+    reload in full then. Through RemoteDatabase every write passes the
+    service, and pushes alone are complete.
+
+    start() / stop() match the QTimer interface, so MainWindow can
+    suspend and resume a page's feed the same way it does its timers.
+    """
+
+    event = pyqtSignal(object)          # {"event": "incident.created" | "incident.updated", "incident": Incident}
+    stale = pyqtSignal()                # local database changed outside the event bus
+    _received = pyqtSignal(object)      # same payload, from any thread
+
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.category = None
+        self._token = None
+        self._received.connect(self.event.emit)
+        self._watch = None              # connection whose data_version is polled
+        self._version = None
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._check_file)
+
+    # -----------------------
+    # PUBLIC
+    # -----------------------
+    def set_category(self, category):
+        """Only deliver incidents of this category (None = all); resubscribes if running."""
+        if category == self.category and self._token is not None:
+            return
+        self.category = category
+        if self._token is not None:
+            self.stop()
+            self.start()
+
+    def start(self):
+        if self._token is None:
+            self._token = self.db.events.subscribe(self._received.emit, self.category)
+        if isinstance(self.db, Database) and self._watch is None:
+            self._watch = sqlite3.connect(self.db.db_name)
+            self._version = self._data_version()
+            self._timer.start(WATCH_INTERVAL_MS)
+
+    def stop(self):
+        if self._token is not None:
+            self.db.events.unsubscribe(self._token)
+            self._token = None
+        if self._watch is not None:
+            self._timer.stop()
+            self._watch.close()
+            self._watch = None
+
+    def isActive(self):
+        return self._token is not None
+
+    # -----------------------
+    # INTERNAL
+    # -----------------------
+    def _data_version(self):
+        return self._watch.execute("PRAGMA data_version").fetchone()[0]
+
+    def _check_file(self):
+        try:
+            version = self._data_version()
+        except sqlite3.Error:
+            return          # busy or locked: try again next tick
+        if version != self._version:
+            # Also moves for this process's own writes (each Database call has
+            # its own connection); a spare reload every few seconds at most
+            self._version = version
+            self.stale.emit()
@@ -0,0 +1,122 @@
+# ipc.py
+"""
+Wire format shared by dispatch_service.py and dispatch_client.py.
+
+One JSON object per line. Every connection first proves it belongs to
+this user with the shared secret in SECRET_PATH:
+    hello     {"auth": "<secret>"}   ->  {"auth": true}   (else an error, then close)
+    request   {"id": 7, "method": "get_incident_by_id", "args": [...], "kwargs": {...}}
+    response  {"id": 7, "result": ..., "changes": [["incident", "INC-012"], ...]}
+          or  {"id": 7, "error": {"type": "IntegrityError", "message": "..."}}
+
+User / Incident objects and datetimes are tagged so both ends get the
+same types back that a local Database call would return.
+"""
+import hmac
+import json
+import os
+import secrets
+import socket
+from datetime import datetime
+
+from models import User, Incident
+
+SERVICE_DIR = os.path.join(os.path.expanduser("~"), ".emergency_response")
+SOCKET_PATH = os.path.join(SERVICE_DIR, "dispatch.sock")
+# Per-user shared secret (owner-only, next to session.key); the TCP fallback
+# is reachable by every local user, so the socket alone proves nothing
+SECRET_PATH = os.path.join(SERVICE_DIR, "dispatch.key")
+# Used where Unix sockets are unavailable (Windows)
+TCP_ADDRESS = ("127.0.0.1", 8765)
+# Longest accepted message (a full incident list can be large)
+MAX_LINE = 64 * 1024 * 1024
+
+_MODELS = {"User": User, "Incident": Incident}
+
+
+def default_address():
+    return SOCKET_PATH if hasattr(socket, "AF_UNIX") else TCP_ADDRESS
+
+
+def _encode(obj):
+    if isinstance(obj, datetime):
+        return {"__dt__": obj.isoformat()}
+    if isinstance(obj, (User, Incident)):
+        return {"__model__": type(obj).__name__, "fields": vars(obj)}
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"{type(obj).__name__} is not serialisable")
+
+
+def _decode(obj):
+    if "__dt__" in obj:
+        return datetime.fromisoformat(obj["__dt__"])
+    if "__model__" in obj:
+        model = _MODELS[obj["__model__"]]
+        instance = model.__new__(model)
+        instance.__dict__.update(obj["fields"])
+        return instance
+    return obj
+
+
+def dumps(message):
+    return (json.dumps(message, default=_encode, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def loads(line):
+    return json.loads(line, object_hook=_decode)
+
+
+def load_secret(path=SECRET_PATH, create=False):
+    """
+    The service secret. create=True (the service) makes one, readable by
+    the owner only, when there is none; clients raise OSError without it.
+    """
+    try:
+        with open(path, encoding="ascii") as f:
+            secret = f.read().strip()
+        if secret:
+            return secret
+    except FileNotFoundError:
+        if not create:
+            raise
+    if not create:
+        raise PermissionError(f"empty dispatch secret: {path}")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    secret = secrets.token_hex(32)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="ascii") as f:
+        f.write(secret)
+    return secret
+
+
+def check_secret(offered, secret):
+    return isinstance(offered, str) and hmac.compare_digest(offered.encode(), secret.encode())
+
+
+def connect(address=None, timeout=None, secret=None):
+    """
+    Blocking, authenticated client socket to the service. Raises OSError
+    when it is not running, PermissionError when it refuses the secret.
+    """
+    address = address or default_address()
+    if isinstance(address, str):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    else:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(address)
+        sock.sendall(dumps({"auth": secret or load_secret()}))
+        # Nothing else is sent before our first request, so this reader cannot over-read
+        with sock.makefile("rb") as stream:
+            reply = loads(stream.readline() or b"{}")
+        if reply.get("auth") is not True:
+            raise PermissionError("dispatch service refused the connection")
+    except OSError:
+        sock.close()
+        raise
+    except ValueError as e:
+        sock.close()
+        raise ConnectionError(f"unexpected reply from dispatch service: {e}") from e
+    return sock
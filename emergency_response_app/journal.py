@@ -0,0 +1,91 @@
+# journal.py
+import json
+import os
+import threading
+
+# Kept on the client machine, never next to the (possibly shared) database
+JOURNAL_DIR = os.path.join(os.path.expanduser("~"), ".emergency_response")
+JOURNAL_PATH = os.path.join(JOURNAL_DIR, "submissions.jsonl")
+
+
+class SubmissionJournal:
+    """
+    Append-only JSONL log of reporter submissions.
+
+    Every accepted report is written here (and fsynced) before anything
+    touches the database, so a report survives an unreachable or locked
+    database file and an app restart. Lines are either
+        {"op": "submit", "local_id": ..., "payload": {...}}
+    or
+        {"op": "synced", "local_id": ...}
+    and pending() folds them into the submissions not yet handed to the
+    database. Once nothing is pending the file is truncated.
+    """
+
+    def __init__(self, path=JOURNAL_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def append(self, local_id, payload):
+        self._write([{"op": "submit", "local_id": local_id, "payload": payload}])
+
+    def mark_synced(self, local_ids):
+        """Record that these submissions are now in the database outbox."""
+        if not local_ids:
+            return
+        with self._lock:
+            self._write_locked([{"op": "synced", "local_id": i} for i in local_ids])
+            if not self._pending_locked():
+                open(self.path, "w").close()
+
+    def pending(self):
+        """[(local_id, payload)] not yet synced, in submission order."""
+        with self._lock:
+            return self._pending_locked()
+
+    # -----------------------
+    # INTERNAL
+    # -----------------------
+    def _write(self, records):
+        with self._lock:
+            self._write_locked(records)
+
+    def _write_locked(self, records):
+        with open(self.path, "a+b") as f:
+            # Start on a fresh line if a crash left a torn record behind
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+            for record in records:
+                f.write((json.dumps(record) + "\n").encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _pending_locked(self):
+        if not os.path.exists(self.path):
+            return []
+        pending = {}
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue        # torn final line from a crash mid-write
+                if record.get("op") == "submit":
+                    pending.setdefault(record["local_id"], record["payload"])
+                elif record.get("op") == "synced":
+                    pending.pop(record["local_id"], None)
+        return list(pending.items())
+
+
+_journal = None
+
+
+def get_journal():
+    """Shared journal instance at JOURNAL_PATH."""
+    global _journal
+    if _journal is None:
+        _journal = SubmissionJournal()
+    return _journal
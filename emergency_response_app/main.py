@@ -3,7 +3,9 @@ import sys
 from PyQt5.QtWidgets import QApplication
 from auth_window import AuthWindow
 from main_window import MainWindow
-from database import Database
+from dispatch_client import open_database
+from session import SessionManager
+from sla_monitor import SlaMonitor
 
 # Main application controller class
 
@@ -11,40 +13,65 @@ from database import Database
 class EmergencyResponseApp:
 
     def __init__(self):
-        self.db = Database()
+        # Thin client of dispatch_service.py when one is running, else direct SQLite
+        self.db = open_database()
+        self.session = SessionManager(self.db)
+        # Runs for the whole session, across logins
+        self.sla_monitor = SlaMonitor(self.db)
+        self.sla_monitor.start()
         self.current_user = None
         self.auth_window = None
         self.main_window = None
+        # role -> MainWindow parked at logout, reused by the next login with that role
+        self.shells = {}
 
     def run(self):
-        self.show_auth()
+        # A still-valid session (e.g. after a crash or restart) skips the login screen
+        user = self.session.resume()
+        if user:
+            self.current_user = user
+            self.show_main_window()
+        else:
+            self.show_auth()
 
     # Show authentication window
     def show_auth(self):
         if self.main_window:
-            self.main_window.close()
+            self.main_window.suspend()
+            self.shells[self.main_window.user.role] = self.main_window
             self.main_window = None
 
-        self.auth_window = AuthWindow()
-        self.auth_window.login_success.connect(self.handle_login_success)
+        if self.auth_window is None:
+            self.auth_window = AuthWindow()
+            self.auth_window.login_success.connect(self.handle_login_success)
+        else:
+            self.auth_window.reset()
 
         self.auth_window.showMaximized()
 
     # Login success handler
     def handle_login_success(self, user):
         self.current_user = user
+        self.session.issue(user)
         self.auth_window.close()
         self.show_main_window()
 
     # Show main application window
     def show_main_window(self):
-        self.main_window = MainWindow(self.current_user, self.db)
+        shell = self.shells.pop(self.current_user.role, None)
+        if shell is not None:
+            self.main_window = shell
+            self.main_window.resume(self.current_user)
+            return
+
+        self.main_window = MainWindow(self.current_user, self.db, self.sla_monitor)
         self.main_window.logout_signal.connect(
             self.handle_logout)
         self.main_window.show()
 
     # Logout handler
     def handle_logout(self):
+        self.session.revoke()
         self.current_user = None
         self.show_auth()
 
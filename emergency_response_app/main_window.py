@@ -17,6 +17,7 @@ from reporter.reporter_history_page import ReporterHistoryPage
 from responder.responder_assignments_page import ResponderAssignmentsPage
 from responder.responder_available_page import ResponderAvailablePage
 from admin.admin_analytics import AdminAnalytics
+from admin.admin_diagnostics import AdminDiagnostics
 from admin.user_dossier import UserDossier
 from admin.case_file import CaseFile
 import styles
@@ -26,10 +27,11 @@ from styles import theme
 class MainWindow(QMainWindow):
     logout_signal = pyqtSignal()
 
-    def __init__(self, user, db):
+    def __init__(self, user, db, sla_monitor=None):
         super().__init__()
         self.user = user
         self.db = db
+        self.sla_monitor = sla_monitor
 
         # Views
         self.dashboard = None
@@ -41,6 +43,7 @@ class MainWindow(QMainWindow):
         self.responder_assignments_view = None
         self.responder_available_view = None
         self.admin_analytics_view = None
+        self.admin_diagnostics_view = None
         self.user_dossier_view = None
         self.case_file_view = None
         self.init_ui()
@@ -74,6 +77,20 @@ class MainWindow(QMainWindow):
         theme.register(self.apply_theme)
         self.apply_theme()
 
+        # Admins get told as soon as an incident misses its SLA
+        if self.sla_monitor is not None and self.user.role == "admin":
+            self.sla_monitor.breached.connect(self.on_sla_breached)
+            overdue = self.sla_monitor.overdue()
+            if overdue:
+                self.statusBar().showMessage(f"⚠ {len(overdue)} incident(s) past their SLA")
+
+    def on_sla_breached(self, incident_id, info):
+        self.statusBar().showMessage(
+            f"⚠ SLA breached: {incident_id} ({info['priority']}) at {info['location'] or '—'}"
+            f" — due {info['deadline'].strftime('%H:%M')}",
+            30000,
+        )
+
     def apply_theme(self):
         """Repaint the main window shell when theme changes."""
         s = theme.STYLES
@@ -157,10 +174,10 @@ class MainWindow(QMainWindow):
         avatar_label.setAlignment(Qt.AlignCenter)
         avatar_label.setStyleSheet("font-size: 40px; margin-bottom: 10px;")
 
-        user_name = QLabel(self.user.name)
-        user_name.setAlignment(Qt.AlignCenter)
-        user_name.setFont(QFont("Arial", 14, QFont.Bold))
-        user_name.setStyleSheet("color: white; margin-bottom: 5px;")
+        self._sidebar_name = QLabel(self.user.name)
+        self._sidebar_name.setAlignment(Qt.AlignCenter)
+        self._sidebar_name.setFont(QFont("Arial", 14, QFont.Bold))
+        self._sidebar_name.setStyleSheet("color: white; margin-bottom: 5px;")
 
         user_role = QLabel(self.user.role.title())
         user_role.setAlignment(Qt.AlignCenter)
@@ -168,7 +185,7 @@ class MainWindow(QMainWindow):
         user_role.setStyleSheet("color: #bdc3c7;")
 
         user_layout.addWidget(avatar_label)
-        user_layout.addWidget(user_name)
+        user_layout.addWidget(self._sidebar_name)
         user_layout.addWidget(user_role)
         self._sidebar_user_section.setLayout(user_layout)
         layout.addWidget(self._sidebar_user_section)
@@ -246,6 +263,7 @@ class MainWindow(QMainWindow):
                 ("🚨 Incidents", "incidents"),
                 ("👥 Users", "users"),
                 ("📈 Analytics", "analytics"),
+                ("🩺 Diagnostics", "diagnostics"),
             ]
 
         for text, view in nav_items:
@@ -297,6 +315,10 @@ class MainWindow(QMainWindow):
             self.admin_analytics_view = AdminAnalytics(self.db)
             self.content_area.addWidget(self.admin_analytics_view)
 
+            # Database profiler / slow-query log
+            self.admin_diagnostics_view = AdminDiagnostics(self.db)
+            self.content_area.addWidget(self.admin_diagnostics_view)
+
             # User Dossier & Case File — added on demand, placeholders for now
             # (actual widgets created in open_user_dossier / open_case_file)
 
@@ -384,6 +406,11 @@ class MainWindow(QMainWindow):
             if self.admin_analytics_view is not None:
                 self.content_area.setCurrentWidget(self.admin_analytics_view)
 
+        elif view == "diagnostics" and self.user.role == "admin":
+            if self.admin_diagnostics_view is not None:
+                self.admin_diagnostics_view.load_data()
+                self.content_area.setCurrentWidget(self.admin_diagnostics_view)
+
         # Reporter pages
         elif view == "new_incident" and self.user.role == "reporter":
             if self.reporter_new_incident_view is not None:
@@ -415,15 +442,15 @@ class MainWindow(QMainWindow):
 
     def open_case_file(self, incident_id):
         """Create (or replace) the CaseFile page and show it."""
-        incident = self.db.get_incident_by_id(incident_id)
-        if not incident:
+        bundle = self.db.get_case_bundle(incident_id)
+        if not bundle:
             return
 
         if self.case_file_view is not None:
             self.content_area.removeWidget(self.case_file_view)
             self.case_file_view.deleteLater()
 
-        self.case_file_view = CaseFile(incident, self.db)
+        self.case_file_view = CaseFile(bundle["incident"], self.db, bundle=bundle)
         self.case_file_view.closed.connect(self._on_case_file_closed)
         self.content_area.addWidget(self.case_file_view)
         self.content_area.setCurrentWidget(self.case_file_view)
@@ -440,6 +467,88 @@ class MainWindow(QMainWindow):
         if view_name == "users" and self.admin_users_view is not None:
             self.content_area.setCurrentWidget(self.admin_users_view)
 
+    # --------------------------------------------------------------- session reuse
+    def _pages(self):
+        return [view for view in (
+            self.dashboard, self.profile_view,
+            self.admin_incidents_view, self.admin_users_view, self.admin_analytics_view,
+            self.admin_diagnostics_view,
+            self.reporter_new_incident_view, self.reporter_history_view,
+            self.responder_assignments_view, self.responder_available_view,
+            self.user_dossier_view, self.case_file_view,
+        ) if view is not None]
+
+    def suspend(self):
+        """
+        Park the window after logout instead of destroying it: hide it and
+        stop every page's refresh timer and incident feed, so a later login
+        with the same role can reuse the whole shell (see resume).
+        """
+        for page in self._pages():
+            for name in ("timer", "_timer", "feed"):
+                timer = getattr(page, name, None)
+                if timer is not None:
+                    timer.stop()
+        if self.sla_monitor is not None and self.user.role == "admin":
+            self.sla_monitor.breached.disconnect(self.on_sla_breached)
+        self.statusBar().clearMessage()
+        self.hide()
+
+    def resume(self, user):
+        """Show the parked window for `user` (same role), refreshing only what is per-user."""
+        if user.id != self.user.id:
+            self._rebind_user(user)
+        self.user = user
+
+        for page in self._pages():
+            for name in ("timer", "_timer", "feed"):
+                timer = getattr(page, name, None)
+                if timer is not None:
+                    timer.start()
+            if hasattr(page, "load_data"):
+                page.load_data()
+            elif page is self.admin_analytics_view:
+                page.refresh()
+        # Admin incident/user lists are snapshots; rebuild them with current data
+        self.refresh_data()
+
+        if self.sla_monitor is not None and user.role == "admin":
+            self.sla_monitor.breached.connect(self.on_sla_breached)
+            overdue = self.sla_monitor.overdue()
+            if overdue:
+                self.statusBar().showMessage(f"⚠ {len(overdue)} incident(s) past their SLA")
+
+        self.content_area.setCurrentWidget(self.dashboard)
+        self.showMaximized()
+
+    def _rebind_user(self, user):
+        self.setWindowTitle(f"Emergency Response System - {user.name}")
+        self._sidebar_name.setText(user.name)
+
+        # Pages that only read self.user when loading or acting
+        for page in (self.dashboard, self.reporter_history_view,
+                     self.responder_assignments_view, self.responder_available_view):
+            if page is not None:
+                page.user = user
+
+        # Never show the previous reporter's draft
+        if self.reporter_new_incident_view is not None:
+            self.reporter_new_incident_view.user = user
+            self.reporter_new_incident_view.reset_form()
+            self.reporter_new_incident_view.receipt_label.hide()
+
+        # Per-user pages are cheap to rebuild and hold the old user's data
+        for attr in ("user_dossier_view", "case_file_view"):
+            view = getattr(self, attr)
+            if view is not None:
+                self.content_area.removeWidget(view)
+                view.deleteLater()
+                setattr(self, attr, None)
+        self.content_area.removeWidget(self.profile_view)
+        self.profile_view.deleteLater()
+        self.profile_view = Profile(user, self.db)
+        self.content_area.addWidget(self.profile_view)
+
     def handle_logout(self):
         reply = QMessageBox.question(
             self,
@@ -40,7 +40,8 @@ class Incident:
     def __init__(self, id, type, location, description, priority, status="pending", 
                  reporter_id=None, reporter_name=None, responder_id=None, responder_name=None,
                  created_at=None, updated_at=None, incident_category=None, specific_questions=None,
-                 emergency_feedback=None, assigned_responders=None, attachments=None):
+                 emergency_feedback=None, assigned_responders=None, attachments=None,
+                 latitude=None, longitude=None, cluster_id=None):
         self.id = id
         self.type = type
         self.location = location
@@ -58,6 +59,9 @@ class Incident:
         self.emergency_feedback = emergency_feedback or ""
         self.assigned_responders = assigned_responders or []
         self.attachments = attachments or []
+        self.latitude = latitude
+        self.longitude = longitude
+        self.cluster_id = cluster_id   # id of the primary report if this is a duplicate
     
     def to_dict(self):
         return {
@@ -76,5 +80,8 @@ class Incident:
             'incident_category': self.incident_category,
             'specific_questions': self.specific_questions,
             'emergency_feedback': self.emergency_feedback,
-            'assigned_responders': self.assigned_responders
+            'assigned_responders': self.assigned_responders,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
+            'cluster_id': self.cluster_id
         }
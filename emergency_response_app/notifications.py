@@ -0,0 +1,67 @@
+# notifications.py
+import itertools
+import threading
+
+INCIDENT_CREATED = "incident.created"
+INCIDENT_UPDATED = "incident.updated"
+
+
+def normalize_category(category):
+    """"Search and Rescue" and "search_rescue"-style spellings compare equal."""
+    return (category or "").lower().strip().replace(" ", "_")
+
+
+class EventBus:
+    """
+    Push channel for incident changes, fed by Database._notify.
+
+    subscribe(callback, category) delivers {"event": INCIDENT_CREATED or
+    INCIDENT_UPDATED, "incident": Incident} for incidents whose category
+    matches (category=None means every incident). Callbacks run on the
+    thread that made the write, so GUI code should go through
+    incident_feed.IncidentFeed.
+
+    The incident is loaded once per change and only while someone is
+    subscribed: with no subscribers a write costs nothing extra, and
+    subscribers do no database work while nothing changes.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._lock = threading.Lock()
+        self._subscribers = {}      # token -> (callback, normalized category or None)
+        self._tokens = itertools.count(1)
+
+    def subscribe(self, callback, category=None):
+        """Returns a token for unsubscribe()."""
+        token = next(self._tokens)
+        with self._lock:
+            self._subscribers[token] = (callback, normalize_category(category) or None)
+        return token
+
+    def unsubscribe(self, token):
+        with self._lock:
+            self._subscribers.pop(token, None)
+
+    def publish(self, kind, key, created=False):
+        with self._lock:
+            subscribers = list(self._subscribers.values())
+        if not subscribers:
+            return
+
+        if kind == "incident":
+            incidents = [self.db.get_incident_by_id(key)]
+        elif kind == "cluster":
+            incidents = [self.db.get_incident_by_id(key)] + self.db.get_linked_incidents(key)
+        else:
+            return
+        event = INCIDENT_CREATED if created else INCIDENT_UPDATED
+
+        for incident in incidents:
+            if incident is None:
+                continue
+            category = normalize_category(incident.incident_category)
+            message = {"event": event, "incident": incident}
+            for callback, wanted in subscribers:
+                if wanted is None or wanted == category:
+                    callback(message)
@@ -0,0 +1,219 @@
+# passwords.py
+import base64
+import hashlib
+import hmac
+import json
+import os
+import re
+import time
+
+# Calibrated work factors are a property of this machine, so they are
+# stored with the other client-side state (see journal.py)
+CONFIG_DIR = os.path.join(os.path.expanduser("~"), ".emergency_response")
+CONFIG_PATH = os.path.join(CONFIG_DIR, "password_hasher.json")
+
+TARGET_MS = 250               # how long one hash should take after calibration
+SALT_BYTES = 16
+_LEGACY_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+
+
+def _b64(raw):
+    return base64.b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _unb64(text):
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+class ScryptHasher:
+    """
+    scrypt (memory-hard), stored as  scrypt$<n>$<r>$<p>$<salt>$<hash>.
+    Memory use is about 128 * n * r bytes per hash (16 MiB at the defaults).
+    """
+
+    algorithm = "scrypt"
+
+    def __init__(self, n=2 ** 14, r=8, p=1):
+        self.n, self.r, self.p = n, r, p
+
+    def _derive(self, password, salt, n, r, p):
+        return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                              maxmem=256 * n * r, dklen=32)
+
+    def encode(self, password):
+        salt = os.urandom(SALT_BYTES)
+        digest = self._derive(password, salt, self.n, self.r, self.p)
+        return f"scrypt${self.n}${self.r}${self.p}${_b64(salt)}${_b64(digest)}"
+
+    def verify(self, password, encoded):
+        _, n, r, p, salt, digest = encoded.split("$")
+        actual = self._derive(password, _unb64(salt), int(n), int(r), int(p))
+        return hmac.compare_digest(actual, _unb64(digest))
+
+    def needs_rehash(self, encoded):
+        _, n, r, p, _salt, _digest = encoded.split("$")
+        return (int(n), int(r), int(p)) != (self.n, self.r, self.p)
+
+    def calibrate(self, target_ms=TARGET_MS):
+        """Double n until one hash takes at least target_ms."""
+        n = 2 ** 12
+        while n < 2 ** 20:
+            start = time.perf_counter()
+            self._derive("calibration", b"\0" * SALT_BYTES, n, self.r, self.p)
+            if (time.perf_counter() - start) * 1000 >= target_ms:
+                break
+            n *= 2
+        self.n = n
+        return {"n": self.n, "r": self.r, "p": self.p}
+
+
+class Pbkdf2Hasher:
+    """PBKDF2-HMAC-SHA256, stored as  pbkdf2_sha256$<iterations>$<salt>$<hash>."""
+
+    algorithm = "pbkdf2_sha256"
+
+    def __init__(self, iterations=600_000):
+        self.iterations = iterations
+
+    def encode(self, password):
+        salt = os.urandom(SALT_BYTES)
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, self.iterations)
+        return f"pbkdf2_sha256${self.iterations}${_b64(salt)}${_b64(digest)}"
+
+    def verify(self, password, encoded):
+        _, iterations, salt, digest = encoded.split("$")
+        actual = hashlib.pbkdf2_hmac("sha256", password.encode(), _unb64(salt), int(iterations))
+        return hmac.compare_digest(actual, _unb64(digest))
+
+    def needs_rehash(self, encoded):
+        return int(encoded.split("$")[1]) != self.iterations
+
+    def calibrate(self, target_ms=TARGET_MS):
+        """Scale iterations from a short trial run to hit target_ms."""
+        trial = 50_000
+        start = time.perf_counter()
+        hashlib.pbkdf2_hmac("sha256", b"calibration", b"\0" * SALT_BYTES, trial)
+        elapsed_ms = max((time.perf_counter() - start) * 1000, 0.001)
+        self.iterations = max(100_000, int(trial * target_ms / elapsed_ms) // 1000 * 1000)
+        return {"iterations": self.iterations}
+
+
+HASHERS = {
+    ScryptHasher.algorithm: ScryptHasher,
+    Pbkdf2Hasher.algorithm: Pbkdf2Hasher,
+}
+
+_default = None
+
+
+def _load_default():
+    """Default hasher with this machine's calibrated settings, if any."""
+    algorithm = ScryptHasher.algorithm if hasattr(hashlib, "scrypt") else Pbkdf2Hasher.algorithm
+    params = {}
+    try:
+        with open(CONFIG_PATH, encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved.get("algorithm") in HASHERS:
+            algorithm, params = saved["algorithm"], saved.get("params", {})
+    except (OSError, ValueError):
+        pass
+    return HASHERS[algorithm](**params)
+
+
+def get_hasher():
+    """The hasher new passwords are encoded with."""
+    global _default
+    if _default is None:
+        _default = _load_default()
+    return _default
+
+
+def set_hasher(hasher):
+    """Swap the default hasher (any object with encode / verify / needs_rehash)."""
+    global _default
+    _default = hasher
+
+
+def calibrate(target_ms=TARGET_MS, save=True):
+    """
+    Benchmark the default algorithm on this machine, make the result the
+    default and (optionally) save it so later runs skip the benchmark.
+    """
+    algorithm = ScryptHasher.algorithm if hasattr(hashlib, "scrypt") else Pbkdf2Hasher.algorithm
+    hasher = HASHERS[algorithm]()
+    params = hasher.calibrate(target_ms)
+    set_hasher(hasher)
+    if save:
+        os.makedirs(CONFIG_DIR, exist_ok=True)
+        with open(CONFIG_PATH, "w", encoding="utf-8") as f:
+            json.dump({"algorithm": algorithm, "params": params}, f)
+    return hasher
+
+
+# ======================
+# PUBLIC HELPERS
+# ======================
+
+def hash_password(password):
+    return get_hasher().encode(password)
+
+
+def is_legacy(stored):
+    """True for the old unsalted SHA-256 hex digests."""
+    return bool(stored) and bool(_LEGACY_SHA256.match(stored))
+
+
+def is_hashed(stored):
+    """True when `stored` is a hash verify_password can check (not a plain-text password)."""
+    return is_legacy(stored) or (stored or "").split("$", 1)[0] in HASHERS
+
+
+def verify_password(password, stored):
+    """
+    Check a password against a stored hash of any supported format.
+    Returns (ok, needs_rehash); needs_rehash is True when the stored hash
+    is legacy SHA-256 or uses other settings than the current hasher.
+    """
+    if not stored:
+        return False, False
+    if is_legacy(stored):
+        actual = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(actual, stored), True
+
+    algorithm = stored.split("$", 1)[0]
+    current = get_hasher()
+    if algorithm == getattr(current, "algorithm", None):
+        hasher, outdated = current, None
+    elif algorithm in HASHERS:
+        hasher, outdated = HASHERS[algorithm](), True
+    else:
+        return False, False
+    try:
+        ok = hasher.verify(password, stored)
+    except (ValueError, TypeError):
+        return False, False
+    if outdated is None:
+        outdated = hasher.needs_rehash(stored)
+    return ok, ok and outdated
+
+
+# Equalises timing for unknown usernames (see dummy_verify)
+_DUMMY_HASH = None
+
+
+def dummy_verify(password):
+    """Spend the same time as a real check, for logins with an unknown user."""
+    global _DUMMY_HASH
+    if _DUMMY_HASH is None:
+        _DUMMY_HASH = hash_password("not-a-real-password")
+    verify_password(password, _DUMMY_HASH)
+    return False
+
+
+if __name__ == "__main__":
+    # python passwords.py  -> calibrate and save the work factor for this machine
+    hasher = calibrate()
+    start = time.perf_counter()
+    hasher.encode("benchmark")
+    print(f"{hasher.algorithm}: {vars(hasher)}  ({(time.perf_counter() - start) * 1000:.0f} ms per hash)")
+    print(f"saved to {CONFIG_PATH}")
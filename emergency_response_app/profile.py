@@ -7,6 +7,8 @@ from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont, QPixmap
 from datetime import datetime
 import json
+import geo
+from thumbnails import get_thumbnail_service
 
 
 # -------------------------------
@@ -903,6 +905,11 @@ class Profile(QWidget):
         # keep local copy in sync so Cancel works correctly
         self.profile_data = extended_data
 
+        # Responders' base location feeds nearest-responder dispatch
+        coords = geo.geocode(extended_data["address"]) or geo.geocode(extended_data["city"])
+        if coords:
+            self.db.set_user_location(self.current_user.id, *coords)
+
         QMessageBox.information(self, "Success", "Profile updated successfully!")
 
     def change_password(self):
@@ -920,11 +927,12 @@ class Profile(QWidget):
         )
         if not file_path:
             return
-        pixmap = QPixmap(file_path)
-        if pixmap.isNull():
+        # Decode + scale on the thumbnail worker pool, not the GUI thread
+        get_thumbnail_service().request(file_path, 120, self._on_avatar_ready, fill=True)
+
+    def _on_avatar_ready(self, image):
+        if image is None:
             QMessageBox.warning(self, "Error", "Could not load selected image.")
             return
-        # Scale to fit the avatar circle area
-        scaled = pixmap.scaled(120, 120, Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)
-        self.avatar_label.setPixmap(scaled)
+        self.avatar_label.setPixmap(QPixmap.fromImage(image))
         self.avatar_label.setText("")  # remove emoji text
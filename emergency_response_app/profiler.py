@@ -0,0 +1,278 @@
+# profiler.py
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+# Upper edges (ms) of the per-method wall-time histogram; the last bucket is open
+HISTOGRAM_EDGES_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000)
+DEFAULT_SLOW_MS = 50
+SLOW_LOG_SIZE = 200
+# Frames in these files (and in storage/ and the standard library) belong
+# to the data layer, not to the caller
+_DATA_LAYER_FILES = {"database.py", "profiler.py", "notifications.py",
+                     "dispatch_service.py", "dispatch_client.py"}
+_STDLIB_DIR = os.path.dirname(os.__file__)
+# Statements with no useful query plan
+_NO_PLAN = ("BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE", "PRAGMA",
+            "CREATE", "ALTER", "DROP", "EXPLAIN")
+
+
+class QueryProfiler:
+    """
+    Opt-in instrumentation for Database (Database.enable_profiling, or
+    ERS_PROFILE=<slow ms> in the environment).
+
+    - Every profiled Database method records calls, wall time (total and
+      a histogram), rows returned (list length; 1 for a single object),
+      grouped by the widget method that made the outermost call, e.g.
+      "AdminAnalytics.refresh". Nested calls (the _row_to_* helpers) are
+      attributed to the same caller, so the diagnostics page can show
+      which share of a caller's time goes where.
+    - Connections from Database.get_connection time each SQL statement
+      (execute plus fetches); statements slower than `slow_ms` are kept
+      in a bounded log with their EXPLAIN QUERY PLAN.
+
+    Times are inclusive: get_all_incidents includes its _row_to_incident
+    calls. A generator method (iter_*) is timed only until it returns
+    its generator. Timing the per-row helpers costs a few microseconds a
+    row, which inflates their share somewhat on large lists.
+    """
+
+    def __init__(self, db_name, slow_ms=DEFAULT_SLOW_MS):
+        self.db_name = db_name
+        self.slow_ms = slow_ms
+        self._lock = threading.Lock()
+        self._local = threading.local()     # caller / depth / statements of the running call
+        self.reset()
+
+    # -----------------------
+    # RECORDING
+    # -----------------------
+    def wrap(self, method, fn):
+        """fn (a bound Database method) with timing attached."""
+        def profiled(*args, **kwargs):
+            local = self._local
+            depth = getattr(local, "depth", 0)
+            if depth == 0:
+                local.caller = _find_caller()
+                local.statements = []
+            local.depth = depth + 1
+            result = None
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+                return result
+            finally:
+                elapsed = time.perf_counter() - start
+                local.depth = depth
+                self._record(local.caller, method, elapsed, _row_count(result), depth == 0)
+                if depth == 0:
+                    statements, local.statements = local.statements, None
+                    self._log_slow(local.caller, method, statements)
+        profiled.__name__ = method
+        profiled.__wrapped__ = fn
+        return profiled
+
+    def connect(self):
+        conn = sqlite3.connect(self.db_name, factory=_ProfiledConnection)
+        conn.profiler = self
+        return conn
+
+    def _record(self, caller, method, elapsed, rows, outermost):
+        bucket = _bucket(elapsed * 1000)
+        with self._lock:
+            entry = self._stats.get((caller, method))
+            if entry is None:
+                entry = self._stats[(caller, method)] = {
+                    "calls": 0, "total_s": 0.0, "outer_s": 0.0, "rows": 0,
+                    "histogram": [0] * (len(HISTOGRAM_EDGES_MS) + 1),
+                }
+            entry["calls"] += 1
+            entry["total_s"] += elapsed
+            entry["rows"] += rows
+            entry["histogram"][bucket] += 1
+            if outermost:
+                entry["outer_s"] += elapsed
+
+    def _statement(self, sql, params, elapsed):
+        """Called by _ProfiledCursor; returns the [sql, params, seconds] entry to add fetch time to."""
+        entry = [sql, params, elapsed]
+        statements = getattr(self._local, "statements", None)
+        if statements is not None:
+            statements.append(entry)
+        else:                   # direct get_connection() use outside a Database method
+            self._log_slow(_find_caller(), "get_connection", [entry])
+        return entry
+
+    def _log_slow(self, caller, method, statements):
+        for sql, params, elapsed in statements:
+            ms = elapsed * 1000
+            if ms < self.slow_ms:
+                continue
+            entry = {
+                "at": datetime.now().isoformat(timespec="seconds"),
+                "caller": caller,
+                "method": method,
+                "ms": round(ms, 3),
+                "sql": " ".join(sql.split()),
+                "params": repr(params)[:200],
+                "plan": self.explain(sql, params),
+            }
+            with self._lock:
+                self._slow.append(entry)
+
+    def explain(self, sql, params=()):
+        """EXPLAIN QUERY PLAN detail lines for a statement (run on a separate connection)."""
+        if sql.lstrip().upper().startswith(_NO_PLAN):
+            return []
+        conn = sqlite3.connect(self.db_name)
+        try:
+            return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params or ())]
+        except sqlite3.Error as e:
+            return [f"(no plan: {e})"]
+        finally:
+            conn.close()
+
+    # -----------------------
+    # REPORT
+    # -----------------------
+    def reset(self):
+        with self._lock:
+            self._stats = {}        # (caller, method) -> counters
+            self._slow = deque(maxlen=SLOW_LOG_SIZE)
+            self.since = datetime.now()
+
+    def snapshot(self):
+        """Plain-data report (JSON-safe, so it also travels over the dispatch socket)."""
+        with self._lock:
+            stats = {key: dict(value, histogram=list(value["histogram"]))
+                     for key, value in self._stats.items()}
+            slow = list(self._slow)
+
+        methods, callers = {}, {}
+        for (caller, method), entry in stats.items():
+            total = methods.setdefault(method, {
+                "method": method, "calls": 0, "total_s": 0.0, "rows": 0,
+                "histogram": [0] * (len(HISTOGRAM_EDGES_MS) + 1),
+            })
+            total["calls"] += entry["calls"]
+            total["total_s"] += entry["total_s"]
+            total["rows"] += entry["rows"]
+            total["histogram"] = [a + b for a, b in zip(total["histogram"], entry["histogram"])]
+
+            group = callers.setdefault(caller, {"caller": caller, "total_s": 0.0, "methods": []})
+            group["total_s"] += entry["outer_s"]
+            group["methods"].append({"method": method, "calls": entry["calls"],
+                                     "total_s": entry["total_s"], "rows": entry["rows"]})
+
+        for total in methods.values():
+            total["mean_ms"] = total["total_s"] * 1000 / total["calls"]
+            total["p95_ms"] = _histogram_percentile(total["histogram"], 0.95)
+        for group in callers.values():
+            for entry in group["methods"]:
+                entry["share"] = entry["total_s"] / group["total_s"] if group["total_s"] else None
+            group["methods"].sort(key=lambda e: e["total_s"], reverse=True)
+
+        return {
+            "enabled": True,
+            "since": self.since.isoformat(timespec="seconds"),
+            "slow_ms": self.slow_ms,
+            "histogram_edges_ms": list(HISTOGRAM_EDGES_MS),
+            "methods": sorted(methods.values(), key=lambda m: m["total_s"], reverse=True),
+            "callers": sorted(callers.values(), key=lambda c: c["total_s"], reverse=True),
+            "slow_queries": slow[::-1],      # newest first
+        }
+
+
+class _ProfiledCursor(sqlite3.Cursor):
+    """Times execute / executemany, and adds fetch time to the statement that produced the rows."""
+
+    _entry = None
+
+    def execute(self, sql, params=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, params)
+        finally:
+            self._entry = self.connection.profiler._statement(sql, params, time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_params):
+        seq_of_params = list(seq_of_params)
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_params)
+        finally:
+            self._entry = self.connection.profiler._statement(
+                sql, seq_of_params[0] if seq_of_params else (), time.perf_counter() - start)
+
+    def _fetch(self, fetch, *args):
+        start = time.perf_counter()
+        try:
+            return fetch(*args)
+        finally:
+            if self._entry is not None:
+                self._entry[2] += time.perf_counter() - start
+
+    def fetchone(self):
+        return self._fetch(super().fetchone)
+
+    def fetchmany(self, size=None):
+        return self._fetch(super().fetchmany, size if size is not None else self.arraysize)
+
+    def fetchall(self):
+        return self._fetch(super().fetchall)
+
+
+class _ProfiledConnection(sqlite3.Connection):
+    profiler = None
+
+    def cursor(self, factory=None):
+        # Connection.execute() also creates its cursor through this method
+        return super().cursor(factory or _ProfiledCursor)
+
+
+def _find_caller():
+    """'Class.method' (or 'module.function') of the first frame outside the data layer."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        code = frame.f_code
+        filename = os.path.basename(code.co_filename)
+        if not (filename in _DATA_LAYER_FILES
+                or os.path.basename(os.path.dirname(code.co_filename)) == "storage"
+                or code.co_filename.startswith(_STDLIB_DIR)):
+            owner = frame.f_locals.get("self")
+            if owner is not None:
+                return f"{type(owner).__name__}.{code.co_name}"
+            return f"{os.path.splitext(filename)[0]}.{code.co_name}"
+        frame = frame.f_back
+    return "<unknown>"
+
+
+def _row_count(result):
+    if result is None:
+        return 0
+    if isinstance(result, list):
+        return len(result)
+    return 1
+
+
+def _bucket(ms):
+    for i, edge in enumerate(HISTOGRAM_EDGES_MS):
+        if ms <= edge:
+            return i
+    return len(HISTOGRAM_EDGES_MS)
+
+
+def _histogram_percentile(histogram, fraction):
+    """Upper bucket edge (ms) reached by `fraction` of the calls; None past the last edge."""
+    target = fraction * sum(histogram)
+    seen = 0
+    for i, count in enumerate(histogram):
+        seen += count
+        if seen >= target and count:
+            return HISTOGRAM_EDGES_MS[i] if i < len(HISTOGRAM_EDGES_MS) else None
+    return None
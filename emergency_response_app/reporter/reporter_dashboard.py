@@ -12,7 +12,8 @@ from datetime import datetime
 import styles
 from incident_data import (incident_categories, incident_display_names, 
                           get_questions_for_incident, get_feedback_for_incident,
-                          get_responders_for_incident, get_incident_display_name)
+                          get_responders_for_incident, get_incident_display_name,
+                          get_incident_category)
 
 class ReporterDashboard(QWidget):
     def __init__(self, user, db):
@@ -351,11 +352,7 @@ class NewIncidentDialog(QDialog):
             return
         
         incident_id = self.db.get_next_incident_id()
-        category = None
-        for cat, types in incident_categories.items():
-            if incident_type in types:
-                category = cat
-                break
+        category = get_incident_category(incident_type)
         
         new_incident = Incident(
             id=incident_id,
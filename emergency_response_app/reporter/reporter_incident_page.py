@@ -5,16 +5,18 @@ from PyQt5.QtWidgets import (
     QScrollArea, QMessageBox, QFileDialog, QFrame
 )
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QFont
+from PyQt5.QtGui import QFont, QPixmap
 import os
-from datetime import datetime
 
-from models import Incident
+from attachment_store import get_store
+from workers import run_in_background
+from thumbnails import get_thumbnail_service
+import submit_pipeline
+from submit_pipeline import SubmitPipeline
 from incident_data import (
     incident_categories,
     get_questions_for_incident,
     get_feedback_for_incident,
-    get_responders_for_incident,
     get_incident_display_name,
     get_incident_priority,
 )
@@ -29,7 +31,15 @@ class ReporterNewIncidentPage(QWidget):
         self.user = user
         self.db = db
         self.dynamic_widgets = {}
+        # incident type -> (form container, {question key: input widget});
+        # built on first use and re-shown when the type is picked again
+        self.question_forms = {}
+        self.active_form = None
+        self.pipeline = SubmitPipeline(db, parent=self)
+        self.pipeline.receipt.connect(self._on_receipt)
         self.init_ui()
+        # Finish reports accepted before the app was last closed
+        self.pipeline.sync()
 
     def init_ui(self):
         self.setMinimumSize(900, 700)  # Set minimum size for reasonable display
@@ -42,6 +52,13 @@ class ReporterNewIncidentPage(QWidget):
         title.setStyleSheet("color: #1F2937;")
         main_layout.addWidget(title)
 
+        # Non-blocking submission receipts (accepted -> persisted -> processed)
+        self.receipt_label = QLabel()
+        self.receipt_label.setWordWrap(True)
+        self.receipt_label.setFont(QFont("Arial", 12))
+        self.receipt_label.hide()
+        main_layout.addWidget(self.receipt_label)
+
         # scrollable area
         scroll = QScrollArea()
         scroll.setWidgetResizable(True)
@@ -146,6 +163,8 @@ class ReporterNewIncidentPage(QWidget):
 
         # Internal list of selected file paths
         self.selected_files = []
+        # path -> ingest job {"worker", "meta", "icon_label", "status_label"}
+        self.ingests = {}
 
         # ---- Emergency instructions ----
         self.feedback_group = QGroupBox("Emergency Instructions")
@@ -202,16 +221,10 @@ class ReporterNewIncidentPage(QWidget):
         self.on_incident_type_changed()
 
     def on_incident_type_changed(self):
-        # clear old widgets
-        for w in self.dynamic_widgets.values():
-            w.deleteLater()
-        self.dynamic_widgets.clear()
-
-        while self.questions_layout.count():
-            item = self.questions_layout.takeAt(0)
-            w = item.widget()
-            if w is not None:
-                w.deleteLater()
+        if self.active_form is not None:
+            self.active_form.hide()
+            self.active_form = None
+        self.dynamic_widgets = {}
 
         incident_type = self.type_combo.currentData()
         if not incident_type:
@@ -221,6 +234,29 @@ class ReporterNewIncidentPage(QWidget):
         priority = get_incident_priority(incident_type)
         self.priority_label.setText(priority)
 
+        form = self.question_forms.get(incident_type)
+        if form is None:
+            form = self._build_question_form(incident_type)
+            self.question_forms[incident_type] = form
+            self.questions_layout.addWidget(form[0])
+
+        container, widgets = form
+        container.show()
+        self.active_form = container
+        self.dynamic_widgets = widgets
+
+        feedback = get_feedback_for_incident(incident_type)
+        self.feedback_label.setText(feedback)
+
+    def _build_question_form(self, incident_type):
+        """Build the question widgets for one incident type (done once per type)."""
+        container = QWidget()
+        container.setStyleSheet("background: transparent;")
+        container_layout = QVBoxLayout(container)
+        container_layout.setContentsMargins(0, 0, 0, 0)
+        container_layout.setSpacing(16)
+        widgets = {}
+
         questions = get_questions_for_incident(incident_type)
 
         for key, question in questions.items():
@@ -278,11 +314,19 @@ class ReporterNewIncidentPage(QWidget):
                 """)
 
             block_layout.addWidget(widget)
-            self.questions_layout.addWidget(field_block)
-            self.dynamic_widgets[key] = widget
+            container_layout.addWidget(field_block)
+            widgets[key] = widget
 
-        feedback = get_feedback_for_incident(incident_type)
-        self.feedback_label.setText(feedback)
+        return container, widgets
+
+    def _clear_question_answers(self):
+        """Blank every cached question form without destroying it."""
+        for _, widgets in self.question_forms.values():
+            for widget in widgets.values():
+                if isinstance(widget, QComboBox):
+                    widget.setCurrentIndex(0)
+                else:
+                    widget.clear()
 
     # ----------------- helpers -----------------
     def _collect_specific_questions(self):
@@ -307,7 +351,53 @@ class ReporterNewIncidentPage(QWidget):
         for path in files:
             if path not in self.selected_files:
                 self.selected_files.append(path)
-                self._add_file_chip(path)
+                icon_label, status_label = self._add_file_chip(path)
+                self._start_ingest(path, icon_label, status_label)
+
+    def _start_ingest(self, path, icon_label, status_label):
+        """Copy the file into the attachment store on a background thread."""
+        job = {"worker": None, "meta": None, "icon_label": icon_label,
+               "status_label": status_label}
+
+        def ingest(progress, cancelled):
+            meta = get_store(self.db.db_name).ingest(path, progress=progress, cancelled=cancelled)
+            self.db.save_attachment(meta)
+            return meta
+
+        worker = run_in_background(ingest, report_progress=True)
+        worker.signals.progress.connect(lambda done, total, j=job: self._on_ingest_progress(j, done, total))
+        worker.signals.finished.connect(lambda meta, j=job: self._on_ingest_finished(j, meta))
+        worker.signals.failed.connect(lambda err, j=job: self._on_ingest_failed(j, err))
+        job["worker"] = worker
+        self.ingests[path] = job
+
+    def _on_ingest_progress(self, job, done, total):
+        if job["status_label"] is not None:
+            pct = int(done * 100 / total) if total else 100
+            job["status_label"].setText(f"{pct}%")
+
+    def _on_ingest_finished(self, job, meta):
+        job["meta"] = meta
+        if job["status_label"] is not None:
+            job["status_label"].setText("✓")
+            # Swap the emoji icon for a real preview once the file is stored
+            get_thumbnail_service().request(
+                get_store(self.db.db_name).path_for(meta["sha256"]), 32,
+                lambda image, j=job: self._on_chip_preview(j, image),
+                sha256=meta["sha256"], fill=True, mime_type=meta["mime_type"],
+            )
+
+    def _on_chip_preview(self, job, image):
+        if image is None or job["icon_label"] is None:
+            return
+        job["icon_label"].setFixedSize(32, 32)
+        job["icon_label"].setPixmap(QPixmap.fromImage(image))
+
+    def _on_ingest_failed(self, job, error):
+        if job["status_label"] is not None:
+            job["status_label"].setText("failed")
+            job["status_label"].setToolTip(error)
+        print(f"Attachment ingest error: {error}")  # For debugging
 
     def _add_file_chip(self, path):
         """Add a small row showing the filename with a remove button."""
@@ -360,14 +450,25 @@ class ReporterNewIncidentPage(QWidget):
             }
         """)
         remove_btn.clicked.connect(lambda _, p=path, c=chip: self._remove_file(p, c))
+
+        # Copy progress while the file is ingested into the store
+        status_label = QLabel("0%")
+        status_label.setStyleSheet("color: #6B7280; font-size: 11px; background: transparent; border: none;")
+        chip_layout.addWidget(status_label)
         chip_layout.addWidget(remove_btn)
 
         self.attachments_list_layout.addWidget(chip)
+        return icon_label, status_label
 
     def _remove_file(self, path, chip_widget):
         """Remove a file from the selected list and from the UI."""
         if path in self.selected_files:
             self.selected_files.remove(path)
+        job = self.ingests.pop(path, None)
+        if job is not None:
+            job["worker"].cancel()
+            job["icon_label"] = None
+            job["status_label"] = None
         chip_widget.deleteLater()
 
     def reset_form(self):
@@ -376,6 +477,15 @@ class ReporterNewIncidentPage(QWidget):
         self.category_combo.setCurrentIndex(0)
         self.priority_label.setText("")
         self.selected_files.clear()
+        # Copies still running are abandoned; a submitted report lists those
+        # files in its payload and the pipeline stores them itself
+        for job in self.ingests.values():
+            job["icon_label"] = None
+            job["status_label"] = None
+            if job["meta"] is None:
+                job["worker"].cancel()
+        self.ingests.clear()
+        self._clear_question_answers()
         # Remove all file chips from UI
         while self.attachments_list_layout.count():
             item = self.attachments_list_layout.takeAt(0)
@@ -384,56 +494,73 @@ class ReporterNewIncidentPage(QWidget):
         self.on_category_changed(self.category_combo.currentText())
 
     def submit_incident(self):
-        try:
-            location = self.location_input.text().strip()
-            description = self.description_input.toPlainText().strip()
-            priority = self.priority_label.text()
-            incident_type = self.type_combo.currentData()
-
-            if not location or not description:
-                QMessageBox.warning(self, "Error", "Please fill in location and description.")
-                return
-            if not incident_type:
-                QMessageBox.warning(self, "Error", "Please select an incident type.")
-                return
-
-            incident_id = self.db.get_next_incident_id()
-
-            # derive category from type
-            category = None
-            for cat, types in incident_categories.items():
-                if incident_type in types:
-                    category = cat
-                    break
-
-            specific_questions = self._collect_specific_questions()
-
-            incident = Incident(
-                id=incident_id,
-                type=incident_type,
-                location=location,
-                description=description,
-                priority=priority,
-                reporter_id=self.user.id,
-                reporter_name=self.user.name,
-                incident_category=category,
-                specific_questions=specific_questions,
-                emergency_feedback=get_feedback_for_incident(incident_type),
-                assigned_responders=get_responders_for_incident(incident_type),
-                attachments=self.selected_files.copy(),
-                created_at=datetime.now(),
-                updated_at=datetime.now(),
-            )
+        location = self.location_input.text().strip()
+        description = self.description_input.toPlainText().strip()
+        incident_type = self.type_combo.currentData()
 
-            self.db.create_incident(incident)
+        if not location or not description:
+            QMessageBox.warning(self, "Error", "Please fill in location and description.")
+            return
+        if not incident_type:
+            QMessageBox.warning(self, "Error", "Please select an incident type.")
+            return
 
-            QMessageBox.information(
-                self,
-                "Success",
-                f"Incident {incident_id} reported successfully!\n"
-                f"Recommended responders: {', '.join(incident.assigned_responders)}",
-            )
-            self.reset_form()
+        # Stored files travel by hash; files still copying by path, so the
+        # pipeline can store them even if this app closes first
+        stored = []
+        pending = []
+        for path, job in self.ingests.items():
+            if job["meta"] is not None:
+                stored.append([job["meta"]["sha256"], job["meta"]["original_name"]])
+            else:
+                pending.append([path, os.path.basename(path)])
+
+        payload = {
+            "type": incident_type,
+            "location": location,
+            "description": description,
+            "specific_questions": self._collect_specific_questions(),
+            "reporter_id": self.user.id,
+            "reporter_name": self.user.name,
+            "attachments": stored,
+            "attachment_files": pending,
+        }
+        try:
+            self.pipeline.submit(payload)
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An error occurred while submitting the report: {str(e)}")
             print(f"Submit incident error: {e}")  # For debugging
+            return
+
+        self.reset_form()
+
+    def _on_receipt(self, local_id, stage, info):
+        """Show pipeline progress for a submitted report without blocking."""
+        if stage == submit_pipeline.ACCEPTED:
+            text, color = "Report received — saving…", "#6B7280"
+        elif stage == submit_pipeline.VALIDATED:
+            text, color = "Report checked — saving…", "#6B7280"
+        elif stage == submit_pipeline.PERSISTED:
+            text, color = f"Incident {info['incident_id']} reported — finding responders…", "#1F2937"
+        elif stage == submit_pipeline.OFFLINE:
+            text = (f"Database unavailable — your report is saved on this computer "
+                    f"and will be sent automatically (retrying in {info['retry_in']}s).")
+            color = "#f39c12"
+        elif stage == submit_pipeline.PROCESSED:
+            responders = info["suggested_responders"] or info["recommended_responders"]
+            text = f"Incident {info['incident_id']} reported successfully!"
+            if info.get("cluster_id"):
+                text += f" Linked to matching report {info['cluster_id']}."
+            if responders:
+                text += f" Recommended responders: {', '.join(responders)}"
+            color = "#27ae60"
+            if info.get("missing_attachments"):
+                text += f" Could not attach (file no longer found): {', '.join(info['missing_attachments'])}"
+                color = "#f39c12"
+        else:
+            text, color = f"Report could not be submitted: {info.get('error', '')}", "#e74c3c"
+            print(f"Submit incident error: {info.get('error')}")  # For debugging
+
+        self.receipt_label.setStyleSheet(f"color: {color}; padding: 6px 0;")
+        self.receipt_label.setText(text)
+        self.receipt_label.show()
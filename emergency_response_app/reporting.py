@@ -0,0 +1,140 @@
+# reporting.py
+import csv
+import json
+from datetime import datetime, timedelta, timezone
+
+GRANULARITIES = ("hour", "day", "week", "month", "year")
+
+# The shared incidents table (storage.schema): local ISO timestamps
+INCIDENT_SCHEMA = {
+    "table": "incidents", "ts_column": "created_at",
+    "category_column": "incident_category", "status_column": "status",
+    "ts_separator": "T", "utc": False,
+}
+
+# Prefix of the (local) timestamp text that identifies each bucket
+_PREFIX = {"hour": 13, "day": 10, "month": 7, "year": 4}
+_PARSE = {"hour": "%Y-%m-%d %H", "day": "%Y-%m-%d", "week": "%Y-%m-%d",
+          "month": "%Y-%m", "year": "%Y"}
+
+FIELDS = ("period", "category", "status", "count")
+
+
+class ReportEngine:
+    """
+    Incident counts over an arbitrary [start, end) range, bucketed by
+    hour/day/week/month/year and split by category and status.
+
+    Everything comes from one grouped query whose WHERE clause is a plain
+    range on the timestamp column (no function wrapped around it), so
+    SQLite answers it from the timestamp index instead of scanning the
+    table. Both front ends use it: the CLI report (app_17) and the
+    AdminAnalytics trend chart.
+    """
+
+    def __init__(self, table, ts_column, category_column, status_column,
+                 ts_separator="T", utc=False):
+        self.table = table
+        self.ts_column = ts_column
+        self.category_column = category_column
+        self.status_column = status_column
+        self.ts_separator = ts_separator
+        self.utc = utc
+
+    # -----------------------
+    # QUERY
+    # -----------------------
+    def run(self, conn, start=None, end=None, granularity="day"):
+        """
+        [{"period", "category", "status", "count"}] for start <= ts < end
+        (either bound may be None), ordered by period. Periods are local
+        time: "YYYY-MM-DD HH", "YYYY-MM-DD" (weeks: their Monday),
+        "YYYY-MM" or "YYYY".
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+
+        where, params = [], []
+        if start is not None:
+            where.append(f"{self.ts_column} >= ?")
+            params.append(self._bound(start))
+        if end is not None:
+            where.append(f"{self.ts_column} < ?")
+            params.append(self._bound(end))
+
+        sql = f"""
+            SELECT {self._period_sql(granularity)} AS period,
+                   COALESCE({self.category_column}, 'unknown') AS category,
+                   {self.status_column} AS status,
+                   COUNT(*) AS count
+            FROM {self.table}
+            {"WHERE " + " AND ".join(where) if where else ""}
+            GROUP BY period, category, status
+            ORDER BY period
+        """
+        return [dict(zip(FIELDS, row)) for row in conn.execute(sql, params)]
+
+    # -----------------------
+    # SHAPING
+    # -----------------------
+    @staticmethod
+    def totals(rows, key):
+        """Sum counts by one field ("period", "category" or "status")."""
+        out = {}
+        for row in rows:
+            out[row[key]] = out.get(row[key], 0) + row["count"]
+        return out
+
+    @staticmethod
+    def series(rows, granularity="day"):
+        """[(datetime, count)] per non-empty period, ascending (for charts)."""
+        return [(datetime.strptime(period, _PARSE[granularity]), count)
+                for period, count in sorted(ReportEngine.totals(rows, "period").items())
+                if period]
+
+    # -----------------------
+    # EXPORT
+    # -----------------------
+    @staticmethod
+    def to_csv(rows, fileobj):
+        writer = csv.DictWriter(fileobj, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    @staticmethod
+    def to_json(rows, fileobj, **meta):
+        json.dump({**meta, "rows": rows}, fileobj, indent=2, default=str)
+
+    def export(self, rows, path, **meta):
+        """Write rows to path as CSV or JSON, chosen by the file extension."""
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            if path.lower().endswith(".json"):
+                self.to_json(rows, f, **meta)
+            else:
+                self.to_csv(rows, f)
+
+    # -----------------------
+    # INTERNAL
+    # -----------------------
+    def _bound(self, value):
+        """Render a date/datetime the way the column stores it, so text comparison is exact."""
+        if not isinstance(value, datetime):
+            value = datetime(value.year, value.month, value.day)
+        if self.utc:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.isoformat(sep=self.ts_separator)
+
+    def _period_sql(self, granularity):
+        column = f"datetime({self.ts_column}, 'localtime')" if self.utc else self.ts_column
+        if granularity == "week":
+            return f"date({column}, '-6 days', 'weekday 1')"
+        if granularity == "hour":
+            # normalise the date/time separator so periods look the same for both schemas
+            return f"replace(substr({column}, 1, 13), 'T', ' ')"
+        return f"substr({column}, 1, {_PREFIX[granularity]})"
+
+
+def day_range(day, days=1):
+    """(start, end) datetimes covering `days` whole days from `day`."""
+    start = datetime(day.year, day.month, day.day)
+    return start, start + timedelta(days=days)
@@ -91,7 +91,7 @@ class ResponderAssignmentsPage(QWidget):
         if self.user.active_incidents == 0:
             self.user.status = "available"
 
-        self.db.update_incident(incident)
+        self.db.update_incident(incident, actor=self.user)
         self.db.update_user(self.user)
 
         self.load_data()
@@ -4,24 +4,36 @@ from PyQt5.QtWidgets import (
     QHeaderView, QPushButton, QMessageBox
 )
 from PyQt5.QtGui import QFont, QColor
-from PyQt5.QtCore import QTimer
 from datetime import datetime
 import styles
+from incident_feed import IncidentFeed
+from notifications import normalize_category
 
 
 class ResponderAvailablePage(QWidget):
-    """Pending incidents that match this responder's category."""
+    """
+    Pending incidents that match this responder's category.
+
+    The list is loaded once; after that incident events pushed by the
+    database (see incident_feed.IncidentFeed) update it in place, so a new
+    incident shows up as soon as it is written and nothing is queried
+    while nothing changes. On a local database the feed also reports
+    writes from other processes (`stale`), and the list is reloaded.
+    """
 
     def __init__(self, user, db):
         super().__init__()
         self.user = user
         self.db = db
+        self._pending = {}      # incident_id -> Incident (pending, primary, matching category)
+        self._link_of = {}      # incident_id -> cluster_id, for duplicates linked to a primary
         self.init_ui()
-        self.load_data()
 
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.load_data)
-        self.timer.start(5000)
+        self.feed = IncidentFeed(db, self)
+        self.feed.event.connect(self._on_incident_event)
+        self.feed.stale.connect(self.load_data)
+        self.load_data()
+        self.feed.start()
 
     def init_ui(self):
         layout = QVBoxLayout()
@@ -51,22 +63,47 @@ class ResponderAvailablePage(QWidget):
     def _category_matches(self, incident_cat: str) -> bool:
             if not self.user.responder_category:
                 return True  # no specialization -> see all
-            user_cat = self.user.responder_category.lower().strip().replace(" ", "_")
-            inc_cat = (incident_cat or "").lower().strip().replace(" ", "_")
-            return user_cat == inc_cat
+            return normalize_category(self.user.responder_category) == normalize_category(incident_cat)
+
+    def _is_available(self, inc) -> bool:
+        return (inc.status == "pending" and not inc.cluster_id
+                and self._category_matches(inc.incident_category))
 
     def load_data(self):
+        """Full reload; used on first show and when the page is resumed for a user."""
+        self.feed.set_category(self.user.responder_category)
         all_incidents = self.db.get_all_incidents()
-        pending = [
-            inc
-            for inc in all_incidents
-            if inc.status == "pending" and self._category_matches(inc.incident_category)
-        ]
+        # Duplicate reports are handled together with their primary incident
+        self._link_of = {inc.id: inc.cluster_id for inc in all_incidents if inc.cluster_id}
+        self._pending = {inc.id: inc for inc in all_incidents if self._is_available(inc)}
+        self._render()
+
+    def _on_incident_event(self, message):
+        inc = message["incident"]
+        if inc.cluster_id:
+            self._link_of[inc.id] = inc.cluster_id
+        else:
+            self._link_of.pop(inc.id, None)
+        if self._is_available(inc):
+            self._pending[inc.id] = inc
+        else:
+            self._pending.pop(inc.id, None)
+        self._render()
+
+    def _render(self):
+        linked = {}
+        for cluster_id in self._link_of.values():
+            linked[cluster_id] = linked.get(cluster_id, 0) + 1
+        # Newest first, as get_all_incidents returns them
+        pending = sorted(self._pending.values(), key=lambda inc: str(inc.created_at), reverse=True)
 
         self.table.setRowCount(len(pending))
         for row, inc in enumerate(pending):
             self.table.setItem(row, 0, QTableWidgetItem(inc.id))
-            self.table.setItem(row, 1, QTableWidgetItem(inc.type))
+            type_text = inc.type
+            if linked.get(inc.id):
+                type_text += f"  (+{linked[inc.id]} linked)"
+            self.table.setItem(row, 1, QTableWidgetItem(type_text))
             self.table.setItem(row, 2, QTableWidgetItem(inc.incident_category or "General"))
             self.table.setItem(row, 3, QTableWidgetItem(inc.location))
 
@@ -102,8 +139,10 @@ class ResponderAvailablePage(QWidget):
         if self.user.active_incidents > 0:
             self.user.status = "busy"
 
-        self.db.update_incident(incident)
+        self.db.update_incident(incident, actor=self.user)
         self.db.update_user(self.user)
 
-        self.load_data()
+        # The update event removes it too; drop it now in case events are stopped
+        self._pending.pop(incident.id, None)
+        self._render()
         QMessageBox.information(self, "Success", f"Incident {incident.id} accepted.")
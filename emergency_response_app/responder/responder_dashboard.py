@@ -202,7 +202,7 @@ class ResponderDashboard(QWidget):
         if self.user.active_incidents > 0:
             self.user.status = 'busy'
         
-        self.db.update_incident(incident)
+        self.db.update_incident(incident, actor=self.user)
         self.db.update_user(self.user)
         
         self.load_data()
@@ -216,7 +216,7 @@ class ResponderDashboard(QWidget):
         if self.user.active_incidents == 0:
             self.user.status = 'available'
         
-        self.db.update_incident(incident)
+        self.db.update_incident(incident, actor=self.user)
         self.db.update_user(self.user)
         
         self.load_data()
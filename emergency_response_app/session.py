@@ -0,0 +1,126 @@
+# session.py
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+
+# Client-side state lives next to the submission journal (see journal.py)
+SESSION_DIR = os.path.join(os.path.expanduser("~"), ".emergency_response")
+SESSION_PATH = os.path.join(SESSION_DIR, "session.json")
+KEY_PATH = os.path.join(SESSION_DIR, "session.key")
+
+SESSION_TTL_S = 12 * 3600       # one shift
+
+
+def _b64(raw):
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _unb64(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+class SessionManager:
+    """
+    Signed, expiring login sessions stored on this machine.
+
+    A token is  <payload>.<signature>, where payload is base64 JSON
+    {"uid", "role", "pwd", "exp"} and the signature is HMAC-SHA256 with a
+    random per-machine key (session.key, readable by the owner only).
+    "pwd" is a keyed fingerprint of the stored password hash, so changing
+    the password invalidates every outstanding token. A role change does
+    the same through "role".
+
+    issue() is called after a successful password check. resume() lets the
+    app skip the login screen (and the deliberately slow hashing) after a
+    restart. revoke() on logout deletes the token.
+    """
+
+    def __init__(self, db, path=SESSION_PATH, key_path=KEY_PATH, ttl=SESSION_TTL_S):
+        self.db = db
+        self.path = path
+        self.key_path = key_path
+        self.ttl = ttl
+        self._key = None
+
+    # -----------------------
+    # PUBLIC
+    # -----------------------
+    def issue(self, user):
+        """Create and store a token for `user`; returns the token."""
+        payload = {
+            "uid": user.id,
+            "role": user.role,
+            "pwd": self._fingerprint(user.password),
+            "exp": int(time.time()) + self.ttl,
+        }
+        body = _b64(json.dumps(payload, separators=(",", ":")).encode())
+        token = f"{body}.{self._sign(body)}"
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"token": token}, f)
+        return token
+
+    def resume(self):
+        """The User of the stored session if it is still valid, else None."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                token = json.load(f)["token"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        user = self.validate(token)
+        if user is None:
+            self.revoke()
+        return user
+
+    def validate(self, token):
+        """Check signature, expiry and that the account is unchanged."""
+        try:
+            body, signature = token.split(".")
+            if not hmac.compare_digest(signature, self._sign(body)):
+                return None
+            payload = json.loads(_unb64(body))
+        except (ValueError, AttributeError):
+            return None
+        if payload.get("exp", 0) < time.time():
+            return None
+
+        user = self.db.get_user_by_id(payload.get("uid"))
+        if user is None or user.role != payload.get("role"):
+            return None
+        if not hmac.compare_digest(payload.get("pwd", ""), self._fingerprint(user.password)):
+            return None
+        return user
+
+    def revoke(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    # -----------------------
+    # INTERNAL
+    # -----------------------
+    def _sign(self, body):
+        return _b64(hmac.new(self._load_key(), body.encode(), hashlib.sha256).digest())
+
+    def _fingerprint(self, stored_hash):
+        return _b64(hmac.new(self._load_key(), (stored_hash or "").encode(),
+                             hashlib.sha256).digest()[:12])
+
+    def _load_key(self):
+        if self._key is None:
+            try:
+                with open(self.key_path, "rb") as f:
+                    self._key = f.read()
+            except FileNotFoundError:
+                self._key = b""
+            if len(self._key) < 32:
+                os.makedirs(os.path.dirname(self.key_path), exist_ok=True)
+                self._key = os.urandom(32)
+                fd = os.open(self.key_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                with os.fdopen(fd, "wb") as f:
+                    f.write(self._key)
+        return self._key
@@ -0,0 +1,134 @@
+# sla_monitor.py
+import heapq
+from datetime import datetime, timedelta
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+import clustering
+from incident_data import get_sla_minutes
+
+MAX_TIMER_MS = 2 ** 31 - 1
+
+
+class SlaMonitor(QObject):
+    """
+    Watches every open incident against its priority's resolution SLA
+    (incident_data.incident_priority.SLA_MINUTES).
+
+    Deadlines sit in a min-heap, and a single-shot timer is armed for the
+    earliest one, so nothing is polled or rescanned: tracking a change
+    or handling a breach costs O(log n). Outdated heap entries are
+    skipped lazily when they reach the top.
+
+    The monitor hears about incident changes through
+    Database.add_change_listener. Those callbacks can arrive on worker
+    threads (the submit pipeline, for example), so they are forwarded to
+    the GUI thread through a queued signal first.
+
+    A breach is written once to the `sla_breaches` table and announced
+    via `breached(incident_id, info)`. It is marked resolved when the
+    incident is solved.
+    """
+
+    breached = pyqtSignal(str, object)      # (incident_id, {"priority", "deadline", ...})
+    _db_changed = pyqtSignal(str, object)   # (kind, key) from Database, any thread
+
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self._heap = []             # (deadline, incident_id)
+        self._deadlines = {}        # incident_id -> current deadline (heap entries must match)
+        self._incidents = {}        # incident_id -> latest Incident snapshot
+        self._overdue = set()       # open incidents past their deadline
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._fire_due)
+
+        self._db_changed.connect(self._on_db_changed)
+        db.add_change_listener(lambda kind, key: self._db_changed.emit(kind, key))
+
+    # -----------------------
+    # PUBLIC
+    # -----------------------
+    def start(self):
+        """Load every open incident once; after that only changes are tracked."""
+        for incident in self.db.get_open_incidents():
+            self.track(incident)
+        # Breaches left open by incidents solved while the app was closed
+        for breach in self.db.get_sla_breaches(open_only=True):
+            if breach["incident_id"] not in self._deadlines:
+                self.db.resolve_sla_breach(breach["incident_id"])
+        self._fire_due()
+
+    def track(self, incident):
+        """Start, update or stop watching one incident."""
+        if incident.status not in clustering.OPEN_STATUSES:
+            self.untrack(incident.id)
+            return
+        deadline = self.deadline_for(incident)
+        self._incidents[incident.id] = incident
+        if self._deadlines.get(incident.id) != deadline:
+            self._deadlines[incident.id] = deadline
+            heapq.heappush(self._heap, (deadline, incident.id))
+            self._arm()
+
+    def untrack(self, incident_id):
+        if self._deadlines.pop(incident_id, None) is None:
+            return
+        self._incidents.pop(incident_id, None)
+        if incident_id in self._overdue:
+            self._overdue.discard(incident_id)
+            self.db.resolve_sla_breach(incident_id)
+        # the heap entry is dropped lazily
+
+    def overdue(self):
+        """Open incidents currently past their SLA, most overdue first."""
+        return sorted(self._overdue, key=self._deadlines.__getitem__)
+
+    @staticmethod
+    def deadline_for(incident):
+        created = incident.created_at or datetime.now()
+        return created + timedelta(minutes=get_sla_minutes(incident.priority))
+
+    # -----------------------
+    # INTERNAL
+    # -----------------------
+    def _on_db_changed(self, kind, key):
+        if kind == "incident":
+            incident = self.db.get_incident_by_id(key)
+            if incident is None:
+                self.untrack(key)
+            else:
+                self.track(incident)
+        elif kind == "cluster":
+            for incident in self.db.get_linked_incidents(key):
+                self.track(incident)
+
+    def _arm(self):
+        """Point the timer at the earliest live deadline."""
+        while self._heap and self._deadlines.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            self.timer.stop()
+            return
+        delay = (self._heap[0][0] - datetime.now()).total_seconds() * 1000
+        self.timer.start(int(min(max(delay, 0), MAX_TIMER_MS)))
+
+    def _fire_due(self):
+        now = datetime.now()
+        while self._heap and self._heap[0][0] <= now:
+            deadline, incident_id = heapq.heappop(self._heap)
+            if self._deadlines.get(incident_id) != deadline or incident_id in self._overdue:
+                continue
+            self._overdue.add(incident_id)
+            incident = self._incidents[incident_id]
+            if self.db.record_sla_breach(incident_id, incident.priority, deadline):
+                self.breached.emit(incident_id, {
+                    "priority": incident.priority,
+                    "deadline": deadline,
+                    "status": incident.status,
+                    "responder_id": incident.responder_id,
+                    "location": incident.location,
+                })
+        self._arm()
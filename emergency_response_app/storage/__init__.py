@@ -0,0 +1,21 @@
+# storage/__init__.py
+"""
+Shared storage for every front end (the PyQt app, the app_17 console and
+the older App/ client): one users/incidents schema, migrations from each
+front end's old layout, and repositories over it.
+
+    store = Storage("emergency_response.db")
+    incident = store.incidents.create("fire", "Main St", "Kitchen fire", "High")
+    store.incidents.set_status(incident["incident_number"], "solved")
+
+Deliberately free of PyQt and of the GUI's own modules (bar passwords,
+which is standard library only), so app_17.py and App/ can import it by
+adding emergency_response_app/ to sys.path.
+"""
+from .schema import (
+    SCHEMA_VERSION, OPEN_STATUSES, CLOSED_STATUS, PRIORITY_CODES,
+    CLI_REPORTER_ID, CLI_REPORTER_NAME, detect_layout, migrate, priority_code,
+)
+from .repository import (
+    DEFAULT_DB, INCIDENT_FIELDS, USER_FIELDS, Storage, IncidentRepository, UserRepository,
+)
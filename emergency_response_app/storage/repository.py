@@ -0,0 +1,239 @@
+# storage/repository.py
+import json
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+
+from .schema import (
+    INCIDENT_COLUMNS, USER_COLUMNS, OPEN_STATUSES, CLOSED_STATUS,
+    CLI_REPORTER_ID, CLI_REPORTER_NAME, migrate, priority_code,
+)
+
+DEFAULT_DB = "emergency_response.db"
+
+INCIDENT_FIELDS = tuple(col for col, _ in INCIDENT_COLUMNS)
+USER_FIELDS = tuple(col for col, _ in USER_COLUMNS)
+_JSON_FIELDS = {"specific_questions": dict, "assigned_responders": list, "attachments": list}
+
+# Prefix of generated user ids, by role (matches the GUI's seeded accounts)
+ROLE_PREFIXES = {"admin": "admin", "responder": "resp", "reporter": "rept"}
+
+
+class Storage:
+    """
+    Entry point to the shared database: migrates it on open and exposes
+    the incident and user repositories.
+
+    `connect` is a zero-argument callable returning a context manager that
+    yields a sqlite3 connection and commits (or rolls back) on exit. By
+    default every call opens and closes its own connection, like the GUI's
+    Database; app_17 passes a scope over its single locked connection so
+    repository calls join its transactions.
+    """
+
+    def __init__(self, path=DEFAULT_DB, connect=None):
+        self.path = path
+        self._connect = connect or self._connection
+        with self.connect() as conn:
+            migrate(conn)
+        self.incidents = IncidentRepository(self)
+        self.users = UserRepository(self)
+
+    def connect(self):
+        return self._connect()
+
+    @contextmanager
+    def _connection(self):
+        conn = sqlite3.connect(self.path)
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+
+class _Repository:
+    table = None
+    fields = ()
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    def _row(self, row):
+        return dict(zip(self.fields, row)) if row else None
+
+    def _select(self, where="", params=(), suffix=""):
+        sql = f"SELECT {', '.join(self.fields)} FROM {self.table}"
+        if where:
+            sql += f" WHERE {where}"
+        with self.storage.connect() as conn:
+            return [self._row(r) for r in conn.execute(f"{sql} {suffix}", params)]
+
+    @staticmethod
+    def _next_id(conn, table, prefix):
+        """prefix + one more than the highest numeric suffix already used (zero-padded to 3)."""
+        row = conn.execute(
+            f"SELECT MAX(CAST(substr(id, ?) AS INTEGER)) FROM {table} WHERE id LIKE ? || '%'",
+            (len(prefix) + 1, prefix)
+        ).fetchone()
+        return f"{prefix}{(row[0] or 0) + 1:03d}"
+
+
+class IncidentRepository(_Repository):
+    """
+    Incidents as dicts keyed by canonical column name (JSON columns decoded).
+    `key` arguments accept the text id ("INC-012") or the integer
+    incident_number the CLI shows.
+    """
+    table = "incidents"
+    fields = INCIDENT_FIELDS
+
+    def _row(self, row):
+        incident = super()._row(row)
+        if incident:
+            for field, empty in _JSON_FIELDS.items():
+                incident[field] = json.loads(incident[field]) if incident[field] else empty()
+        return incident
+
+    @staticmethod
+    def _key(key):
+        return ("incident_number", key) if isinstance(key, int) else ("id", key)
+
+    # -----------------------
+    # WRITE
+    # -----------------------
+    def create(self, type, location, description, priority,
+               reporter_id=CLI_REPORTER_ID, reporter_name=CLI_REPORTER_NAME, **fields):
+        """Insert an incident and return it (with its generated id and incident_number)."""
+        now = datetime.now().isoformat()
+        values = {
+            "type": type, "incident_category": type, "location": location, "description": description,
+            "priority": priority_code(priority), "status": "pending",
+            "reporter_id": reporter_id, "reporter_name": reporter_name,
+            "created_at": now, "updated_at": now,
+        }
+        values.update(fields)
+        for field in _JSON_FIELDS:
+            if field in values and not isinstance(values[field], str):
+                values[field] = json.dumps(values[field])
+        unknown = set(values) - set(self.fields)
+        if unknown:
+            raise ValueError(f"unknown incident fields: {', '.join(sorted(unknown))}")
+
+        with self.storage.connect() as conn:
+            values.setdefault("id", self._next_id(conn, self.table, "INC-"))
+            columns = list(values)
+            conn.execute(
+                f"INSERT INTO incidents ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                [values[c] for c in columns]
+            )
+            row = conn.execute(
+                f"SELECT {', '.join(self.fields)} FROM incidents WHERE id = ?", (values["id"],)
+            ).fetchone()
+        return self._row(row)
+
+    def set_status(self, key, status):
+        """Returns True when the incident exists."""
+        column, value = self._key(key)
+        with self.storage.connect() as conn:
+            cursor = conn.execute(
+                f"UPDATE incidents SET status = ?, updated_at = ? WHERE {column} = ?",
+                (status, datetime.now().isoformat(), value)
+            )
+            return cursor.rowcount > 0
+
+    def next_id(self):
+        with self.storage.connect() as conn:
+            return self._next_id(conn, self.table, "INC-")
+
+    # -----------------------
+    # READ
+    # -----------------------
+    def get(self, key):
+        column, value = self._key(key)
+        rows = self._select(f"{column} = ?", (value,))
+        return rows[0] if rows else None
+
+    def list(self, statuses=None, category=None, limit=None):
+        """Newest first; statuses is an iterable of status values (None = all)."""
+        where, params = [], []
+        if statuses:
+            statuses = tuple(statuses)
+            where.append(f"status IN ({', '.join('?' * len(statuses))})")
+            params.extend(statuses)
+        if category:
+            where.append("incident_category = ?")
+            params.append(category)
+        suffix = "ORDER BY created_at DESC"
+        if limit:
+            suffix += " LIMIT ?"
+            params.append(limit)
+        return self._select(" AND ".join(where), params, suffix)
+
+    def list_open(self, category=None, limit=None):
+        return self.list(OPEN_STATUSES, category, limit)
+
+    def count_by_status(self):
+        with self.storage.connect() as conn:
+            return dict(conn.execute("SELECT status, COUNT(*) FROM incidents GROUP BY status"))
+
+    def count_by_category(self):
+        with self.storage.connect() as conn:
+            return dict(conn.execute(
+                "SELECT COALESCE(incident_category, type), COUNT(*) FROM incidents GROUP BY 1"
+            ))
+
+    def open_and_closed(self):
+        """(open, closed) incident counts."""
+        counts = self.count_by_status()
+        return sum(counts.get(s, 0) for s in OPEN_STATUSES), counts.get(CLOSED_STATUS, 0)
+
+
+class UserRepository(_Repository):
+    table = "users"
+    fields = USER_FIELDS
+
+    def create(self, username, password, role, name=None, prefix=None, **fields):
+        """
+        Insert a user and return it. `password` is stored as given (callers
+        pass passwords.hash_password output). The id is prefix + next number; prefix defaults by role.
+        Raises sqlite3.IntegrityError when the username or email is taken.
+        """
+        values = {"username": username, "password": password, "role": role,
+                  "name": name or username}
+        values.update(fields)
+        prefix = prefix or ROLE_PREFIXES.get(role, "user")
+        with self.storage.connect() as conn:
+            values.setdefault("id", self._next_id(conn, self.table, prefix))
+            columns = list(values)
+            conn.execute(
+                f"INSERT INTO users ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                [values[c] for c in columns]
+            )
+        return self.get(values["id"])
+
+    def set_password(self, user_id, encoded):
+        """Store a new password hash; returns True when the user exists."""
+        with self.storage.connect() as conn:
+            cursor = conn.execute("UPDATE users SET password = ? WHERE id = ?", (encoded, user_id))
+            return cursor.rowcount > 0
+
+    def get(self, user_id):
+        rows = self._select("id = ?", (user_id,))
+        return rows[0] if rows else None
+
+    def get_by_username(self, username):
+        rows = self._select("username = ?", (username,))
+        return rows[0] if rows else None
+
+    def list(self, role=None):
+        if role:
+            return self._select("role = ?", (role,), "ORDER BY username")
+        return self._select(suffix="ORDER BY username")
+
+    def count(self):
+        with self.storage.connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
@@ -0,0 +1,273 @@
+# storage/schema.py
+"""
+The one users/incidents schema, and migrations into it from the three
+layouts that used to share emergency_response.db:
+
+  "gui"     emergency_response_app/database.py   id TEXT, type, priority ...
+  "legacy"  App/database.py                      same, but `severity` instead of `priority`
+  "cli"     app_17.py                            id INTEGER, incident_number, emergency_type, timestamp
+
+The canonical incidents table is the GUI layout (its readers index rows by
+position, so its column order is kept) plus three columns the CLI needs:
+incident_number (the integer key the CLI and its child tables use),
+specific_incident and source. PRAGMA user_version records the schema
+version, so migrate() is a no-op after the first run.
+
+Version 2 stores every password as a passwords.hash_password hash: the
+CLI used to keep them in plain text, so migrate() hashes any value that
+is not in a format passwords.verify_password understands.
+"""
+import sqlite3
+
+import passwords
+
+SCHEMA_VERSION = 2
+
+OPEN_STATUSES = ("pending", "assigned", "ongoing")
+CLOSED_STATUS = "solved"
+
+# CLI priority labels -> the P-codes everything else uses
+PRIORITY_CODES = {"critical": "P1", "high": "P2", "medium": "P3", "low": "P4"}
+
+# Reporter recorded for incidents logged from the console
+CLI_REPORTER_ID = "cli"
+CLI_REPORTER_NAME = "Console operator"
+
+USER_COLUMNS = (
+    ("id", "TEXT PRIMARY KEY"),
+    ("name", "TEXT NOT NULL"),
+    ("username", "TEXT UNIQUE NOT NULL"),
+    ("email", "TEXT UNIQUE"),
+    ("password", "TEXT NOT NULL"),
+    ("role", "TEXT NOT NULL"),
+    ("phone", "TEXT"),
+    ("gender", "TEXT"),
+    ("date_of_birth", "TEXT"),
+    ("responder_category", "TEXT"),
+    ("status", "TEXT DEFAULT 'available'"),
+    ("active_incidents", "INTEGER DEFAULT 0"),
+    ("created_at", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP"),
+    ("updated_at", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP"),
+)
+
+INCIDENT_COLUMNS = (
+    ("id", "TEXT PRIMARY KEY"),
+    ("type", "TEXT NOT NULL"),
+    ("location", "TEXT NOT NULL"),
+    ("description", "TEXT NOT NULL"),
+    ("priority", "TEXT NOT NULL"),
+    ("status", "TEXT DEFAULT 'pending'"),
+    ("reporter_id", "TEXT NOT NULL"),
+    ("reporter_name", "TEXT NOT NULL"),
+    ("responder_id", "TEXT"),
+    ("responder_name", "TEXT"),
+    ("incident_category", "TEXT"),
+    ("specific_questions", "TEXT"),
+    ("emergency_feedback", "TEXT"),
+    ("assigned_responders", "TEXT"),
+    ("attachments", "TEXT"),
+    ("created_at", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP"),
+    ("updated_at", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP"),
+    ("latitude", "REAL"),
+    ("longitude", "REAL"),
+    ("geo_cell", "TEXT"),
+    ("cluster_id", "TEXT"),
+    ("time_bucket", "INTEGER"),
+    ("client_uuid", "TEXT"),
+    ("incident_number", "INTEGER"),
+    ("specific_incident", "TEXT"),
+    ("source", "TEXT"),
+)
+
+INCIDENT_FOREIGN_KEYS = (
+    "FOREIGN KEY (reporter_id) REFERENCES users (id)",
+    "FOREIGN KEY (responder_id) REFERENCES users (id)",
+)
+
+INCIDENT_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_incidents_geo_cell ON incidents (geo_cell)",
+    "CREATE INDEX IF NOT EXISTS idx_incidents_category_bucket ON incidents (incident_category, time_bucket)",
+    "CREATE INDEX IF NOT EXISTS idx_incidents_cluster ON incidents (cluster_id)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_incidents_client_uuid ON incidents (client_uuid) "
+    "WHERE client_uuid IS NOT NULL",
+    "CREATE INDEX IF NOT EXISTS idx_incidents_reporter_created ON incidents (reporter_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_incidents_responder_created ON incidents (responder_id, created_at)",
+    # Date-range reports (reporting.ReportEngine): range on created_at,
+    # category/status covered so the grouped query never touches the table
+    "CREATE INDEX IF NOT EXISTS idx_incidents_created_category_status "
+    "ON incidents (created_at, incident_category, status)",
+    "CREATE INDEX IF NOT EXISTS idx_incidents_status_created ON incidents (status, created_at)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_incidents_number ON incidents (incident_number)",
+)
+
+# Every incident gets the next integer number, whichever front end inserted it
+INCIDENT_NUMBER_TRIGGER = """
+    CREATE TRIGGER IF NOT EXISTS trg_incidents_number
+    AFTER INSERT ON incidents
+    WHEN NEW.incident_number IS NULL
+    BEGIN
+        UPDATE incidents
+        SET incident_number = (SELECT COALESCE(MAX(incident_number), 0) + 1 FROM incidents)
+        WHERE rowid = NEW.rowid;
+    END
+"""
+
+_PRIORITY_SQL = ("CASE lower({col}) "
+                 + " ".join(f"WHEN '{label}' THEN '{code}'" for label, code in PRIORITY_CODES.items())
+                 + " ELSE {col} END")
+
+# canonical column -> expression over the old table, per source layout
+# (columns not listed are copied by name when the old table has them, else NULL)
+_INCIDENT_MAPPINGS = {
+    "gui": {},
+    "legacy": {"priority": "severity"},
+    "cli": {
+        "id": "'INC-' || printf('%03d', id)",
+        "incident_number": "id",        # CLI child tables reference the old integer id
+        "type": "emergency_type",
+        "incident_category": "emergency_type",
+        "description": "specific_incident",
+        "priority": _PRIORITY_SQL.format(col="priority"),
+        "status": f"CASE status WHEN 'resolved' THEN '{CLOSED_STATUS}' ELSE 'pending' END",
+        "reporter_id": f"'{CLI_REPORTER_ID}'",
+        "reporter_name": f"'{CLI_REPORTER_NAME}'",
+        # CURRENT_TIMESTAMP (UTC) -> local ISO, like every other writer
+        "created_at": "strftime('%Y-%m-%dT%H:%M:%S', timestamp, 'localtime')",
+        "updated_at": "strftime('%Y-%m-%dT%H:%M:%S', timestamp, 'localtime')",
+        "source": "'cli'",
+    },
+}
+_USER_MAPPINGS = {
+    "gui": {},
+    "cli": {
+        "id": "'cli' || printf('%03d', id)",
+        "name": "username",
+        "status": "'available'",
+        "active_incidents": "0",
+        "updated_at": "created_at",
+    },
+}
+
+
+def priority_code(value):
+    """P-code for a CLI label ("High" -> "P2"); P-codes and unknown values pass through."""
+    return PRIORITY_CODES.get((value or "").lower(), value)
+
+
+def _table_ddl(name, columns, constraints=()):
+    body = ",\n    ".join([f"{col} {decl}" for col, decl in columns] + list(constraints))
+    return f"CREATE TABLE {name} (\n    {body}\n)"
+
+
+def _columns(conn, table):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def detect_layout(conn):
+    """(users_layout, incidents_layout): "gui", "legacy", "cli", or None when the table is missing."""
+    users = _columns(conn, "users")
+    incidents = _columns(conn, "incidents")
+    if not incidents:
+        incident_layout = None
+    elif "emergency_type" in incidents:
+        incident_layout = "cli"
+    elif "severity" in incidents:
+        incident_layout = "legacy"
+    else:
+        incident_layout = "gui"
+    if not users:
+        user_layout = None
+    elif "email" not in users:
+        user_layout = "cli"
+    else:
+        user_layout = "gui"
+    return user_layout, incident_layout
+
+
+def migrate(conn):
+    """
+    Bring the users/incidents tables on `conn` to SCHEMA_VERSION, in one
+    transaction. Safe to call on every start-up.
+    """
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+        return False
+
+    user_layout, incident_layout = detect_layout(conn)
+    in_tx = conn.in_transaction
+    if not in_tx:
+        conn.execute("BEGIN IMMEDIATE")
+    try:
+        _migrate_users(conn, user_layout)
+        _hash_plaintext_passwords(conn)
+        _migrate_incidents(conn, incident_layout)
+        for statement in INCIDENT_INDEXES:
+            conn.execute(statement)
+        conn.execute(INCIDENT_NUMBER_TRIGGER)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        if not in_tx:
+            conn.commit()
+    except sqlite3.Error:
+        if not in_tx:
+            conn.rollback()
+        raise
+    return True
+
+
+def _migrate_users(conn, layout):
+    if layout is None:
+        conn.execute(_table_ddl("users", USER_COLUMNS))
+        return
+    info = {row[1]: row for row in conn.execute("PRAGMA table_info(users)")}
+    # GUI databases declared email NOT NULL; CLI-created accounts have none
+    if layout == "gui" and not info["email"][3]:
+        _add_missing_columns(conn, "users", USER_COLUMNS, info)
+        return
+    _rebuild(conn, "users", USER_COLUMNS, (), _USER_MAPPINGS[layout])
+
+
+def _hash_plaintext_passwords(conn):
+    rows = conn.execute("SELECT id, password FROM users").fetchall()
+    conn.executemany("UPDATE users SET password = ? WHERE id = ?", [
+        (passwords.hash_password(password), user_id)
+        for user_id, password in rows if password and not passwords.is_hashed(password)
+    ])
+
+
+def _migrate_incidents(conn, layout):
+    if layout is None:
+        conn.execute(_table_ddl("incidents", INCIDENT_COLUMNS, INCIDENT_FOREIGN_KEYS))
+        return
+    existing = _columns(conn, "incidents")
+    canonical = [col for col, _ in INCIDENT_COLUMNS]
+    # GUI tables that grew by ALTER in canonical order only need the new columns;
+    # anything else is rebuilt so positional readers see the canonical order
+    if layout == "gui" and canonical[:len(existing)] == existing:
+        _add_missing_columns(conn, "incidents", INCIDENT_COLUMNS, existing)
+    else:
+        _rebuild(conn, "incidents", INCIDENT_COLUMNS, INCIDENT_FOREIGN_KEYS,
+                 _INCIDENT_MAPPINGS[layout])
+
+    # Number pre-existing incidents in creation order
+    base = conn.execute("SELECT COALESCE(MAX(incident_number), 0) FROM incidents").fetchone()[0]
+    rows = conn.execute(
+        "SELECT rowid FROM incidents WHERE incident_number IS NULL ORDER BY created_at, id"
+    ).fetchall()
+    conn.executemany("UPDATE incidents SET incident_number = ? WHERE rowid = ?",
+                     [(base + n, rowid) for n, (rowid,) in enumerate(rows, 1)])
+
+
+def _add_missing_columns(conn, table, columns, existing):
+    for col, decl in columns:
+        if col not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {col} {decl}")
+
+
+def _rebuild(conn, table, columns, constraints, mapping):
+    existing = set(_columns(conn, table))
+    conn.execute(_table_ddl(f"{table}__new", columns, constraints))
+    names = [col for col, _ in columns]
+    exprs = [mapping.get(col, col if col in existing else "NULL") for col in names]
+    conn.execute(f"INSERT INTO {table}__new ({', '.join(names)}) "
+                 f"SELECT {', '.join(exprs)} FROM {table}")
+    conn.execute(f"DROP TABLE {table}")
+    conn.execute(f"ALTER TABLE {table}__new RENAME TO {table}")
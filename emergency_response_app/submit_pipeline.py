@@ -0,0 +1,224 @@
+# submit_pipeline.py
+import sqlite3
+import uuid
+from datetime import datetime
+
+from PyQt5.QtCore import QObject, QThreadPool, QTimer, pyqtSignal
+
+from attachment_store import get_store
+from models import Incident
+from workers import Worker
+from journal import get_journal
+from incident_data.taxonomy import ALL_INCIDENT_TYPES
+from incident_data import (
+    get_incident_category,
+    get_incident_priority,
+    get_feedback_for_incident,
+    get_responders_for_incident,
+)
+
+# Receipt stages, in the order a report moves through them
+ACCEPTED = "accepted"      # written to the outbox; safe to reset the form
+VALIDATED = "validated"
+PERSISTED = "persisted"    # incident row exists; info carries incident_id
+PROCESSED = "processed"    # clustering / dispatch suggestions / attachments done
+OFFLINE = "offline"        # database unreachable; still journalled, will retry
+FAILED = "failed"
+
+
+class SubmissionError(ValueError):
+    """An accepted report that cannot be turned into an incident."""
+
+
+class SubmitPipeline(QObject):
+    """
+    Accepts reporter submissions instantly and does the real work later.
+
+    submit() only appends the payload to the local journal (journal.py)
+    and returns a local id. A sync pass on a single background thread then
+    moves journalled reports into the database `outbox` table in one
+    batch, and works through the outbox: validation, the incident insert
+    and the post-processing (priority, clustering, dispatch suggestions,
+    attachment linking). Every stage is announced through
+    `receipt(local_id, stage, info)`.
+
+    Payload attachments are ["<sha256>", "<name>"] pairs already in the
+    attachment store, plus "attachment_files": ["<path>", "<name>"] pairs
+    for files that were still being copied at submit time; those are
+    stored here, so they are journalled with the report and survive a
+    restart or an offline spell like the rest of it.
+
+    If the database cannot be reached the reports stay queued (OFFLINE
+    receipt) and the sync is retried with exponential backoff. Replays are
+    idempotent: the outbox is keyed by local id and incidents carry it as
+    client_uuid, so a report is never inserted twice.
+    """
+
+    receipt = pyqtSignal(str, str, object)   # (local_id, stage, info dict)
+
+    RETRY_MIN_MS = 2000
+    RETRY_MAX_MS = 5 * 60 * 1000
+
+    def __init__(self, db, journal=None, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.journal = journal or get_journal()
+        # One thread: keeps incident ids sequential and reports in order
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self._worker = None
+        self._resync = False
+        self._retry_ms = self.RETRY_MIN_MS
+        self.retry_timer = QTimer(self)
+        self.retry_timer.setSingleShot(True)
+        self.retry_timer.timeout.connect(self.sync)
+
+    # -----------------------
+    # PUBLIC
+    # -----------------------
+    def submit(self, payload):
+        """Journal a report, start syncing it and return its local id."""
+        local_id = payload.get("local_id") or uuid.uuid4().hex
+        payload = dict(payload, local_id=local_id)
+        payload.setdefault("created_at", datetime.now().isoformat())
+        self.journal.append(local_id, payload)
+        self.receipt.emit(local_id, ACCEPTED, {})
+        self.sync()
+        return local_id
+
+    def sync(self):
+        """Push journalled reports to the database and process the outbox."""
+        if self._worker is not None:
+            self._resync = True         # pick up new work when this pass ends
+            return
+        self.retry_timer.stop()
+        worker = Worker(self._sync, report_progress=True)
+        worker.signals.progress.connect(
+            lambda local_id, receipt: self.receipt.emit(local_id, receipt[0], receipt[1])
+        )
+        worker.signals.finished.connect(self._on_sync_finished)
+        worker.signals.failed.connect(self._on_sync_failed)
+        self._worker = worker
+        self.pool.start(worker)
+
+    # -----------------------
+    # GUI SIDE
+    # -----------------------
+    def _on_sync_finished(self, offline):
+        self._worker = None
+        if offline:
+            local_ids, error = offline
+            for local_id in local_ids:
+                self.receipt.emit(local_id, OFFLINE, {"error": error, "retry_in": self._retry_ms // 1000})
+            self.retry_timer.start(self._retry_ms)
+            self._retry_ms = min(self._retry_ms * 2, self.RETRY_MAX_MS)
+            return
+        self._retry_ms = self.RETRY_MIN_MS
+        if self._resync:
+            self._resync = False
+            self.sync()
+
+    def _on_sync_failed(self, error):
+        # Unexpected bug rather than an unreachable database; still retry
+        print(f"Submit pipeline error: {error}")  # For debugging
+        self._on_sync_finished(([], error))
+
+    # -----------------------
+    # WORKER SIDE
+    # -----------------------
+    def _sync(self, progress, cancelled):
+        """
+        One sync pass. Returns None when everything went through, or
+        (waiting local ids, error) when the database was unavailable.
+        """
+        journalled = self.journal.pending()
+        try:
+            if journalled:
+                self.db.enqueue_submissions(journalled)
+                self.journal.mark_synced([local_id for local_id, _ in journalled])
+            outbox = self.db.get_unfinished_submissions()
+        except sqlite3.Error as e:
+            return [local_id for local_id, _ in journalled], str(e)
+
+        for n, (local_id, payload, status, incident_id) in enumerate(outbox):
+            try:
+                self._process(local_id, payload, incident_id if status == PERSISTED else None, progress)
+            except SubmissionError as e:
+                progress(local_id, (FAILED, {"error": str(e)}))
+            except sqlite3.Error as e:
+                return [row[0] for row in outbox[n:]], str(e)
+        return None
+
+    def _process(self, local_id, payload, incident_id, progress):
+        if incident_id is None:
+            # Already inserted by a pass that died before updating the outbox
+            incident_id = self.db.get_incident_id_for_client_uuid(local_id)
+
+        if incident_id is None:
+            try:
+                incident = self._validate(payload)
+            except SubmissionError as e:
+                # Bad input will never succeed; park it instead of retrying
+                self.db.mark_submission(local_id, FAILED, error=str(e))
+                raise
+            progress(local_id, (VALIDATED, {}))
+
+            incident.id = self.db.get_next_incident_id()
+            self.db.create_incident(incident, client_uuid=local_id)
+            incident_id = incident.id
+        self.db.mark_submission(local_id, PERSISTED, incident_id=incident_id)
+        progress(local_id, (PERSISTED, {"incident_id": incident_id}))
+
+        incident = self.db.get_incident_by_id(incident_id)
+        attachments = [tuple(ref) for ref in payload.get("attachments", [])]
+        missing = []
+        for path, original_name in payload.get("attachment_files", []):
+            try:
+                meta = get_store(self.db.db_name).ingest(path)
+            except OSError:
+                missing.append(original_name)       # moved or deleted since; nothing to retry
+                continue
+            meta["original_name"] = original_name
+            self.db.save_attachment(meta)
+            attachments.append((meta["sha256"], original_name))
+        for sha256, original_name in attachments:
+            self.db.link_attachment(incident_id, sha256, original_name)
+
+        suggested = [r.name for r, _km in self.db.nearest_available_responders(incident, k=3)]
+        self.db.mark_submission(local_id, "done")
+        progress(local_id, (PROCESSED, {
+            "incident_id": incident_id,
+            "priority": incident.priority,
+            "cluster_id": incident.cluster_id,
+            "recommended_responders": incident.assigned_responders,
+            "suggested_responders": suggested,
+            "missing_attachments": missing,
+        }))
+
+    @staticmethod
+    def _validate(payload):
+        incident_type = payload.get("type")
+        location = (payload.get("location") or "").strip()
+        description = (payload.get("description") or "").strip()
+        if incident_type not in ALL_INCIDENT_TYPES:
+            raise SubmissionError(f"Unknown incident type: {incident_type!r}")
+        if not location or not description:
+            raise SubmissionError("Location and description are required.")
+
+        created_at = datetime.fromisoformat(payload["created_at"])
+        return Incident(
+            id=None,
+            type=incident_type,
+            location=location,
+            description=description,
+            priority=get_incident_priority(incident_type),
+            reporter_id=payload["reporter_id"],
+            reporter_name=payload["reporter_name"],
+            incident_category=get_incident_category(incident_type),
+            specific_questions=payload.get("specific_questions", {}),
+            emergency_feedback=get_feedback_for_incident(incident_type),
+            assigned_responders=get_responders_for_incident(incident_type),
+            attachments=[],
+            created_at=created_at,
+            updated_at=created_at,
+        )
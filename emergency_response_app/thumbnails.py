@@ -0,0 +1,177 @@
+# thumbnails.py
+import hashlib
+import os
+import shutil
+import subprocess
+
+from PyQt5.QtCore import QObject, QThreadPool, QSize, Qt, QRect
+from PyQt5.QtGui import QImage, QImageReader
+
+from workers import Worker
+
+# On-disk thumbnail cache, in the per-user data directory
+THUMB_DIR = os.path.join(os.path.expanduser("~"), ".emergency_response", "thumbnails")
+
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+EVICT_EVERY = 32            # check the cache size after this many new thumbnails
+VIDEO_EXTS = (".mp4", ".avi", ".mov", ".mkv")
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ThumbnailService(QObject):
+    """
+    Decodes and scales images (and grabs the first frame of videos when
+    ffmpeg is available) on a small worker pool, keeping the results in
+    an on-disk LRU cache keyed by content hash, size and fill mode.
+
+    request() never blocks: the callback runs later on the GUI thread
+    with a QImage, or with None if no preview could be made.
+    """
+
+    def __init__(self, cache_dir=THUMB_DIR, max_bytes=MAX_CACHE_BYTES, threads=2):
+        super().__init__()
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(threads)
+        self._workers = set()
+        self._writes = 0
+        self._ffmpeg = shutil.which("ffmpeg")
+
+    # -----------------------
+    # PUBLIC
+    # -----------------------
+    def request(self, source_path, size, callback, sha256=None, fill=False, mime_type=None):
+        """
+        Ask for a `size` x `size` preview of `source_path`.
+        `fill=True` crops to fill the square (avatars); otherwise the
+        image is fitted inside it. Pass `sha256` when the content hash is
+        already known (stored attachments) to skip hashing the file, and
+        `mime_type` when the path has no extension to tell videos apart
+        (store objects are named by hash alone).
+        """
+        worker = Worker(self._thumbnail, source_path, size, sha256, fill, mime_type)
+        self._workers.add(worker)
+
+        def done(image, w=worker):
+            self._workers.discard(w)
+            callback(image)
+
+        def failed(_err, w=worker):
+            self._workers.discard(w)
+            callback(None)
+
+        worker.signals.finished.connect(done)
+        worker.signals.failed.connect(failed)
+        self.pool.start(worker)
+        return worker
+
+    # -----------------------
+    # WORKER SIDE
+    # -----------------------
+    def _cache_path(self, sha256, size, fill):
+        return os.path.join(self.cache_dir, f"{sha256}_{size}{'f' if fill else ''}.png")
+
+    @staticmethod
+    def _is_video(source_path, mime_type):
+        if mime_type:
+            return mime_type.startswith("video/")
+        return os.path.splitext(source_path)[1].lower() in VIDEO_EXTS
+
+    def _thumbnail(self, source_path, size, sha256, fill, mime_type=None):
+        if sha256 is None:
+            sha256 = file_sha256(source_path)
+        cache_path = self._cache_path(sha256, size, fill)
+
+        cached = QImage(cache_path) if os.path.exists(cache_path) else QImage()
+        if not cached.isNull():
+            os.utime(cache_path)        # mark as recently used
+            return cached
+
+        if self._is_video(source_path, mime_type):
+            image = self._video_frame(source_path, size)
+        else:
+            image = self._decode_scaled(source_path, size, fill)
+        if image is None or image.isNull():
+            return None
+
+        if fill:
+            image = self._center_crop(image, size)
+        image.save(cache_path, "PNG")
+        self._writes += 1
+        if self._writes % EVICT_EVERY == 0:
+            self._evict()
+        return image
+
+    def _decode_scaled(self, path, size, fill):
+        reader = QImageReader(path)
+        reader.setAutoTransform(True)
+        full = reader.size()
+        if full.isValid():
+            mode = Qt.KeepAspectRatioByExpanding if fill else Qt.KeepAspectRatio
+            # Lets JPEG decode straight at the reduced size
+            reader.setScaledSize(full.scaled(QSize(size, size), mode))
+        image = reader.read()
+        return None if image.isNull() else image
+
+    def _video_frame(self, path, size):
+        if not self._ffmpeg:
+            return None
+        try:
+            out = subprocess.run(
+                [self._ffmpeg, "-v", "error", "-i", path, "-frames:v", "1",
+                 "-vf", f"scale={size}:{size}:force_original_aspect_ratio=decrease",
+                 "-f", "image2pipe", "-vcodec", "png", "-"],
+                capture_output=True, timeout=10,
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        image = QImage.fromData(out.stdout, "PNG")
+        return None if image.isNull() else image
+
+    @staticmethod
+    def _center_crop(image, size):
+        x = max(0, (image.width() - size) // 2)
+        y = max(0, (image.height() - size) // 2)
+        return image.copy(QRect(x, y, min(size, image.width()), min(size, image.height())))
+
+    def _evict(self):
+        """Delete least recently used thumbnails until under max_bytes."""
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        entries.sort()
+        for _, nbytes, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= nbytes
+            except OSError:
+                pass
+
+
+_service = None
+
+
+def get_thumbnail_service():
+    """Shared service instance (create after the QApplication)."""
+    global _service
+    if _service is None:
+        _service = ThumbnailService()
+    return _service
@@ -0,0 +1,51 @@
+# workers.py
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class WorkerSignals(QObject):
+    """Signals a Worker uses to talk back to the GUI thread."""
+    progress = pyqtSignal(object, object)   # (done, total)
+    finished = pyqtSignal(object)           # return value of fn
+    failed = pyqtSignal(str)                # error message
+
+
+class Worker(QRunnable):
+    """
+    Run a plain Python callable on a QThreadPool.
+
+    If the callable accepts `progress` / `cancelled` keyword arguments,
+    pass report_progress=True and they will be wired to
+    signals.progress.emit and is_cancelled respectively.
+    """
+
+    def __init__(self, fn, *args, report_progress=False, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self._cancelled = False
+        if report_progress:
+            self.kwargs["progress"] = self.signals.progress.emit
+            self.kwargs["cancelled"] = self.is_cancelled
+
+    def cancel(self):
+        self._cancelled = True
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
+
+
+def run_in_background(fn, *args, pool=None, **kwargs):
+    """Start fn on the (global) thread pool and return its Worker."""
+    worker = Worker(fn, *args, **kwargs)
+    (pool or QThreadPool.globalInstance()).start(worker)
+    return worker